@@ -14,10 +14,11 @@ import json
 
 from graphs.state import (
     AgentState, MissionStatus, AgentType,
-    create_initial_state, update_status, MissionEvent, Artifact
+    create_initial_state, update_status, MissionEvent, Artifact, MissionSync
 )
-from core.llm import get_langchain_llm, LLMClient
+from core.llm import get_langchain_llm, get_llm_client
 from core.database import db
+from core.llm_telemetry import traced_node
 from ats.detector import detect_ats_platform, ATSPlatform
 
 
@@ -93,23 +94,20 @@ async def fill_application_form(state: AgentState) -> Dict:
     kb = context["knowledge_base"]
     
     # --- RECTIFIED: Real Question Extraction (Conceptual/LLM fallback) ---
-    llm = LLMClient()
+    llm = get_llm_client()
     prompt = f"Based on this job URL: {url} and the platform {platform}, list 3 common application questions that might be asked. Return valid JSON list of objects with 'id', 'text', 'type'."
     
     try:
-        raw_q = await llm.quick_llm(prompt)
-        from core.models import parse_llm_json
         # Simplified extraction if parsing fails
-        import json
-        try:
-            mock_questions = json.loads(raw_q)
-            if not isinstance(mock_questions, list): mock_questions = []
-        except:
-            mock_questions = [
+        mock_questions = await llm.chat_json(
+            [{"role": "user", "content": prompt}],
+            schema=List[Dict[str, Any]],
+            fallback=[
                 {"id": "q1", "text": "Are you authorized to work in the US?", "type": "radio"},
                 {"id": "q2", "text": "Experience with Python?", "type": "number"},
                 {"id": "q3", "text": "Why this company?", "type": "textarea"},
-            ]
+            ],
+        )
     except:
         mock_questions = []
     
@@ -135,10 +133,11 @@ async def handle_questions(state: AgentState) -> Dict:
     context = state["context"]
     questions = context.get("form_questions", [])
     kb = context.get("knowledge_base", {})
-    llm = LLMClient()
+    llm = get_llm_client()
     
     answers = {}
     low_confidence_answers = []
+    llm_questions = []
     
     for q in questions:
         question_text = q["text"]
@@ -147,30 +146,41 @@ async def handle_questions(state: AgentState) -> Dict:
         if "authorized" in question_text.lower() and "work_auth" in kb:
             answers[q["id"]] = kb["work_auth"]
             continue
-            
-        # 2. Use LLM to answer
-        prompt = f"""
+        
+        llm_questions.append(q)
+    
+    # 2. Use LLM to answer the rest, concurrently
+    profile = json.dumps(kb, indent=2)
+    results = await llm.chat_many([
+        {"messages": [{"role": "user", "content": f"""
         Answer this job application question based on the candidate's profile.
         
-        Question: {question_text}
+        Question: {q["text"]}
         
         Candidate Profile:
-        {json.dumps(kb, indent=2)}
+        {profile}
         
         If you are unsure or missing info, reply with "dunno".
         Keep answer concise.
-        """
-        
-        response = await llm.quick_llm(prompt)
-        
-        if "dunno" in response.lower():
+        """}]}
+        for q in llm_questions
+    ])
+    
+    for q, result in zip(llm_questions, results):
+        if not result.ok:
+            low_confidence_answers.append({
+                "question": q["text"],
+                "suggested_answer": "",
+                "reason": "Answer generation failed"
+            })
+        elif "dunno" in result.content.lower():
             low_confidence_answers.append({
-                "question": question_text,
+                "question": q["text"],
                 "suggested_answer": "",
                 "reason": "Missing info in profile"
             })
         else:
-            answers[q["id"]] = response
+            answers[q["id"]] = result.content
     
     return {
         "context": {
@@ -256,12 +266,12 @@ def build_application_agent_graph() -> StateGraph:
     
     graph = StateGraph(AgentState)
     
-    graph.add_node("detect_ats", detect_ats)
-    graph.add_node("load_kb", load_knowledge_base)
-    graph.add_node("fill_form", fill_application_form)
-    graph.add_node("handle_questions", handle_questions)
-    graph.add_node("review", hitl_review_gate)
-    graph.add_node("submit", submit_application)
+    graph.add_node("detect_ats", traced_node("detect_ats", detect_ats))
+    graph.add_node("load_kb", traced_node("load_kb", load_knowledge_base))
+    graph.add_node("fill_form", traced_node("fill_form", fill_application_form))
+    graph.add_node("handle_questions", traced_node("handle_questions", handle_questions))
+    graph.add_node("review", traced_node("review", hitl_review_gate))
+    graph.add_node("submit", traced_node("submit", submit_application))
     
     graph.set_entry_point("detect_ats")
     graph.add_edge("detect_ats", "load_kb")
@@ -290,6 +300,7 @@ async def run_application_agent(
     url: Optional[str] = None,
     resume_id: Optional[str] = None,
     mission_id: Optional[str] = None,
+    sync: Optional[MissionSync] = None,
 ) -> AgentState:
     """
     Run the Application Agent.
@@ -312,6 +323,7 @@ async def run_application_agent(
     
     # Run graph with streaming to update database after each node
     final_state = initial_state
+    sync = sync or MissionSync()  # what is already on the mission row
     try:
         async for state_update in graph.astream(initial_state):
             for node_name, node_output in state_update.items():
@@ -334,12 +346,12 @@ async def run_application_agent(
                             status=str(status),
                             current_node=final_state.get("current_node", node_name),
                             progress=int(final_state.get("progress", 0)),
-                            context=final_state.get("context"),
-                            events=[e.to_dict() if hasattr(e, "to_dict") else e for e in final_state.get("events", [])],
+                            **sync.pending(final_state),
                             artifacts=[a.to_dict() if hasattr(a, "to_dict") else a for a in final_state.get("artifacts", [])],
                             requires_approval=final_state.get("requires_approval", False),
                             approval_reason=final_state.get("approval_reason"),
                         )
+                        sync.mark_persisted()
                     except Exception as db_err:
                         import logging
                         logging.getLogger(__name__).error(f"Failed to update DB for mission {mission_id}: {db_err}")
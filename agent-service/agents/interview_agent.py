@@ -16,10 +16,12 @@ import json
 from graphs.state import (
     AgentState, MissionStatus, AgentType,
     create_initial_state, update_status, MissionEvent, Artifact,
-    get_retry_callback
+    get_retry_callback, MissionSync
 )
-from core.llm import LLMClient
+from core.llm import get_llm_client
+from core.prompt_budget import PromptSection, pack_sections
 from core.database import db
+from core.llm_telemetry import traced_node
 
 
 # ========== Prompts ==========
@@ -75,21 +77,21 @@ async def research_company(state: AgentState) -> Dict:
         except Exception:
             pass
 
-    llm = LLMClient()
+    llm = get_llm_client()
     
     # Mock research by asking LLM to simulate it based on its training data
-    research_json = await llm.chat(
+    from core.models import CompanyResearch
+    research = await llm.chat_json(
         messages=[
             {"role": "system", "content": "You are an expert corporate researcher. Respond only in valid JSON."},
             {"role": "user", "content": COMPANY_RESEARCH_PROMPT.format(company=company, role=role)}
         ],
-        on_retry=get_retry_callback(state["mission_id"])
+        on_retry=get_retry_callback(state["mission_id"]),
+        schema=CompanyResearch,
+        cache=True,  # same company/role across users
+        fallback=CompanyResearch(),
     )
     
-    # Validate with Pydantic
-    from core.models import CompanyResearch, parse_llm_json
-    research = parse_llm_json(research_json, CompanyResearch)
-    
     return {
         "context": {
             **state.get("context", {}),
@@ -111,30 +113,36 @@ async def generate_questions(state: AgentState) -> Dict:
     Generate tailored interview questions.
     """
     context = state["context"]
-    llm = LLMClient()
+    llm = get_llm_client()
+    system = "You are an expert technical interviewer. Respond only in valid JSON."
+    question_context = pack_sections(
+        [
+            PromptSection("research", json.dumps(context["research"]), priority=0),
+            PromptSection("description", context.get("description") or "", priority=1),
+        ],
+        budget=llm.prompt_budget(2048, system, GENERATE_QUESTIONS_PROMPT),
+        count_tokens=llm.count_tokens,
+    )
     
-    questions_json = await llm.chat(
+    from core.models import InterviewQuestion
+    questions = await llm.chat_json(
         messages=[
-            {"role": "system", "content": "You are an expert technical interviewer. Respond only in valid JSON."},
+            {"role": "system", "content": system},
             {"role": "user", "content": GENERATE_QUESTIONS_PROMPT.format(
                 role=context["role"],
                 company=context["company"],
-                research=json.dumps(context["research"]),
-                description=context.get("description", "")[:1000]
+                **question_context,
             )}
         ],
-        on_retry=get_retry_callback(state["mission_id"])
+        schema=List[InterviewQuestion],
+        on_retry=get_retry_callback(state["mission_id"]),
+        fallback=[],
     )
     
-    try:
-        questions = json.loads(questions_json)
-    except:
-        questions = []
-    
     return {
         "context": {
             **context,
-            "questions": questions,
+            "questions": [q.model_dump() for q in questions],
         },
         "events": [MissionEvent(
             type="log",
@@ -169,10 +177,12 @@ async def create_prep_guide(state: AgentState) -> Dict:
 
 """
     for i, q in enumerate(questions, 1):
-        markdown += f"### {i}. {q['question']} ({q['type'].title()})\n"
-        markdown += f"_{q['context']}_\n\n"
+        q_type = q.get('type') or 'general'
+        markdown += f"### {i}. {q.get('question', '')} ({q_type.title()})\n"
+        if q.get('context'):
+            markdown += f"_{q['context']}_\n\n"
         markdown += "**Key talking points:**\n"
-        for point in q.get('ideal_answer_points', []):
+        for point in q.get('ideal_answer_points') or []:
             markdown += f"- {point}\n"
         markdown += "\n"
         
@@ -205,9 +215,9 @@ async def create_prep_guide(state: AgentState) -> Dict:
 def build_interview_agent_graph() -> StateGraph:
     graph = StateGraph(AgentState)
     
-    graph.add_node("research", research_company)
-    graph.add_node("generate_q", generate_questions)
-    graph.add_node("create_guide", create_prep_guide)
+    graph.add_node("research", traced_node("research", research_company))
+    graph.add_node("generate_q", traced_node("generate_q", generate_questions))
+    graph.add_node("create_guide", traced_node("create_guide", create_prep_guide))
     
     graph.set_entry_point("research")
     graph.add_edge("research", "generate_q")
@@ -225,6 +235,7 @@ async def run_interview_agent(
     role: Optional[str] = None,
     job_id: Optional[str] = None,
     mission_id: Optional[str] = None,
+    sync: Optional[MissionSync] = None,
 ) -> AgentState:
     """
     Run the Interview Agent.
@@ -247,6 +258,7 @@ async def run_interview_agent(
     
     # Run graph with streaming to update database after each node
     final_state = initial_state
+    sync = sync or MissionSync()  # what is already on the mission row
     try:
         async for state_update in graph.astream(initial_state):
             for node_name, node_output in state_update.items():
@@ -269,10 +281,10 @@ async def run_interview_agent(
                             status=str(status),
                             current_node=final_state.get("current_node", node_name),
                             progress=int(final_state.get("progress", 0)),
-                            context=final_state.get("context"),
-                            events=[e.to_dict() if hasattr(e, "to_dict") else e for e in final_state.get("events", [])],
+                            **sync.pending(final_state),
                             artifacts=[a.to_dict() if hasattr(a, "to_dict") else a for a in final_state.get("artifacts", [])],
                         )
+                        sync.mark_persisted()
                     except Exception as db_err:
                         import logging
                         logging.getLogger(__name__).error(f"Failed to update DB for mission {mission_id}: {db_err}")
@@ -14,10 +14,11 @@ import logging
 
 from graphs.state import (
     AgentState, MissionStatus, AgentType,
-    create_initial_state, update_status, MissionEvent, Artifact
+    create_initial_state, update_status, MissionEvent, Artifact, MissionSync
 )
 from core.database import db
 from core.llm import get_langchain_llm
+from core.llm_telemetry import traced_node
 from rag.embeddings import embeddings
 from scrapers.linkedin_scraper import LinkedInScraper
 
@@ -127,7 +128,7 @@ async def deduplicate_jobs(state: AgentState) -> Dict:
     user_id = state["user_id"]
     
     # Get existing jobs from DB to check for duplicates
-    existing_jobs = await db.get_jobs(user_id, limit=500)
+    existing_jobs = await db.get_jobs(user_id, limit=500, projection="dedup")
     existing_urls = {job["url"] for job in existing_jobs}
     existing_keys = {f"{job['title']}|{job['company']}" for job in existing_jobs}
     
@@ -175,30 +176,31 @@ async def embed_and_store(state: AgentState) -> Dict:
         logger.info(f"Generating embeddings for {len(descriptions)} descriptions")
         job_embeddings = await embeddings.embed_texts(descriptions)
         
-        if len(job_embeddings) != len(new_jobs):
-            logger.warning(f"Mismatch: {len(new_jobs)} jobs but {len(job_embeddings)} embeddings")
+        # Jobs whose embedding failed are still stored, without an embedding or
+        # with a degraded one flagged for re-embedding
+        if not job_embeddings.ok:
+            logger.warning(f"{job_embeddings.failed_count} of {len(new_jobs)} jobs stored without embeddings")
+        if job_embeddings.degraded_count:
+            logger.warning(f"{job_embeddings.degraded_count} of {len(new_jobs)} jobs stored with degraded embeddings")
         
-        # Store jobs in database
-        stored_ids = []
-        for i, (job, embedding) in enumerate(zip(new_jobs, job_embeddings)):
-            try:
-                job_id = await db.create_job(
-                    user_id=user_id,
-                    title=job["title"],
-                    company=job["company"],
-                    location=job["location"],
-                    description=job["description"],
-                    url=job["url"],
-                    source=job["source"],
-                    embedding=embedding,
-                    salary_range=job.get("salary_range"),
-                    job_type=job.get("job_type"),
-                )
-                if job_id:
-                    stored_ids.append(job_id)
-            except Exception as job_err:
-                logger.error(f"Error creating job {i}: {job_err}")
-                continue
+        # Store the whole batch in one transaction
+        batch = [
+            {
+                "title": job["title"],
+                "company": job["company"],
+                "location": job["location"],
+                "description": job["description"],
+                "url": job["url"],
+                "source": job["source"],
+                "embedding": embedding,
+                "embedding_degraded": degraded,
+                "salary_range": job.get("salary_range"),
+                "job_type": job.get("job_type"),
+            }
+            for job, embedding, degraded in zip(new_jobs, job_embeddings.vectors, job_embeddings.degraded)
+        ]
+        job_ids = await db.create_jobs_bulk(user_id, batch)
+        stored_ids = [job_id for job_id in job_ids if job_id]
         
         logger.info(f"Successfully stored {len(stored_ids)} jobs")
         
@@ -207,7 +209,11 @@ async def embed_and_store(state: AgentState) -> Dict:
             "events": [MissionEvent(
                 type="log",
                 message=f"Stored {len(stored_ids)} jobs with embeddings",
-                data={"job_ids": stored_ids}
+                data={
+                    "job_ids": stored_ids,
+                    "embedding_failures": job_embeddings.failed_count,
+                    "embedding_degraded": job_embeddings.degraded_count,
+                }
             )],
             **update_status(state, MissionStatus.EXECUTING, "embed_store", 90)
         }
@@ -275,11 +281,11 @@ def build_job_finder_graph() -> StateGraph:
     graph = StateGraph(AgentState)
     
     # Add nodes
-    graph.add_node("parse_criteria", parse_search_criteria)
-    graph.add_node("scrape", scrape_jobs)
-    graph.add_node("deduplicate", deduplicate_jobs)
-    graph.add_node("embed_store", embed_and_store)
-    graph.add_node("notify", notify_frontend)
+    graph.add_node("parse_criteria", traced_node("parse_criteria", parse_search_criteria))
+    graph.add_node("scrape", traced_node("scrape", scrape_jobs))
+    graph.add_node("deduplicate", traced_node("deduplicate", deduplicate_jobs))
+    graph.add_node("embed_store", traced_node("embed_store", embed_and_store))
+    graph.add_node("notify", traced_node("notify", notify_frontend))
     
     # Define edges
     graph.set_entry_point("parse_criteria")
@@ -300,6 +306,7 @@ async def run_job_finder(
     target_roles: Optional[List[str]] = None,
     target_locations: Optional[List[str]] = None,
     mission_id: Optional[str] = None,  # Add mission_id parameter
+    sync: Optional[MissionSync] = None,
 ) -> AgentState:
     """
     Run the Job Finder agent.
@@ -310,6 +317,8 @@ async def run_job_finder(
         target_roles: List of target job titles
         target_locations: List of target locations
         mission_id: Mission ID for persistence (optional)
+        sync: Tracks what is already on the mission row; pass one to
+            write the unstored tail after the run (see MissionSync)
         
     Returns:
         Final agent state with results
@@ -334,6 +343,7 @@ async def run_job_finder(
     
     # Run graph with streaming to update database after each node
     final_state = initial_state
+    sync = sync or MissionSync()  # what is already on the mission row
     try:
         async for state_update in graph.astream(initial_state):
             # state_update is a dict with node name as key and output as value
@@ -360,9 +370,9 @@ async def run_job_finder(
                             status=str(status),
                             current_node=final_state.get("current_node", node_name),
                             progress=int(final_state.get("progress", 0)),
-                            context=final_state.get("context"),
-                            events=[e.to_dict() if hasattr(e, "to_dict") else e for e in final_state.get("events", [])],
+                            **sync.pending(final_state),
                         )
+                        sync.mark_persisted()
                         logger.info(f"Mission {mission_id} updated: {node_name}, progress={final_state.get('progress', 0)}%")
                     except Exception as db_err:
                         logger.error(f"Failed to update DB for mission {mission_id}: {db_err}", exc_info=True)
@@ -13,10 +13,11 @@ import uuid
 from graphs.state import (
     AgentState, MissionStatus, AgentType,
     create_initial_state, update_status, MissionEvent, Artifact,
-    get_retry_callback
+    get_retry_callback, stream_draft, MissionSync
 )
-from core.llm import LLMClient
+from core.llm import get_llm_client
 from core.database import db
+from core.llm_telemetry import traced_node
 
 
 # ========== Prompts ==========
@@ -80,18 +81,20 @@ async def generate_post(state: AgentState) -> Dict:
     Generate the LinkedIn post draft using LLM.
     """
     context = state["context"]
-    llm = LLMClient()
+    llm = get_llm_client()
     
-    draft = await llm.chat(
-        messages=[
-            {"role": "system", "content": "You are a LinkedIn personal branding expert."},
-            {"role": "user", "content": LINKEDIN_POST_PROMPT.format(
-                topic=context["topic"],
-                context=context["post_context"]
-            )}
-        ],
-        on_retry=get_retry_callback(state["mission_id"])
-    )
+    async with stream_draft(state["mission_id"], "linkedin_post") as on_token:
+        draft = await llm.chat(
+            messages=[
+                {"role": "system", "content": "You are a LinkedIn personal branding expert."},
+                {"role": "user", "content": LINKEDIN_POST_PROMPT.format(
+                    topic=context["topic"],
+                    context=context["post_context"]
+                )}
+            ],
+            on_retry=get_retry_callback(state["mission_id"]),
+            on_token=on_token,
+        )
     
     # Create artifact
     post_artifact = Artifact(
@@ -192,10 +195,10 @@ def should_wait(state: AgentState) -> str:
 def build_linkedin_agent_graph() -> StateGraph:
     graph = StateGraph(AgentState)
     
-    graph.add_node("gather", gather_context)
-    graph.add_node("generate", generate_post)
-    graph.add_node("review", hitl_review_gate)
-    graph.add_node("schedule", schedule_post)
+    graph.add_node("gather", traced_node("gather", gather_context))
+    graph.add_node("generate", traced_node("generate", generate_post))
+    graph.add_node("review", traced_node("review", hitl_review_gate))
+    graph.add_node("schedule", traced_node("schedule", schedule_post))
     
     graph.set_entry_point("gather")
     graph.add_edge("gather", "generate")
@@ -221,6 +224,7 @@ async def run_linkedin_agent(
     topic: Optional[str] = None,
     context: Optional[str] = None,
     mission_id: Optional[str] = None,
+    sync: Optional[MissionSync] = None,
 ) -> AgentState:
     """
     Run the LinkedIn Agent.
@@ -242,6 +246,7 @@ async def run_linkedin_agent(
     
     # Run graph with streaming to update database after each node
     final_state = initial_state
+    sync = sync or MissionSync()  # what is already on the mission row
     try:
         async for state_update in graph.astream(initial_state):
             for node_name, node_output in state_update.items():
@@ -264,12 +269,12 @@ async def run_linkedin_agent(
                             status=str(status),
                             current_node=final_state.get("current_node", node_name),
                             progress=int(final_state.get("progress", 0)),
-                            context=final_state.get("context"),
-                            events=[e.to_dict() if hasattr(e, "to_dict") else e for e in final_state.get("events", [])],
+                            **sync.pending(final_state),
                             artifacts=[a.to_dict() if hasattr(a, "to_dict") else a for a in final_state.get("artifacts", [])],
                             requires_approval=final_state.get("requires_approval", False),
                             approval_reason=final_state.get("approval_reason"),
                         )
+                        sync.mark_persisted()
                     except Exception as db_err:
                         import logging
                         logging.getLogger(__name__).error(f"Failed to update DB for mission {mission_id}: {db_err}")
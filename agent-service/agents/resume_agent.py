@@ -13,10 +13,12 @@ import uuid
 from graphs.state import (
     AgentState, MissionStatus, AgentType,
     create_initial_state, update_status, MissionEvent, Artifact,
-    get_retry_callback
+    get_retry_callback, stream_draft, MissionSync
 )
-from core.llm import get_langchain_llm, LLMClient
+from core.llm import get_langchain_llm, get_llm_client
+from core.prompt_budget import PromptSection, pack_sections
 from core.database import db
+from core.llm_telemetry import traced_node
 from rag.retriever import RAGRetriever, ChunkType
 
 
@@ -114,20 +116,20 @@ async def analyze_job(state: AgentState) -> Dict:
         company = input_data.get("company", "")
         location = input_data.get("location", "")
     
-    # Use LLM to analyze JD with retry feedback
-    llm = LLMClient()
-    analysis = await llm.chat(
+    # Use LLM to analyze JD with retry feedback, validated with Pydantic
+    from core.models import JobAnalysis
+    llm = get_llm_client()
+    job_analysis = await llm.chat_json(
         messages=[
             {"role": "system", "content": "You are a job requirements analyst. Respond only in valid JSON."},
             {"role": "user", "content": ANALYZE_JD_PROMPT.format(job_description=job_description)}
         ],
-        on_retry=get_retry_callback(state["mission_id"])
+        on_retry=get_retry_callback(state["mission_id"]),
+        schema=JobAnalysis,
+        cache=True,  # same JD on every tailoring/regeneration
+        fallback=JobAnalysis(),
     )
     
-    # Validate JSON response with Pydantic
-    from core.models import JobAnalysis, parse_llm_json
-    job_analysis = parse_llm_json(analysis, JobAnalysis)
-    
     # If resume_id provided, fetch its original content for backup context
     resume_id = input_data.get("resume_id")
     original_resume = ""
@@ -145,7 +147,7 @@ async def analyze_job(state: AgentState) -> Dict:
             "company": company,
             "location": location,
             "job_description": job_description,
-            "job_analysis": job_analysis,
+            "job_analysis": job_analysis.model_dump(),
             "original_resume": original_resume or "Not available",
         },
         "events": [MissionEvent(
@@ -209,7 +211,8 @@ async def match_resume_chunks(state: AgentState) -> Dict:
     return {
         "context": {
             **context,
-            "retrieved_chunks": chunks,
+            # Chunk ids only: the text is in formatted_chunks and resume_chunks
+            "retrieved_chunks": {ctype: [c.id for c in type_chunks] for ctype, type_chunks in chunks.items()},
             "formatted_chunks": formatted,
             "chunk_count": len(all_chunks),
         },
@@ -227,7 +230,7 @@ async def generate_tailored_content(state: AgentState) -> Dict:
     Generate tailored resume and cover letter using LLM.
     """
     context = state["context"]
-    llm = LLMClient()
+    llm = get_llm_client()
     
     # Check for user feedback in input_data
     feedback = state.get("input_data", {}).get("feedback", "None provided.")
@@ -235,36 +238,71 @@ async def generate_tailored_content(state: AgentState) -> Dict:
         # Fallback to checking previous state if available
         feedback = state.get("user_feedback", "None provided.")
 
-    # Generate tailored resume with retry logging
-    tailored_resume = await llm.chat(
-        messages=[
-            {"role": "system", "content": "You are an expert ATS-optimized resume writer."},
-            {"role": "user", "content": TAILOR_RESUME_PROMPT.format(
-                job_title=context["job_title"],
-                company=context["company"],
-                job_analysis=context["job_analysis"],
-                resume_chunks=context["formatted_chunks"] if context.get("formatted_chunks") else context.get("original_resume", "No content available"),
-                feedback=feedback
-            )}
+    # Pack the variable context to the token budget: requirements and
+    # feedback first, then resume chunks (already in ChunkType priority order)
+    resume_system = "You are an expert ATS-optimized resume writer."
+    resume_context = pack_sections(
+        [
+            PromptSection("job_analysis", str(context["job_analysis"]), priority=0),
+            PromptSection("feedback", str(feedback), priority=0),
+            PromptSection(
+                "resume_chunks",
+                context["formatted_chunks"] if context.get("formatted_chunks") else context.get("original_resume", "No content available"),
+                priority=1,
+            ),
         ],
-        on_retry=get_retry_callback(state["mission_id"])
+        budget=llm.prompt_budget(2048, resume_system, TAILOR_RESUME_PROMPT),
+        count_tokens=llm.count_tokens,
     )
-    
-    # Generate cover letter with retry logging
-    cover_letter = await llm.chat(
-        messages=[
-            {"role": "system", "content": "You are an expert cover letter writer."},
-            {"role": "user", "content": COVER_LETTER_PROMPT.format(
-                job_title=context["job_title"],
-                company=context["company"],
-                location=context["location"],
-                job_analysis=context["job_analysis"],
-                resume_highlights=context["formatted_chunks"][:2000],  # Limit for prompt
-            )}
+
+    # A cover letter needs highlights, not the whole resume
+    cover_system = "You are an expert cover letter writer."
+    cover_context = pack_sections(
+        [
+            PromptSection("job_analysis", str(context["job_analysis"]), priority=0),
+            PromptSection("resume_highlights", context.get("formatted_chunks") or "", priority=1, max_tokens=1500),
         ],
-        on_retry=get_retry_callback(state["mission_id"])
+        budget=llm.prompt_budget(2048, cover_system, COVER_LETTER_PROMPT),
+        count_tokens=llm.count_tokens,
     )
     
+    # Generate resume and cover letter concurrently with retry logging,
+    # streaming both drafts to the client
+    mission_id = state["mission_id"]
+    async with stream_draft(mission_id, "resume") as resume_tokens, \
+               stream_draft(mission_id, "cover_letter") as cover_tokens:
+        resume_result, cover_result = await llm.chat_many([
+            {
+                "messages": [
+                    {"role": "system", "content": resume_system},
+                    {"role": "user", "content": TAILOR_RESUME_PROMPT.format(
+                        job_title=context["job_title"],
+                        company=context["company"],
+                        **resume_context,
+                    )}
+                ],
+                "on_retry": get_retry_callback(mission_id),
+                "on_token": resume_tokens,
+            },
+            {
+                "messages": [
+                    {"role": "system", "content": cover_system},
+                    {"role": "user", "content": COVER_LETTER_PROMPT.format(
+                        job_title=context["job_title"],
+                        company=context["company"],
+                        location=context["location"],
+                        **cover_context,
+                    )}
+                ],
+                "on_retry": get_retry_callback(mission_id),
+                "on_token": cover_tokens,
+            },
+        ])
+    for result in (resume_result, cover_result):
+        if not result.ok:
+            raise result.error
+    tailored_resume, cover_letter = resume_result.content, cover_result.content
+    
     # Create artifacts
     resume_artifact = Artifact(
         id=str(uuid.uuid4()),
@@ -393,11 +431,11 @@ def build_resume_agent_graph() -> StateGraph:
     graph = StateGraph(AgentState)
     
     # Add nodes
-    graph.add_node("analyze", analyze_job)
-    graph.add_node("match", match_resume_chunks)
-    graph.add_node("generate", generate_tailored_content)
-    graph.add_node("review", hitl_review_gate)
-    graph.add_node("finalize", finalize_artifact)
+    graph.add_node("analyze", traced_node("analyze", analyze_job))
+    graph.add_node("match", traced_node("match", match_resume_chunks))
+    graph.add_node("generate", traced_node("generate", generate_tailored_content))
+    graph.add_node("review", traced_node("review", hitl_review_gate))
+    graph.add_node("finalize", traced_node("finalize", finalize_artifact))
     
     # Define edges
     graph.set_entry_point("analyze")
@@ -429,6 +467,7 @@ async def run_resume_agent(
     company: Optional[str] = None,
     location: Optional[str] = None,
     mission_id: Optional[str] = None,
+    sync: Optional[MissionSync] = None,
     **kwargs
 ) -> AgentState:
     """
@@ -457,6 +496,7 @@ async def run_resume_agent(
     
     # Run graph with streaming to update database after each node
     final_state = initial_state
+    sync = sync or MissionSync()  # what is already on the mission row
     try:
         async for state_update in graph.astream(initial_state):
             for node_name, node_output in state_update.items():
@@ -479,12 +519,12 @@ async def run_resume_agent(
                             status=str(status),
                             current_node=final_state.get("current_node", node_name),
                             progress=int(final_state.get("progress", 0)),
-                            context=final_state.get("context"),
-                            events=[e.to_dict() if hasattr(e, "to_dict") else e for e in final_state.get("events", [])],
+                            **sync.pending(final_state),
                             artifacts=[a.to_dict() if hasattr(a, "to_dict") else a for a in final_state.get("artifacts", [])],
                             requires_approval=final_state.get("requires_approval", False),
                             approval_reason=final_state.get("approval_reason"),
                         )
+                        sync.mark_persisted()
                     except Exception as db_err:
                         import logging
                         logging.getLogger(__name__).error(f"Failed to update DB for mission {mission_id}: {db_err}")
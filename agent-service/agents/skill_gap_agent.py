@@ -14,10 +14,12 @@ import json
 from graphs.state import (
     AgentState, MissionStatus, AgentType,
     create_initial_state, update_status, MissionEvent, Artifact,
-    get_retry_callback
+    get_retry_callback, MissionSync
 )
-from core.llm import LLMClient
+from core.llm import get_llm_client
+from core.prompt_budget import PromptSection, pack_sections
 from core.database import db
+from core.llm_telemetry import traced_node
 from rag.retriever import RAGRetriever, ChunkType
 
 
@@ -56,7 +58,7 @@ async def fetch_target_jobs(state: AgentState) -> Dict:
     
     # Fetch top 5 recent jobs matching the role from DB
     # For now, just getting recent jobs
-    jobs = await db.get_jobs(state["user_id"], limit=5)
+    jobs = await db.get_jobs(state["user_id"], limit=5, projection="analysis")
     
     if not jobs:
         return {
@@ -84,32 +86,28 @@ async def extract_required_skills(state: AgentState) -> Dict:
     """
     context = state["context"]
     jobs = context["target_jobs"]
-    llm = LLMClient()
+    llm = get_llm_client()
     
-    # Combine descriptions (truncated to avoid token limits)
-    combined_desc = "\n\n".join([j["description"][:1000] for j in jobs])
+    # Combine descriptions, sharing the token budget evenly across jobs
+    system = "You are a technical recruiter. Respond only in valid JSON."
+    packed = pack_sections(
+        [PromptSection(f"job_{i}", j["description"] or "") for i, j in enumerate(jobs)],
+        budget=llm.prompt_budget(2048, system, EXTRACT_SKILLS_PROMPT),
+        count_tokens=llm.count_tokens,
+    )
+    combined_desc = "\n\n".join(text for text in packed.values() if text)
     
-    skills_json = await llm.chat(
+    # A plain list, or a {"skills": [...]} wrapper, of skill names
+    required_skills = await llm.chat_json(
         messages=[
-            {"role": "system", "content": "You are a technical recruiter. Respond only in valid JSON."},
+            {"role": "system", "content": system},
             {"role": "user", "content": EXTRACT_SKILLS_PROMPT.format(job_description=combined_desc)}
         ],
-        on_retry=get_retry_callback(state["mission_id"])
+        schema=List[str],
+        on_retry=get_retry_callback(state["mission_id"]),
+        fallback=[],
     )
     
-    # Parse as simple list or handle dict wrapper
-    import json
-    try:
-        parsed = json.loads(skills_json)
-        if isinstance(parsed, list):
-            required_skills = parsed
-        elif isinstance(parsed, dict):
-            required_skills = parsed.get("skills", [])
-        else:
-            required_skills = []
-    except:
-        required_skills = []
-    
     return {
         "context": {
             **context,
@@ -140,23 +138,27 @@ async def analyze_gaps(state: AgentState) -> Dict:
         limit=50
     )
     
-    candidate_profile = "\n".join([c["content"] for c in chunks])
+    llm = get_llm_client()
+    system = "You are a career coach. Respond only in valid JSON."
+    gap_context = pack_sections(
+        [
+            PromptSection("required_skills", str(required_skills), priority=0),
+            PromptSection("candidate_profile", "\n".join([c["content"] for c in chunks]), priority=1),
+        ],
+        budget=llm.prompt_budget(2048, system, GAP_ANALYSIS_PROMPT),
+        count_tokens=llm.count_tokens,
+    )
     
-    llm = LLMClient()
-    analysis_json = await llm.chat(
+    from core.models import SkillGapAnalysis
+    analysis = await llm.chat_json(
         messages=[
-            {"role": "system", "content": "You are a career coach. Respond only in valid JSON."},
-            {"role": "user", "content": GAP_ANALYSIS_PROMPT.format(
-                required_skills=required_skills,
-                candidate_profile=candidate_profile
-            )}
+            {"role": "system", "content": system},
+            {"role": "user", "content": GAP_ANALYSIS_PROMPT.format(**gap_context)}
         ],
-        on_retry=get_retry_callback(state["mission_id"])
+        schema=SkillGapAnalysis,
+        on_retry=get_retry_callback(state["mission_id"]),
+        fallback=SkillGapAnalysis(),
     )
-    
-    # Validate with Pydantic
-    from core.models import SkillGapAnalysis, parse_llm_json
-    analysis = parse_llm_json(analysis_json, SkillGapAnalysis)
         
     return {
         "context": {
@@ -224,10 +226,10 @@ async def generate_report(state: AgentState) -> Dict:
 def build_skill_gap_graph() -> StateGraph:
     graph = StateGraph(AgentState)
     
-    graph.add_node("fetch_jobs", fetch_target_jobs)
-    graph.add_node("extract_skills", extract_required_skills)
-    graph.add_node("analyze", analyze_gaps)
-    graph.add_node("report", generate_report)
+    graph.add_node("fetch_jobs", traced_node("fetch_jobs", fetch_target_jobs))
+    graph.add_node("extract_skills", traced_node("extract_skills", extract_required_skills))
+    graph.add_node("analyze", traced_node("analyze", analyze_gaps))
+    graph.add_node("report", traced_node("report", generate_report))
     
     graph.set_entry_point("fetch_jobs")
     graph.add_edge("fetch_jobs", "extract_skills")
@@ -244,6 +246,7 @@ async def run_skill_gap_agent(
     user_id: str,
     role: Optional[str] = None,
     mission_id: Optional[str] = None,
+    sync: Optional[MissionSync] = None,
 ) -> AgentState:
     """
     Run the Skill Gap Agent.
@@ -262,6 +265,7 @@ async def run_skill_gap_agent(
     
     # Run graph with streaming to update database after each node
     final_state = initial_state
+    sync = sync or MissionSync()  # what is already on the mission row
     try:
         async for state_update in graph.astream(initial_state):
             for node_name, node_output in state_update.items():
@@ -284,10 +288,10 @@ async def run_skill_gap_agent(
                             status=str(status),
                             current_node=final_state.get("current_node", node_name),
                             progress=int(final_state.get("progress", 0)),
-                            context=final_state.get("context"),
-                            events=[e.to_dict() if hasattr(e, "to_dict") else e for e in final_state.get("events", [])],
+                            **sync.pending(final_state),
                             artifacts=[a.to_dict() if hasattr(a, "to_dict") else a for a in final_state.get("artifacts", [])],
                         )
+                        sync.mark_persisted()
                     except Exception as db_err:
                         import logging
                         logging.getLogger(__name__).error(f"Failed to update DB for mission {mission_id}: {db_err}")
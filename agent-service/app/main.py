@@ -35,12 +35,24 @@ async def lifespan(app: FastAPI):
     await DatabaseService.get_pool()
     print("✅ Database connection pool initialized")
     
+    # Load the tokenizer once, before the first request needs it
+    from core.clients import warm_up
+    await warm_up()
+    
+    # Batch LLM call records into llm_calls
+    from core.llm_telemetry import telemetry
+    telemetry.start(settings.llm_telemetry_flush_seconds, settings)
+    
     yield
     
     # Shutdown
     print("👋 AI Career Agent Service shutting down...")
+    await telemetry.stop()
     await DatabaseService.close_pool()
     print("✅ Database connections closed")
+    
+    from core.clients import close_clients
+    await close_clients()
 
 
 # Create FastAPI app
@@ -120,6 +132,33 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Connection pool and LLM admission telemetry, plus cache hit rates."""
+    from core.llm_limiter import get_limiter_metrics
+    from core.llm_health import get_health_metrics, get_hedge_metrics
+    from core.clients import get_client_metrics
+    from core.llm_telemetry import get_call_metrics
+    from rag.embedding_cache import get_embedding_cache_metrics
+    
+    return {
+        "database": {
+            "pools": DatabaseService.get_pool_metrics(),
+            "caches": DatabaseService.get_cache_metrics(),
+        },
+        "llm": {
+            "limiters": get_limiter_metrics(),
+            "providers": get_health_metrics(),
+            "hedging": get_hedge_metrics(),
+            "clients": get_client_metrics(),
+            "calls": get_call_metrics(),
+        },
+        "embeddings": {
+            "cache": get_embedding_cache_metrics(),
+        },
+    }
+
+
 # Import and include routers
 from app.routers import (
     agent, jobs, resumes, applications, linkedin, 
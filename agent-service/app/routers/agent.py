@@ -4,7 +4,7 @@ Agent API Router
 Endpoints for triggering and managing agent missions.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
@@ -13,7 +13,7 @@ import asyncio
 import json
 import uuid
 
-from graphs.state import AgentState, MissionStatus, AgentType
+from graphs.state import AgentState, MissionStatus, AgentType, MissionSync
 from agents.job_finder import run_job_finder
 from agents.resume_agent import run_resume_agent
 from agents.application_agent import run_application_agent
@@ -21,7 +21,8 @@ from agents.linkedin_agent import run_linkedin_agent
 from agents.skill_gap_agent import run_skill_gap_agent
 from agents.interview_agent import run_interview_agent
 
-from core.database import db
+from core.database import db, next_page_cursor
+from core.drafts import draft_streams
 from core.auth import get_current_user, verify_user_owns_resource
 from core.models import parse_llm_json  # Ensure models are available
 
@@ -87,6 +88,7 @@ class MissionResponse(BaseModel):
     progress: int
     current_node: str
     events: List[Dict[str, Any]] = []
+    last_event_seq: int = 0
     artifacts: List[Dict[str, Any]] = []
     output_data: Optional[Dict[str, Any]] = None
     requires_approval: bool = False
@@ -105,6 +107,7 @@ class MissionsListResponse(BaseModel):
     """Paginated list of missions."""
     missions: List[MissionResponse]
     total: int
+    next_cursor: Optional[str] = None
 
 
 # ========== Helper Functions ==========
@@ -145,6 +148,7 @@ def state_to_response(data: Dict) -> MissionResponse:
         progress=int(data.get("progress") or 0),
         current_node=str(data.get("current_node") or "unknown"),
         events=events,
+        last_event_seq=int(data.get("event_seq") or 0),
         artifacts=artifacts,
         output_data=data.get("output_data"),
         requires_approval=bool(data.get("requires_approval", False)),
@@ -155,25 +159,38 @@ def state_to_response(data: Dict) -> MissionResponse:
 
 async def run_mission_background(mission_id: str, mission_type: str, user_id: str, **kwargs):
     """Run a mission in the background and persist results."""
+    # Everything the agent touches goes through the mission pool, so long
+    # runs and API bursts don't compete for the same connections
+    try:
+        with db.use_pool("missions"):
+            await _run_mission(mission_id, mission_type, user_id, **kwargs)
+    finally:
+        # No more drafts from this run: end open /stream connections
+        draft_streams.close(mission_id)
+
+
+async def _run_mission(mission_id: str, mission_type: str, user_id: str, **kwargs):
     logger.info(f"Starting background mission {mission_id} ({mission_type})")
     
     try:
         # Update status to running
         await db.update_mission(mission_id, status=MissionStatus.RUNNING.value, progress=0, current_node="initializing")
         
-        # Run the agent with mission_id for live updates
+        # Run the agent with mission_id for live updates; `sync` records what
+        # its per-node writes stored, so the final write can send the rest
+        sync = MissionSync()
         if mission_type == "job_finder":
-            state = await run_job_finder(user_id=user_id, mission_id=mission_id, **kwargs)
+            state = await run_job_finder(user_id=user_id, mission_id=mission_id, sync=sync, **kwargs)
         elif mission_type == "resume":
-            state = await run_resume_agent(user_id=user_id, mission_id=mission_id, **kwargs)
+            state = await run_resume_agent(user_id=user_id, mission_id=mission_id, sync=sync, **kwargs)
         elif mission_type == "application":
-            state = await run_application_agent(user_id=user_id, mission_id=mission_id, **kwargs)
+            state = await run_application_agent(user_id=user_id, mission_id=mission_id, sync=sync, **kwargs)
         elif mission_type == "linkedin":
-            state = await run_linkedin_agent(user_id=user_id, mission_id=mission_id, **kwargs)
+            state = await run_linkedin_agent(user_id=user_id, mission_id=mission_id, sync=sync, **kwargs)
         elif mission_type == "skill_gap":
-            state = await run_skill_gap_agent(user_id=user_id, mission_id=mission_id, **kwargs)
+            state = await run_skill_gap_agent(user_id=user_id, mission_id=mission_id, sync=sync, **kwargs)
         elif mission_type == "interview":
-            state = await run_interview_agent(user_id=user_id, mission_id=mission_id, **kwargs)
+            state = await run_interview_agent(user_id=user_id, mission_id=mission_id, sync=sync, **kwargs)
         else:
             raise ValueError(f"Unknown mission type: {mission_type}")
         
@@ -189,8 +206,8 @@ async def run_mission_background(mission_id: str, mission_type: str, user_id: st
             current_node=state.get("current_node"),
             progress=state.get("progress"),
             output_data=state.get("output_data"),
-            context=state.get("context"),
-            events=[e.to_dict() if hasattr(e, "to_dict") else e for e in state.get("events", [])],
+            # Events and context keys a failed per-node write did not store
+            **sync.pending(state),
             artifacts=[a.to_dict() if hasattr(a, "to_dict") else a for a in state.get("artifacts", [])],
             requires_approval=state.get("requires_approval"),
             approval_reason=state.get("approval_reason"),
@@ -460,10 +477,16 @@ async def start_interview_mission(
 @router.get("/mission/{mission_id}", response_model=MissionResponse)
 async def get_mission(
     mission_id: str,
+    after_seq: int = Query(0, ge=0, description="Only return events after this sequence number"),
     user_id: str = Depends(get_current_user),
 ):
-    """Get the current status of a mission."""
-    mission = await db.get_mission(mission_id)
+    """
+    Get the current status of a mission.
+
+    Pollers should pass the `last_event_seq` from their previous response as
+    `after_seq` to receive only new events.
+    """
+    mission = await db.get_mission(mission_id, after_seq=after_seq)
     if not mission:
         raise HTTPException(status_code=404, detail="Mission not found")
         
@@ -560,25 +583,99 @@ async def list_missions(
     status: Optional[str] = None,
     limit: int = 20,
     offset: int = 0,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     user_id: str = Depends(get_current_user),
 ):
-    """List all missions for a user."""
-    missions = await db.list_missions(
-        user_id=user_id,
-        status=status,
-        limit=limit,
-        offset=offset,
-        summary=True
-    )
+    """
+    List all missions for a user.
+
+    Each mission carries only its latest few events; `last_event_seq` is the
+    total count, and GET /mission/{mission_id} returns the full log.
+    """
+    try:
+        missions = await db.list_missions(
+            user_id=user_id,
+            status=status,
+            limit=limit,
+            offset=offset,
+            summary=True,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     total = await db.get_table_count("missions", user_id, status)
     
     return {
         "missions": [state_to_response(m) for m in missions],
         "total": total,
+        "next_cursor": next_page_cursor(missions, "created_at", limit),
     }
 
 
+# Statuses after which a mission run produces no more drafts
+DRAFT_STREAM_END_STATUSES = (
+    MissionStatus.COMPLETED.value,
+    MissionStatus.FAILED.value,
+    MissionStatus.REJECTED.value,
+    MissionStatus.NEEDS_REVIEW.value,
+    "waiting_approval",
+)
+
+
+@router.get("/mission/{mission_id}/stream")
+async def stream_mission_drafts(
+    mission_id: str,
+    user_id: str = Depends(get_current_user),
+):
+    """
+    Server-Sent Events stream of draft tokens (resume, cover letter,
+    LinkedIn post) while a mission generates them.
+
+    Events are `{"draft", "delta"}` as text arrives and `{"draft", "done"}`
+    when a draft is complete; a comment line is sent as keep-alive. Once the
+    mission run is over the stream sends `{"end": true, "status"}` and
+    closes (a regeneration is a new run: reconnect for its drafts).
+    """
+    with db.use_pool("streaming"):
+        mission = await db.get_mission(mission_id)
+    if not mission:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    verify_user_owns_resource(user_id, mission["user_id"])
+    
+    async def event_generator():
+        status = mission.get("status")
+        try:
+            if status not in DRAFT_STREAM_END_STATUSES:
+                async for event in draft_streams.subscribe(mission_id):
+                    if event is not None:
+                        yield f"data: {json.dumps(event)}\n\n"
+                        continue
+                    # Idle: the run may have ended before we subscribed, or on another worker
+                    with db.use_pool("streaming"):
+                        status = await db.get_mission_status(mission_id)
+                    if status in DRAFT_STREAM_END_STATUSES:
+                        break
+                    yield ": keep-alive\n\n"
+                else:
+                    with db.use_pool("streaming"):
+                        status = await db.get_mission_status(mission_id)
+            yield f"data: {json.dumps({'end': True, 'status': status})}\n\n"
+        except asyncio.CancelledError:
+            logger.info(f"Draft stream disconnected for mission {mission_id}")
+            return
+    
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
 @router.get("/events")
 async def stream_events(user_id: str = Depends(get_current_user)):
     """Server-Sent Events stream for real-time mission updates."""
@@ -588,7 +685,8 @@ async def stream_events(user_id: str = Depends(get_current_user)):
             while True:
                 # Poll DB for active missions of this user
                 # Optimized: only check running missions
-                missions = await db.list_missions(user_id, limit=50) # Get recent ones
+                with db.use_pool("streaming"):
+                    missions = await db.list_missions(user_id, limit=50, recent_events=0) # Get recent ones
                 
                 for mission in missions:
                     mission_id = mission["id"]
@@ -3,7 +3,7 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 
-from core.database import db
+from core.database import db, next_page_cursor
 from core.auth import get_current_user
 
 router = APIRouter()
@@ -23,14 +23,19 @@ class ApplicationListResponse(BaseModel):
     total: int
     offset: int
     limit: int
+    next_cursor: Optional[str] = None
 
 @router.get("", response_model=ApplicationListResponse)
 async def list_applications(
     user_id: str = Depends(get_current_user),
     limit: int = Query(50, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ):
-    apps = await db.get_applications(user_id=user_id, limit=limit, offset=offset)
+    try:
+        apps = await db.get_applications(user_id=user_id, limit=limit, offset=offset, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     total = await db.get_table_count("applications", user_id)
     
     return ApplicationListResponse(
@@ -46,7 +51,8 @@ async def list_applications(
         ) for a in apps],
         total=total,
         offset=offset,
-        limit=limit
+        limit=limit,
+        next_cursor=next_page_cursor(apps, "applied_at", limit),
     )
 class ApplicationStatusUpdate(BaseModel):
     status: str
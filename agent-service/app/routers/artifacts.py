@@ -2,12 +2,12 @@
 Artifacts API Router
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
-from core.database import db
+from core.database import db, next_page_cursor
 from core.auth import get_current_user
 
 router = APIRouter()
@@ -27,18 +27,35 @@ class ArtifactResponse(BaseModel):
 
 @router.get("", response_model=List[ArtifactResponse])
 async def list_artifacts(
+    response: Response,
     job_id: Optional[str] = None,
     mission_id: Optional[str] = None,
     type: Optional[str] = Query(None, alias="type"),
+    limit: int = Query(100, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     user_id: str = Depends(get_current_user)
 ):
-    """List all artifacts for the user with optional filters."""
-    artifacts = await db.get_artifacts(
-        user_id=user_id,
-        job_id=job_id,
-        mission_id=mission_id,
-        artifact_type=type,
-    )
+    """
+    List artifacts for the user with optional filters, newest first.
+
+    The response body stays a plain list; the cursor for the next page is
+    returned in the `X-Next-Cursor` header when more results exist.
+    """
+    try:
+        artifacts = await db.get_artifacts(
+            user_id=user_id,
+            job_id=job_id,
+            mission_id=mission_id,
+            artifact_type=type,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = next_page_cursor(artifacts, "created_at", limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [ArtifactResponse(**{**a, "id": str(a["id"]), "related_job_id": str(a["related_job_id"]) if a.get("related_job_id") else None}) for a in artifacts]
 
 @router.get("/{artifact_id}", response_model=ArtifactResponse)
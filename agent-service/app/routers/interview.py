@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from core.auth import get_current_user
 
@@ -24,9 +24,9 @@ class AnalyzeAnswerResponse(BaseModel):
 @router.get("/generate-question")
 async def generate_question(user_id: str = Depends(get_current_user)):
     """Generate a random behavioral interview question based on user context."""
-    from core.llm import LLMClient
+    from core.llm import get_llm_client
     from core.database import db
-    llm = LLMClient()
+    llm = get_llm_client()
     
     # Try to get user settings for context
     settings = await db.get_user_settings(user_id)
@@ -52,10 +52,9 @@ async def analyze_answer(
     Analyze an interview answer using the STAR method framework,
     returning structured feedback with score, strengths, and improvements.
     """
-    from core.llm import LLMClient
-    import json
+    from core.llm import get_llm_client
 
-    llm = LLMClient()
+    llm = get_llm_client()
 
     system_prompt = (
         "You are an expert interview coach. Evaluate the candidate's answer using the STAR method. "
@@ -70,11 +69,20 @@ async def analyze_answer(
     )
 
     try:
-        raw = await llm.chat(
+        data = await llm.chat_json(
             [{"role": "system", "content": system_prompt},
              {"role": "user", "content": user_prompt}],
+            schema=Dict[str, Any],
             temperature=0.4,
             max_tokens=800,
+            # Fallback if no parseable JSON after repair and one re-ask
+            fallback={
+                "score": 70,
+                "feedback": "Detailed feedback could not be generated for this answer. Please try again.",
+                "strengths": ["Clear communication"],
+                "improvements": ["Add more quantifiable results"],
+                "suggested_revision": "Consider restructuring with explicit Situation → Task → Action → Result flow.",
+            },
         )
     except Exception as e:
         print(f"CRITICAL LLM ERROR IN INTERVIEW: {e}")
@@ -82,28 +90,6 @@ async def analyze_answer(
         traceback.print_exc()
         raise
 
-    # Strip markdown fences if present
-    clean = raw.strip()
-    if clean.startswith("```"):
-        clean = clean.split("```")[1]
-        if clean.startswith("json"):
-            clean = clean[4:]
-    clean = clean.strip()
-
-    try:
-        data = json.loads(clean)
-    except Exception as e:
-        print(f"DEBUG: JSON Parse Error: {str(e)}")
-        print(f"DEBUG: Cleaned response: {clean}")
-        # Fallback if JSON parsing fails
-        data = {
-            "score": 70,
-            "feedback": raw[:500],
-            "strengths": ["Clear communication"],
-            "improvements": ["Add more quantifiable results"],
-            "suggested_revision": "Consider restructuring with explicit Situation → Task → Action → Result flow.",
-        }
-
     return AnalyzeAnswerResponse(
         score=int(data.get("score", 70)),
         feedback=data.get("feedback", ""),
@@ -9,7 +9,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
-from core.database import db
+from core.database import db, next_page_cursor
 from core.auth import get_current_user
 
 router = APIRouter()
@@ -39,6 +39,7 @@ class JobListResponse(BaseModel):
     total: int
     offset: int
     limit: int
+    next_cursor: Optional[str] = None
 
 
 # ========== Endpoints ==========
@@ -49,18 +50,25 @@ async def list_jobs(
     status: Optional[str] = Query(None, description="Filter by status"),
     limit: int = Query(50, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ):
     """
     List all jobs for the user.
     
-    Supports filtering by status and pagination.
+    Supports filtering by status and pagination. Prefer `cursor` over
+    `offset` for deep pages.
     """
-    jobs = await db.get_jobs(
-        user_id=user_id,
-        limit=limit,
-        offset=offset,
-        status=status,
-    )
+    try:
+        jobs = await db.get_jobs(
+            user_id=user_id,
+            limit=limit,
+            offset=offset,
+            status=status,
+            cursor=cursor,
+            projection="list",
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     total = await db.get_table_count("jobs", user_id, status)
     
@@ -70,8 +78,8 @@ async def list_jobs(
             title=j["title"],
             company=j["company"],
             location=j["location"],
-            description=j.get("description", "")[:200] + "..." if j.get("description") and len(j.get("description", "")) > 200 else j.get("description", ""),
-            url=j.get("job_url", j.get("url", "")),
+            description=(j.get("description") or "") + ("..." if j.get("description_truncated") else ""),
+            url=j.get("url") or "",
             source=j["source"],
             salary_range=j.get("salary_range"),
             job_type=j.get("job_type"),
@@ -81,6 +89,7 @@ async def list_jobs(
         total=total,
         offset=offset,
         limit=limit,
+        next_cursor=next_page_cursor(jobs, "scraped_at", limit),
     )
 
 
@@ -132,12 +141,16 @@ async def search_jobs(
     """
     Search jobs using vector similarity.
     
-    Uses embeddings to find semantically similar jobs.
+    Uses embeddings to find semantically similar jobs. Returns no results
+    (with `degraded` set) when the query cannot be embedded.
     """
-    from rag.embeddings import embeddings
+    from rag.embeddings import EmbeddingUnavailableError, embeddings
     
     # Generate query embedding
-    query_embedding = await embeddings.embed_text(query)
+    try:
+        query_embedding = await embeddings.embed_text(query)
+    except EmbeddingUnavailableError:
+        return {"query": query, "degraded": True, "results": []}
     
     # Search jobs
     jobs = await db.search_jobs_by_embedding(
@@ -148,6 +161,7 @@ async def search_jobs(
     
     return {
         "query": query,
+        "degraded": False,
         "results": [
             {
                 "id": str(j["id"]),
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
+import json
 import uuid
 import logging
 
-from core.database import db
+from core.database import db, next_page_cursor
 from core.auth import get_current_user
 
 logger = logging.getLogger(__name__)
@@ -23,6 +25,7 @@ class LinkedInPostListResponse(BaseModel):
     total: int
     offset: int
     limit: int
+    next_cursor: Optional[str] = None
 
 class GeneratePostRequest(BaseModel):
     topic: str
@@ -34,8 +37,12 @@ async def list_posts(
     status: Optional[str] = Query(None),
     limit: int = Query(20, le=50),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ):
-    posts = await db.get_linkedin_posts(user_id=user_id, status=status, limit=limit, offset=offset)
+    try:
+        posts = await db.get_linkedin_posts(user_id=user_id, status=status, limit=limit, offset=offset, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     total = await db.get_table_count("linkedin_posts", user_id, status)
     
     return LinkedInPostListResponse(
@@ -48,17 +55,25 @@ async def list_posts(
         ) for p in posts],
         total=total,
         offset=offset,
-        limit=limit
+        limit=limit,
+        next_cursor=next_page_cursor(posts, "created_at", limit),
     )
 
 @router.post("/generate")
 async def generate_post(
     request: GeneratePostRequest,
+    stream: bool = Query(False, description="Stream the draft as Server-Sent Events"),
     user_id: str = Depends(get_current_user),
 ):
-    from core.llm import LLMClient
+    """
+    Generate a LinkedIn post draft.
+
+    With `stream=true` the response is an SSE stream of `{"delta": ...}`
+    events followed by a final `{"done": true, "id", "content", "status"}`.
+    """
+    from core.llm import get_llm_client
     
-    llm = LLMClient()
+    llm = get_llm_client()
     
     # Build the LinkedIn post generation prompt
     prompt_messages = [
@@ -82,19 +97,39 @@ async def generate_post(
         },
     ]
     
-    content = await llm.chat(prompt_messages, temperature=0.75, max_tokens=600)
+    async def save_draft(content: str) -> dict:
+        async with db.connection() as conn:
+            post_id = await conn.fetchval(
+                """
+                INSERT INTO linkedin_posts (user_id, content, status)
+                VALUES ($1, $2, $3)
+                RETURNING id
+                """,
+                user_id, content, "draft"
+            )
+        return {"id": str(post_id), "content": content, "status": "draft"}
     
-    async with db.connection() as conn:
-        post_id = await conn.fetchval(
-            """
-            INSERT INTO linkedin_posts (user_id, content, status)
-            VALUES ($1, $2, $3)
-            RETURNING id
-            """,
-            user_id, content, "draft"
-        )
+    if not stream:
+        content = await llm.chat(prompt_messages, temperature=0.75, max_tokens=600)
+        return await save_draft(content)
+    
+    async def event_generator():
+        parts = []
+        try:
+            async for delta in llm.chat_stream(prompt_messages, temperature=0.75, max_tokens=600):
+                parts.append(delta)
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+            post = await save_draft("".join(parts))
+            yield f"data: {json.dumps({'done': True, **post})}\n\n"
+        except Exception as e:
+            logger.error(f"LinkedIn post stream failed: {e}")
+            yield f"data: {json.dumps({'error': 'Generation failed'})}\n\n"
     
-    return {"id": str(post_id), "content": content, "status": "draft"}
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/publish")
 async def publish_post(
@@ -0,0 +1,113 @@
+"""
+In-process caches shared by the service layer.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+# Returned by TTLCache.get on a miss, so None can be a cached value
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after `ttl` seconds.
+
+    Not thread-safe; intended for use from a single event loop. A `ttl` or
+    `maxsize` of 0 disables caching (every get is a miss).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for `key`, or MISSING."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return MISSING
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store `value`, evicting the least recently used entries past maxsize."""
+        if not self.enabled:
+            return
+        self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Any:
+        """Remove `key` and return its value (expired or not), or MISSING."""
+        entry = self._data.pop(key, None)
+        return MISSING if entry is None else entry[1]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._data),
+            "max_entries": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller starts `fn()` as a task; callers arriving while it runs
+    await the same task and receive its result or exception. The task is
+    shielded, so a cancelled caller does not cancel the call for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self.started += 1
+            task.add_done_callback(lambda t, key=key: self._finish(key, t))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,100 @@
+"""
+Process-wide HTTP and API clients.
+
+Provider clients share one keep-alive httpx connection pool (HTTP/2 when the
+`h2` package is installed), and the tiktoken encoder is loaded once. Building
+these per call costs a TLS handshake per provider and a tokenizer load, which
+dominates short LLM calls.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+import tiktoken
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_http_client: Optional[httpx.AsyncClient] = None
+_http2_enabled = False
+_openai_clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (httpx[http2])."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_http_client(settings=None) -> httpx.AsyncClient:
+    """Shared keep-alive connection pool used by every provider client."""
+    global _http_client, _http2_enabled
+    if _http_client is None or _http_client.is_closed:
+        settings = settings or get_settings()
+        http2 = _http2_enabled = settings.llm_http2 and http2_available()
+        _http_client = DefaultAsyncHttpxClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.llm_http_max_connections,
+                max_keepalive_connections=settings.llm_http_max_keepalive,
+                keepalive_expiry=settings.llm_http_keepalive_expiry,
+            ),
+        )
+        logger.info(f"LLM HTTP pool created (http2={http2})")
+    return _http_client
+
+
+def get_openai_client(api_key: str, base_url: Optional[str] = None, settings=None) -> AsyncOpenAI:
+    """Shared AsyncOpenAI client per (base_url, api_key), on the shared connection pool."""
+    key = (base_url or "", api_key)
+    client = _openai_clients.get(key)
+    if client is None or client.is_closed():
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=get_http_client(settings))
+        _openai_clients[key] = client
+    return client
+
+
+def get_encoding():
+    """The tiktoken encoder, loaded on first use and shared afterwards."""
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    _encoding = tiktoken.encoding_for_model("gpt-4")
+                except Exception:
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+    return _encoding
+
+
+async def warm_up():
+    """Load the encoder off the event loop at startup so no request pays for it."""
+    try:
+        await asyncio.to_thread(get_encoding)
+    except Exception as e:
+        logger.warning(f"Tokenizer preload failed, will retry on first use: {e}")
+
+
+async def close_clients():
+    """Close the shared connection pool (app shutdown)."""
+    global _http_client
+    _openai_clients.clear()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def get_client_metrics() -> dict:
+    return {
+        "http_pool_open": _http_client is not None and not _http_client.is_closed,
+        "http2": _http2_enabled,
+        "provider_clients": len(_openai_clients),
+        "encoder_loaded": _encoding is not None,
+    }
@@ -5,7 +5,8 @@ Uses Pydantic Settings for environment variable validation.
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Literal, Optional
+from typing import Dict, Literal, Optional
+from urllib.parse import parse_qs, urlparse
 
 
 class Settings(BaseSettings):
@@ -13,6 +14,25 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = Field(..., alias="DATABASE_URL")
+    # Direct (non-pooler) connection used for LISTEN/NOTIFY cache
+    # invalidation, which a transaction-mode pooler does not deliver.
+    # Not needed when DATABASE_URL is itself direct.
+    database_direct_url: Optional[str] = Field(None, alias="DATABASE_DIRECT_URL")
+    # Prepared statements cached per pooled connection. Unset: 100 on a
+    # direct DATABASE_URL, 0 behind PgBouncer / Neon "-pooler" hosts.
+    db_statement_cache_size: Optional[int] = Field(default=None, alias="DB_STATEMENT_CACHE_SIZE")
+    
+    # Connection pools per workload (see DatabaseService.POOL_KINDS)
+    db_pool_interactive_min_size: int = Field(default=2, alias="DB_POOL_INTERACTIVE_MIN_SIZE")
+    db_pool_interactive_max_size: int = Field(default=10, alias="DB_POOL_INTERACTIVE_MAX_SIZE")
+    db_pool_missions_min_size: int = Field(default=1, alias="DB_POOL_MISSIONS_MIN_SIZE")
+    db_pool_missions_max_size: int = Field(default=5, alias="DB_POOL_MISSIONS_MAX_SIZE")
+    db_pool_streaming_min_size: int = Field(default=1, alias="DB_POOL_STREAMING_MIN_SIZE")
+    db_pool_streaming_max_size: int = Field(default=3, alias="DB_POOL_STREAMING_MAX_SIZE")
+    
+    # users / user_settings read-through cache (0 disables)
+    user_cache_ttl_seconds: int = Field(default=300, alias="USER_CACHE_TTL_SECONDS")
+    user_cache_max_entries: int = Field(default=2048, alias="USER_CACHE_MAX_ENTRIES")
     
     # OpenRouter API
     openrouter_api_key: str = Field(..., alias="OPENROUTER_API_KEY")
@@ -37,6 +57,10 @@ class Settings(BaseSettings):
     
     # Backup LLM Providers
     gemini_api_key: Optional[str] = Field(None, alias="GEMINI_API_KEY")
+    gemini_base_url: str = Field(
+        default="https://generativelanguage.googleapis.com/v1beta/openai/",
+        alias="GEMINI_BASE_URL"
+    )
     openai_api_key: Optional[str] = Field(None, alias="OPENAI_API_KEY")
     
     # LLM Configuration
@@ -44,12 +68,85 @@ class Settings(BaseSettings):
     openai_model: str = Field(default="gpt-4o", alias="OPENAI_MODEL")
     temperature: float = Field(default=0.7, alias="TEMPERATURE")
     
+    # LLM response cache (opt-in). Calls are cached when they pass cache=True
+    # or run at or below LLM_CACHE_MAX_TEMPERATURE; cache=False bypasses it.
+    llm_cache_enabled: bool = Field(default=False, alias="LLM_CACHE_ENABLED")
+    llm_cache_path: str = Field(default=".cache/llm_responses.sqlite3", alias="LLM_CACHE_PATH")
+    llm_cache_ttl_seconds: int = Field(default=7 * 24 * 3600, alias="LLM_CACHE_TTL_SECONDS")
+    llm_cache_memory_entries: int = Field(default=512, alias="LLM_CACHE_MEMORY_ENTRIES")
+    llm_cache_max_temperature: float = Field(default=0.2, alias="LLM_CACHE_MAX_TEMPERATURE")
+    # Share one upstream call between concurrent identical requests
+    llm_coalesce_requests: bool = Field(default=True, alias="LLM_COALESCE_REQUESTS")
+    
+    # Shared per provider/model admission limits (see core/llm_limiter.py).
+    # LLM_PROVIDER_LIMITS overrides them as JSON keyed by "Provider" or
+    # "Provider:model", e.g. {"Gemini": {"rpm": 15, "tpm": 1000000}}
+    llm_max_concurrency: int = Field(default=4, alias="LLM_MAX_CONCURRENCY")
+    llm_rpm: int = Field(default=60, alias="LLM_RPM")
+    llm_tpm: int = Field(default=1_000_000, alias="LLM_TPM")
+    llm_provider_limits: Dict[str, Dict[str, int]] = Field(default_factory=dict, alias="LLM_PROVIDER_LIMITS")
+    
+    # Provider circuit breaker (see core/llm_health.py)
+    llm_breaker_failure_threshold: int = Field(default=3, alias="LLM_BREAKER_FAILURE_THRESHOLD")
+    llm_breaker_cooldown_seconds: float = Field(default=30.0, alias="LLM_BREAKER_COOLDOWN_SECONDS")
+    
+    # Hedged chat requests: if the primary has not answered by this percentile
+    # of its recent latency (and at least MIN_DELAY), the request is also sent
+    # to the next healthy provider; the first answer wins. BUDGET is the
+    # fraction of calls that may be duplicated.
+    llm_hedge_enabled: bool = Field(default=False, alias="LLM_HEDGE_ENABLED")
+    llm_hedge_percentile: float = Field(default=0.95, alias="LLM_HEDGE_PERCENTILE")
+    llm_hedge_min_delay_seconds: float = Field(default=2.0, alias="LLM_HEDGE_MIN_DELAY_SECONDS")
+    llm_hedge_min_samples: int = Field(default=20, alias="LLM_HEDGE_MIN_SAMPLES")
+    llm_hedge_budget: float = Field(default=0.05, alias="LLM_HEDGE_BUDGET")
+    
+    # Shared provider connection pool (see core/clients.py)
+    llm_http2: bool = Field(default=True, alias="LLM_HTTP2")
+    llm_http_max_connections: int = Field(default=50, alias="LLM_HTTP_MAX_CONNECTIONS")
+    llm_http_max_keepalive: int = Field(default=20, alias="LLM_HTTP_MAX_KEEPALIVE")
+    llm_http_keepalive_expiry: float = Field(default=60.0, alias="LLM_HTTP_KEEPALIVE_EXPIRY")
+    
+    # Prompt packing budget (see core/prompt_budget.py): context window per
+    # model, falling back to LLM_CONTEXT_WINDOW, and a cap on prompt size
+    llm_context_window: int = Field(default=32768, alias="LLM_CONTEXT_WINDOW")
+    llm_context_windows: Dict[str, int] = Field(default_factory=dict, alias="LLM_CONTEXT_WINDOWS")
+    llm_max_prompt_tokens: int = Field(default=12000, alias="LLM_MAX_PROMPT_TOKENS")
+    
+    # Native structured output for chat_json: "json_schema", "json_object" or "off"
+    llm_structured_output: str = Field(default="json_object", alias="LLM_STRUCTURED_OUTPUT")
+    
+    # Per-call LLM telemetry (core/llm_telemetry.py): aggregates on /metrics
+    # and rows in llm_calls, written in batches every FLUSH_SECONDS.
+    # Prices are USD per million tokens: {"model": {"prompt": x, "completion": y}}
+    llm_telemetry_enabled: bool = Field(default=True, alias="LLM_TELEMETRY_ENABLED")
+    llm_telemetry_flush_seconds: float = Field(default=5.0, alias="LLM_TELEMETRY_FLUSH_SECONDS")
+    llm_model_prices: Dict[str, Dict[str, float]] = Field(default_factory=dict, alias="LLM_MODEL_PRICES")
+    
     # Embedding model (using OpenAI-compatible via OpenRouter)
     embedding_model: str = Field(
         default="openai/text-embedding-3-small",
         alias="EMBEDDING_MODEL"
     )
     
+    # Embedding backend (see rag/embedding_backends.py): "api", or "local" for
+    # deterministic offline embeddings. EMBEDDING_FALLBACK=local gives stored
+    # texts the API fails on a local vector, flagged for re-embedding; "none"
+    # leaves them unembedded. Search queries never fall back.
+    embedding_backend: str = Field(default="api", alias="EMBEDDING_BACKEND")
+    embedding_fallback: str = Field(default="local", alias="EMBEDDING_FALLBACK")
+    
+    # Content-hash embedding cache (see rag/embedding_cache.py): LRU in front
+    # of the embedding_cache table
+    embedding_cache_enabled: bool = Field(default=True, alias="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_memory_entries: int = Field(default=2048, alias="EMBEDDING_CACHE_MEMORY_ENTRIES")
+    
+    # embed_texts batching: texts and tokens per request, requests in flight,
+    # and attempts per batch
+    embedding_batch_size: int = Field(default=100, alias="EMBEDDING_BATCH_SIZE")
+    embedding_batch_max_tokens: int = Field(default=100_000, alias="EMBEDDING_BATCH_MAX_TOKENS")
+    embedding_max_concurrency: int = Field(default=4, alias="EMBEDDING_MAX_CONCURRENCY")
+    embedding_max_retries: int = Field(default=3, alias="EMBEDDING_MAX_RETRIES")
+    
     # CORS
     allowed_origins: str = Field(
         default="http://localhost:3000",
@@ -73,6 +170,25 @@ class Settings(BaseSettings):
         """Parse allowed origins into a list."""
         return [origin.strip() for origin in self.allowed_origins.split(",")]
     
+    @property
+    def database_is_pooled(self) -> bool:
+        """Whether DATABASE_URL goes through a transaction-mode pooler."""
+        return is_pooler_url(self.database_url)
+    
+    @property
+    def statement_cache_size(self) -> int:
+        """Effective DB_STATEMENT_CACHE_SIZE: off behind a pooler unless set explicitly."""
+        if self.db_statement_cache_size is not None:
+            return self.db_statement_cache_size
+        return 0 if self.database_is_pooled else 100
+    
+    @property
+    def listen_database_url(self) -> Optional[str]:
+        """Connection for LISTEN/NOTIFY, or None when only a pooler is configured."""
+        if self.database_direct_url:
+            return self.database_direct_url
+        return None if self.database_is_pooled else self.database_url
+    
     @property
     def current_model(self) -> str:
         """Get the current LLM model based on mode."""
@@ -84,6 +200,14 @@ class Settings(BaseSettings):
         extra = "ignore"
 
 
+def is_pooler_url(url: str) -> bool:
+    """True for PgBouncer-style pooled connection strings (Neon "-pooler" hosts, ?pgbouncer=true)."""
+    parsed = urlparse(url)
+    if "-pooler" in (parsed.hostname or ""):
+        return True
+    return parse_qs(parsed.query).get("pgbouncer", [""])[0].lower() == "true"
+
+
 def get_settings() -> Settings:
     """Get settings instance (reads from .env on every call)."""
     return Settings()
@@ -4,13 +4,118 @@ Uses asyncpg for high-performance PostgreSQL operations.
 """
 
 import asyncpg
-from asyncpg import Pool
-from typing import Optional, Any, List, Dict
-from contextlib import asynccontextmanager
+from asyncpg import Pool, Connection
+from pgvector.asyncpg import register_vector
+from typing import Optional, Any, List, Dict, Tuple
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from collections import deque
+from dataclasses import dataclass, field
+from functools import wraps
+import asyncio
+import base64
+import binascii
 import json
+import logging
+import time
 from datetime import datetime
 
 from core.config import get_settings
+from core.cache import TTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+# Errors raised when a cached prepared statement or type codec no longer
+# matches the schema (e.g. after ALTER TABLE on a `SELECT *` target)
+STALE_STATEMENT_ERRORS = (
+    asyncpg.exceptions.InvalidCachedStatementError,
+    asyncpg.exceptions.OutdatedSchemaCacheError,
+)
+
+
+def encode_cursor(sort_value: datetime, row_id: Any) -> str:
+    """Encode a keyset position (sort timestamp, row id) as an opaque token."""
+    payload = json.dumps([sort_value.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a token from `encode_cursor`. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def next_page_cursor(rows: List[Dict], sort_field: str, limit: int) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this was the last page."""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last[sort_field], last["id"])
+
+
+# Pool used by DatabaseService.connection() when no kind is passed explicitly
+_current_pool_kind: ContextVar[str] = ContextVar("db_pool_kind", default="interactive")
+
+
+@dataclass
+class PoolStats:
+    """Acquire telemetry for one named pool."""
+    acquires: int = 0
+    acquire_errors: int = 0
+    waiting: int = 0  # callers currently queued in acquire()
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    recent_waits: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+    def record_wait(self, seconds: float):
+        self.acquires += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self.recent_waits.append(seconds)
+
+    def snapshot(self, pool: Optional[Pool]) -> Dict[str, Any]:
+        """Metrics for this pool; wait times are in milliseconds."""
+        waits = sorted(self.recent_waits)
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        size = pool.get_size() if pool else 0
+        idle = pool.get_idle_size() if pool else 0
+        return {
+            "size": size,
+            "in_use": size - idle,
+            "idle": idle,
+            "min_size": pool.get_min_size() if pool else 0,
+            "max_size": pool.get_max_size() if pool else 0,
+            "queue_depth": self.waiting,
+            "acquires": self.acquires,
+            "acquire_errors": self.acquire_errors,
+            "wait_avg_ms": round(self.wait_total / self.acquires * 1000, 2) if self.acquires else 0.0,
+            "wait_p95_ms": round(p95 * 1000, 2),
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+        }
+
+
+def retry_on_stale_statement(func):
+    """
+    Retry a DatabaseService method once after a stale-statement error.
+
+    asyncpg already re-prepares and retries single statements that fail
+    outside a transaction; this covers the rest (transactions, codec
+    changes) by resetting the pool's statement caches and re-running the
+    whole method.
+    """
+    @wraps(func)
+    async def wrapper(cls, *args, **kwargs):
+        try:
+            return await func(cls, *args, **kwargs)
+        except STALE_STATEMENT_ERRORS as e:
+            logger.warning(f"Stale prepared statement in {func.__name__}, retrying: {e}")
+            await cls.reset_statement_cache()
+            return await func(cls, *args, **kwargs)
+    return wrapper
 
 
 class DatabaseService:
@@ -19,69 +124,333 @@ class DatabaseService:
     Provides CRUD operations and vector search capabilities.
     """
     
-    _pool: Optional[Pool] = None
+    _pools: Dict[str, Pool] = {}
+    _pool_stats: Dict[str, PoolStats] = {}
+    _pool_locks: Dict[str, asyncio.Lock] = {}  # per kind, plus "listener"
+    _listener: Optional[Connection] = None
+    _schema_version: Optional[int] = None
+    _statement_cache_enabled: bool = False
+    _listener_skipped: bool = False
+
+    # Read-through caches for get_user / get_user_settings, invalidated
+    # locally on write and across processes via the user_cache channel
+    _user_cache = TTLCache()
+    _settings_cache = TTLCache()
+
+    # Named pools so bursts of one workload cannot starve the others:
+    # API reads, mission runner writes, and SSE polling
+    POOL_KINDS = ("interactive", "missions", "streaming")
+
+    # Tables whose per-user totals are maintained in user_counters (migration 009)
+    COUNTED_TABLES = ("jobs", "applications", "resumes", "linkedin_posts", "missions")
+    ACTIVE_MISSION_STATUSES = ("running", "pending", "waiting_approval")
+
+    # Hot single-row lookups, prepared on every new pooled connection. The
+    # methods below use these exact strings so they hit the statement cache.
+    SQL_USER_BY_ID = "SELECT * FROM users WHERE id = $1"
+    SQL_USER_BY_EMAIL = "SELECT * FROM users WHERE email = $1"
+    SQL_USER_SETTINGS = "SELECT * FROM user_settings WHERE user_id = $1"
+    SQL_JOB_BY_ID = "SELECT * FROM jobs WHERE id = $1 AND user_id = $2"
+    SQL_MISSION_BY_ID = "SELECT * FROM missions WHERE id = $1"
+    SQL_USER_COUNTERS = "SELECT * FROM user_counters WHERE user_id = $1"
+    HOT_STATEMENTS = (
+        (SQL_USER_BY_ID, 1),
+        (SQL_USER_BY_EMAIL, 1),
+        (SQL_USER_SETTINGS, 1),
+        (SQL_JOB_BY_ID, 2),
+        (SQL_MISSION_BY_ID, 1),
+        (SQL_USER_COUNTERS, 1),
+    )
+
+    # Mission context values that are stored in mission_context_blobs
+    # (migration 013) with only a reference left in missions.context
+    OFFLOADED_CONTEXT_KEYS = ("scraped_jobs", "new_jobs", "original_resume")
+    CONTEXT_INLINE_LIMIT = 16 * 1024  # bytes of JSON; larger values are offloaded too
+
+    # Column sets for get_jobs; none of the lean ones carry the embedding
+    JOB_PROJECTIONS = {
+        "full": "*",
+        # List view: description is a 200-char snippet cut in SQL
+        "list": (
+            "id, title, company, location, left(description, 200) AS description, "
+            "length(description) > 200 AS description_truncated, url, source, "
+            "salary_range, job_type, status, scraped_at"
+        ),
+        # Duplicate detection only compares URLs and title+company keys
+        "dedup": "id, url, title, company",
+        # Skill analysis trims descriptions to its token budget (pack_sections);
+        # the cap only bounds pathological scrapes. Rows go into mission
+        # context, so only JSON-safe values
+        "analysis": "id::text AS id, title, company, left(description, 50000) AS description",
+    }
     
     @classmethod
-    async def get_table_count(cls, table_name: str, user_id: str, status: Optional[str] = None) -> int:
-        """Count records in a table for a user with optional status filter."""
-        query = f"SELECT count(*) FROM {table_name} WHERE user_id = $1"
-        params = [user_id]
-        if status:
-            query += " AND status = $2"
-            params.append(status)
-        async with cls.connection() as conn:
-            return await conn.fetchval(query, *params) or 0
+    async def get_pool(cls, kind: str = "interactive") -> Pool:
+        """
+        Get or create the connection pool for a workload.
+
+        Args:
+            kind: One of POOL_KINDS; sizes come from the DB_POOL_<KIND>_* settings.
+        """
+        if kind not in cls.POOL_KINDS:
+            raise ValueError(f"Unknown pool kind: {kind}")
+        if kind not in cls._pools:
+            # Concurrent first callers (warm-up, the first burst of requests)
+            # would each create a pool and leak all but one
+            async with cls._pool_locks.setdefault(kind, asyncio.Lock()):
+                if kind not in cls._pools:
+                    await cls._create_pool(kind)
+        return cls._pools[kind]
 
     @classmethod
-    async def get_pool(cls) -> Pool:
-        """Get or create the connection pool."""
-        if cls._pool is None:
-            settings = get_settings()
+    async def _create_pool(cls, kind: str):
+        """Create the `kind` pool, and the invalidation listener with the first pool."""
+        settings = get_settings()
+        cache_size = settings.statement_cache_size
+        cls._statement_cache_enabled = cache_size > 0
+        for cache in (cls._user_cache, cls._settings_cache):
+            cache.maxsize = settings.user_cache_max_entries
+            cache.ttl = settings.user_cache_ttl_seconds
+        try:
+            cls._pools[kind] = await asyncpg.create_pool(
+                settings.database_url,
+                min_size=getattr(settings, f"db_pool_{kind}_min_size"),
+                max_size=getattr(settings, f"db_pool_{kind}_max_size"),
+                command_timeout=60,
+                statement_cache_size=cache_size,
+                init=cls._init_connection,
+            )
+        except asyncpg.PostgresError as e:
+            raise Exception(f"Failed to connect to database: {e}") from e
+        except Exception as e:
+            raise Exception(f"Unexpected database connection error: {e}") from e
+        cls._pool_stats.setdefault(kind, PoolStats())
+        async with cls._pool_locks.setdefault("listener", asyncio.Lock()):
+            if cls._listener is None and not cls._listener_skipped:
+                await cls._start_listener(settings.listen_database_url)
+    
+    @staticmethod
+    async def _init_connection(conn: Connection):
+        """
+        Per-connection setup hook for the pool.
+
+        Registers the binary pgvector codec so embeddings are sent and received
+        as float32 buffers. Parameters accept lists or numpy arrays directly.
+        """
+        await register_vector(conn)
+        await DatabaseService._prepare_hot_statements(conn)
+
+    @classmethod
+    async def _prepare_hot_statements(cls, conn: Connection):
+        """
+        Warm the connection's statement cache with HOT_STATEMENTS.
+
+        Each statement is run once with NULL arguments (matching no rows),
+        which parses, plans and caches it through the normal query path.
+        """
+        if not cls._statement_cache_enabled:
+            return
+        for query, nargs in cls.HOT_STATEMENTS:
             try:
-                cls._pool = await asyncpg.create_pool(
-                    settings.database_url,
-                    min_size=2,
-                    max_size=10,
-                    command_timeout=60,
-                    statement_cache_size=0,  # Fix for schema change errors
-                )
+                await conn.fetchrow(query, *([None] * nargs))
             except asyncpg.PostgresError as e:
-                raise Exception(f"Failed to connect to database: {e}") from e
-            except Exception as e:
-                raise Exception(f"Unexpected database connection error: {e}") from e
-        return cls._pool
-    
+                # A missing table (e.g. before migrations) must not block the pool
+                logger.warning(f"Could not prepare hot statement {query!r}: {e}")
+
+    @classmethod
+    async def _start_listener(cls, database_url: Optional[str]):
+        """
+        Open the LISTEN connection used for cross-process invalidation.
+
+        - `user_cache` (migration 012): triggers on users/user_settings send
+          the user id; the cached rows for it are dropped.
+        - `schema_version` (migration 011, only with the statement cache on):
+          migrations call bump_schema_version(); every pooled connection is
+          then replaced so no statement prepared against the old schema is reused.
+
+        Without a listener, caches still expire by TTL and stale statements
+        are recovered per call. Notifications need a direct connection:
+        behind a transaction-mode pooler `database_url` is None (see
+        Settings.listen_database_url) and the listener is skipped.
+        """
+        if database_url is None:
+            cls._listener_skipped = True
+            logger.warning(
+                "DATABASE_URL goes through a transaction-mode pooler, which does not deliver "
+                "LISTEN/NOTIFY; cross-process cache invalidation is off. Set DATABASE_DIRECT_URL "
+                "to a direct connection to enable it."
+            )
+            return
+        try:
+            listener = await asyncpg.connect(database_url, statement_cache_size=0)
+            await listener.add_listener("user_cache", cls._on_user_changed)
+        except (asyncpg.PostgresError, OSError) as e:
+            logger.warning(f"Invalidation listener unavailable, relying on TTLs and per-call recovery: {e}")
+            return
+        
+        if cls._statement_cache_enabled:
+            try:
+                cls._schema_version = await listener.fetchval("SELECT version FROM schema_version")
+                await listener.add_listener("schema_version", cls._on_schema_version)
+            except asyncpg.PostgresError as e:
+                logger.warning(f"Schema version tracking unavailable: {e}")
+        cls._listener = listener
+
+    @classmethod
+    def _on_schema_version(cls, conn: Connection, pid: int, channel: str, payload: str):
+        """Notification callback: reset statement caches when the version moves."""
+        try:
+            version = int(payload)
+        except ValueError:
+            version = None
+        if version is not None and version == cls._schema_version:
+            return
+        logger.info(f"Schema version changed ({cls._schema_version} -> {payload}), resetting statement cache")
+        cls._schema_version = version
+        asyncio.ensure_future(cls.reset_statement_cache())
+
+    @classmethod
+    def _on_user_changed(cls, conn: Connection, pid: int, channel: str, payload: str):
+        """Notification callback: drop cached user/settings rows for the user."""
+        cls.invalidate_user(payload)
+
+    @classmethod
+    def invalidate_user(cls, user_id: str):
+        """Drop the cached users and user_settings rows for `user_id` in this process."""
+        cls._user_cache.pop(("id", str(user_id)))
+        cls._settings_cache.pop(str(user_id))
+
+    @classmethod
+    def get_cache_metrics(cls) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss counters and sizes of the read-through caches."""
+        return {
+            "users": cls._user_cache.stats(),
+            "user_settings": cls._settings_cache.stats(),
+        }
+
+    @classmethod
+    async def reset_statement_cache(cls):
+        """
+        Drop cached prepared statements on every pooled connection.
+
+        Idle connections are closed and replaced on next acquire; busy ones
+        are replaced when released, so in-flight queries are not interrupted.
+        """
+        for pool in list(cls._pools.values()):
+            await pool.expire_connections()
+
     @classmethod
     async def close_pool(cls):
-        """Close the connection pool."""
-        if cls._pool:
-            await cls._pool.close()
-            cls._pool = None
+        """Close all connection pools."""
+        if cls._listener:
+            await cls._listener.close()
+            cls._listener = None
+        cls._listener_skipped = False
+        cls._pool_locks = {}
+        pools, cls._pools = cls._pools, {}
+        for pool in pools.values():
+            await pool.close()
     
     @classmethod
     @asynccontextmanager
-    async def connection(cls):
-        """Get a connection from the pool."""
-        pool = await cls.get_pool()
-        async with pool.acquire() as conn:
+    async def connection(cls, kind: Optional[str] = None):
+        """
+        Get a connection from a named pool.
+
+        Without `kind`, uses the pool selected by the enclosing `use_pool()`
+        block (default "interactive"). Acquire wait and queue depth are
+        recorded for get_pool_metrics().
+        """
+        kind = kind or _current_pool_kind.get()
+        pool = await cls.get_pool(kind)
+        stats = cls._pool_stats[kind]
+        
+        stats.waiting += 1
+        started = time.perf_counter()
+        try:
+            conn = await pool.acquire()
+        except Exception:
+            stats.acquire_errors += 1
+            raise
+        finally:
+            stats.waiting -= 1
+        stats.record_wait(time.perf_counter() - started)
+        
+        try:
             yield conn
+        finally:
+            await pool.release(conn)
+
+    @classmethod
+    @contextmanager
+    def use_pool(cls, kind: str):
+        """Route connection() calls made inside this block to the `kind` pool."""
+        if kind not in cls.POOL_KINDS:
+            raise ValueError(f"Unknown pool kind: {kind}")
+        token = _current_pool_kind.set(kind)
+        try:
+            yield
+        finally:
+            _current_pool_kind.reset(token)
+
+    @classmethod
+    def get_pool_metrics(cls) -> Dict[str, Dict[str, Any]]:
+        """Per-pool size, in-use count, queue depth and acquire wait times."""
+        return {
+            kind: cls._pool_stats[kind].snapshot(cls._pools.get(kind))
+            for kind in cls.POOL_KINDS
+            if kind in cls._pool_stats
+        }
+
+    @staticmethod
+    def _keyset_clause(cursor: str, sort_column: str, id_column: str, params: list) -> str:
+        """
+        Build the `(sort, id) < (...)` predicate for a descending keyset page.
+        Appends the decoded cursor values to `params`.
+        """
+        sort_value, row_id = decode_cursor(cursor)
+        params.extend([sort_value, row_id])
+        return f" AND ({sort_column}, {id_column}) < (${len(params)-1}, ${len(params)})"
     
     # ========== User Operations ==========
     
     @classmethod
+    @retry_on_stale_statement
     async def get_user(cls, user_id: str) -> Optional[Dict]:
-        """Get user by ID or Email."""
+        """
+        Get user by ID or Email.
+
+        Found rows are cached by id (see invalidate_user); e-mail lookups
+        cache the e-mail -> id mapping and then read the id entry. Missing
+        users are not cached, so a user created elsewhere is seen at once.
+        """
+        if "@" in user_id:
+            cached_id = cls._user_cache.get(("email", user_id))
+            cached = MISSING if cached_id is MISSING else cls._user_cache.get(("id", cached_id))
+            if cached is not MISSING and cached["email"] == user_id:
+                return cached
+        else:
+            cached = cls._user_cache.get(("id", user_id))
+            if cached is not MISSING:
+                return cached
+        
         async with cls.connection() as conn:
             if "@" in user_id:
-                return await conn.fetchrow(
-                    "SELECT * FROM users WHERE email = $1",
+                row = await conn.fetchrow(
+                    cls.SQL_USER_BY_EMAIL,
                     user_id
                 )
             else:
-                return await conn.fetchrow(
-                    "SELECT * FROM users WHERE id = $1",
+                row = await conn.fetchrow(
+                    cls.SQL_USER_BY_ID,
                     user_id
                 )
+        
+        if row:
+            cls._user_cache.set(("id", str(row["id"])), row)
+            if row["email"]:
+                cls._user_cache.set(("email", row["email"]), str(row["id"]))
+        return row
 
     @classmethod
     async def update_user_name(cls, user_id: str, name: str) -> bool:
@@ -91,7 +460,9 @@ class DatabaseService:
                 "UPDATE users SET name = $1 WHERE id = $2",
                 name, user_id
             )
-            return True
+        # Other processes are notified by the users trigger (migration 012)
+        cls.invalidate_user(user_id)
+        return True
     
     # ========== Job Operations ==========
     
@@ -111,8 +482,6 @@ class DatabaseService:
     ) -> str:
         """Create a new job listing."""
         async with cls.connection() as conn:
-            # Convert list to string for pgvector insertion
-            embed_str = str(embedding) if embedding is not None else None
             job_id = await conn.fetchval(
                 """
                 INSERT INTO jobs (user_id, title, company, location, description, job_url, url, source, embedding, salary_range, job_type)
@@ -121,16 +490,87 @@ class DatabaseService:
                 RETURNING id
                 """,
                 user_id, title, company, location, description, url, source,
-                embed_str, salary_range, job_type
+                embedding, salary_range, job_type
             )
             return str(job_id) if job_id else None
-    
+
+    @classmethod
+    @retry_on_stale_statement
+    async def create_jobs_bulk(cls, user_id: str, jobs: List[Dict]) -> List[Optional[str]]:
+        """
+        Insert a batch of scraped jobs in a single transaction.
+
+        Rows are COPYed into a temporary staging table and moved into `jobs`
+        with one INSERT ... SELECT, so the whole batch costs a handful of round
+        trips instead of one per job. Each job dict uses the same keys as the
+        `create_job` arguments.
+
+        Returns:
+            Inserted job ids aligned with the input order. Entries are None for
+            jobs skipped by the (user_id, url) conflict rule, matching `create_job`.
+        """
+        if not jobs:
+            return []
+
+        records = [
+            (
+                idx,
+                job["title"],
+                job["company"],
+                job.get("location"),
+                job.get("description"),
+                job["url"],
+                job.get("source"),
+                job.get("embedding"),
+                job.get("salary_range"),
+                job.get("job_type"),
+                bool(job.get("embedding_degraded")),
+            )
+            for idx, job in enumerate(jobs)
+        ]
+
+        async with cls.connection() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    CREATE TEMP TABLE jobs_staging (
+                        ord INT, title TEXT, company TEXT, location TEXT, description TEXT,
+                        url TEXT, source TEXT, embedding vector, salary_range TEXT, job_type TEXT,
+                        embedding_degraded BOOLEAN
+                    ) ON COMMIT DROP
+                    """
+                )
+                await conn.copy_records_to_table("jobs_staging", records=records)
+                rows = await conn.fetch(
+                    """
+                    INSERT INTO jobs (
+                        user_id, title, company, location, description, job_url, url, source,
+                        embedding, salary_range, job_type, embedding_degraded
+                    )
+                    SELECT DISTINCT ON (url) $1, title, company, location, description, url, url, source,
+                        embedding, salary_range, job_type, embedding_degraded
+                    FROM jobs_staging
+                    ORDER BY url, ord
+                    ON CONFLICT (user_id, url) DO NOTHING
+                    RETURNING id, url
+                    """,
+                    user_id,
+                )
+
+        inserted = {row["url"]: str(row["id"]) for row in rows}
+        # Only the first occurrence of a duplicated URL within the batch owns its id
+        job_ids: List[Optional[str]] = []
+        for job in jobs:
+            job_ids.append(inserted.pop(job["url"], None))
+        return job_ids
+
     @classmethod
+    @retry_on_stale_statement
     async def get_job_by_id(cls, job_id: str, user_id: str) -> Optional[Dict]:
         """Get a specific job by ID and user_id."""
         async with cls.connection() as conn:
             row = await conn.fetchrow(
-                "SELECT * FROM jobs WHERE id = $1 AND user_id = $2",
+                cls.SQL_JOB_BY_ID,
                 job_id, user_id
             )
             return dict(row) if row else None
@@ -142,17 +582,33 @@ class DatabaseService:
         limit: int = 50,
         offset: int = 0,
         status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        projection: str = "full",
     ) -> List[Dict]:
-        """Get jobs for a user."""
+        """
+        Get jobs for a user, newest first.
+
+        Pass the `next_page_cursor(rows, "scraped_at", limit)` of the previous
+        page as `cursor` to seek past it instead of using `offset`.
+        `projection` names a column set in JOB_PROJECTIONS; anything other
+        than "full" leaves the embedding and full description in the database.
+        """
+        if projection not in cls.JOB_PROJECTIONS:
+            raise ValueError(f"Unknown job projection: {projection}")
+        
         async with cls.connection() as conn:
-            query = "SELECT * FROM jobs WHERE user_id = $1"
+            query = f"SELECT {cls.JOB_PROJECTIONS[projection]} FROM jobs WHERE user_id = $1"
             params = [user_id]
             
             if status:
                 query += " AND status = $2"
                 params.append(status)
+
+            if cursor:
+                query += cls._keyset_clause(cursor, "scraped_at", "id", params)
+                offset = 0
             
-            query += " ORDER BY scraped_at DESC LIMIT $%d OFFSET $%d" % (len(params)+1, len(params)+2)
+            query += " ORDER BY scraped_at DESC, id DESC LIMIT $%d OFFSET $%d" % (len(params)+1, len(params)+2)
             params.extend([limit, offset])
             
             rows = await conn.fetch(query, *params)
@@ -177,17 +633,15 @@ class DatabaseService:
     ) -> List[Dict]:
         """Vector similarity search for jobs."""
         async with cls.connection() as conn:
-            # Convert list to string for pgvector search
-            embed_str = str(embedding)
             rows = await conn.fetch(
                 """
                 SELECT *, 1 - (embedding <=> $2::vector) as similarity
                 FROM jobs
-                WHERE user_id = $1 AND embedding IS NOT NULL
+                WHERE user_id = $1 AND embedding IS NOT NULL AND NOT embedding_degraded
                 ORDER BY embedding <=> $2::vector
                 LIMIT $3
                 """,
-                user_id, embed_str, limit
+                user_id, embedding, limit
             )
             return [dict(row) for row in rows]
     
@@ -202,19 +656,19 @@ class DatabaseService:
         content: str,
         embedding: Optional[List[float]] = None,
         metadata: Optional[Dict] = None,
+        embedding_degraded: bool = False,
     ) -> str:
-        """Create a resume chunk with embedding."""
+        """Create a resume chunk with embedding (`embedding_degraded` flags a local fallback vector)."""
         async with cls.connection() as conn:
-            # Convert list to string for pgvector insertion
-            embed_str = str(embedding) if embedding is not None else None
             chunk_id = await conn.fetchval(
                 """
-                INSERT INTO resume_chunks (user_id, resume_id, chunk_type, content, embedding, metadata)
-                VALUES ($1, $2, $3, $4, $5::vector, $6)
+                INSERT INTO resume_chunks (user_id, resume_id, chunk_type, content, embedding, metadata, embedding_degraded)
+                VALUES ($1, $2, $3, $4, $5::vector, $6, $7)
                 RETURNING id
                 """,
-                user_id, resume_id, chunk_type, content, embed_str,
-                json.dumps(metadata) if metadata else None
+                user_id, resume_id, chunk_type, content, embedding,
+                json.dumps(metadata) if metadata else None,
+                embedding_degraded,
             )
             return str(chunk_id)
     
@@ -228,14 +682,12 @@ class DatabaseService:
     ) -> List[Dict]:
         """Vector search for resume chunks with optional type filtering."""
         async with cls.connection() as conn:
-            # Convert list to string for pgvector search
-            embed_str = str(embedding)
             query = """
                 SELECT *, 1 - (embedding <=> $2::vector) as similarity
                 FROM resume_chunks
-                WHERE user_id = $1 AND embedding IS NOT NULL
+                WHERE user_id = $1 AND embedding IS NOT NULL AND NOT embedding_degraded
             """
-            params = [user_id, embed_str]
+            params = [user_id, embedding]
             
             if chunk_types:
                 query += " AND chunk_type = ANY($3)"
@@ -316,56 +768,52 @@ class DatabaseService:
         cls,
         user_id: str,
         limit: int = 50,
-        offset: int = 0
-    ) -> List[Dict]:
-        """List applications for a user."""
-        async with cls.connection() as conn:
-            rows = await conn.fetch(
-                """
-                SELECT a.*, j.title as job_title, j.company as job_company 
-                FROM applications a
-                JOIN jobs j ON a.job_id = j.id
-                WHERE a.user_id = $1 
-                ORDER BY a.applied_at DESC 
-                LIMIT $2 OFFSET $3
-                """,
-                user_id, limit, offset
-            )
-            return [dict(row) for row in rows]
-    
-    @classmethod
-    async def get_linkedin_posts(
-        cls,
-        user_id: str,
-        status: Optional[str] = None,
-        limit: int = 20,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> List[Dict]:
-        """List LinkedIn posts for a user."""
+        """List applications for a user, keyset-paginated on (applied_at, id) when `cursor` is given."""
+        query = """
+            SELECT a.*, j.title as job_title, j.company as job_company 
+            FROM applications a
+            JOIN jobs j ON a.job_id = j.id
+            WHERE a.user_id = $1
+        """
+        params: list = [user_id]
+
+        if cursor:
+            query += cls._keyset_clause(cursor, "a.applied_at", "a.id", params)
+            offset = 0
+
+        query += f" ORDER BY a.applied_at DESC, a.id DESC LIMIT ${len(params)+1} OFFSET ${len(params)+2}"
+        params.extend([limit, offset])
+
         async with cls.connection() as conn:
-            query = "SELECT * FROM linkedin_posts WHERE user_id = $1"
-            params = [user_id]
-            if status:
-                query += " AND status = $2"
-                params.append(status)
-            
-            query += f" ORDER BY created_at DESC LIMIT ${len(params)+1} OFFSET ${len(params)+2}"
-            params.extend([limit, offset])
-            
             rows = await conn.fetch(query, *params)
             return [dict(row) for row in rows]
     
     # ========== User Settings Operations ==========
     
     @classmethod
+    @retry_on_stale_statement
     async def get_user_settings(cls, user_id: str) -> Optional[Dict]:
-        """Get user settings including Knowledge Base."""
+        """Get user settings including Knowledge Base (cached, see invalidate_user)."""
+        # Same key as invalidate_user, whatever type the caller passes
+        key = str(user_id)
+        cached = cls._settings_cache.get(key)
+        if cached is not MISSING:
+            return dict(cached)
+        
         async with cls.connection() as conn:
             row = await conn.fetchrow(
-                "SELECT * FROM user_settings WHERE user_id = $1",
+                cls.SQL_USER_SETTINGS,
                 user_id
             )
-            return dict(row) if row else None
+        if not row:
+            return None
+        
+        settings = dict(row)
+        cls._settings_cache.set(key, settings)
+        return dict(settings)
     
     @classmethod
     async def upsert_user_settings(
@@ -390,7 +838,9 @@ class DatabaseService:
                 user_id, target_roles, target_locations,
                 json.dumps(knowledge_base) if knowledge_base else None
             )
-            return True
+        # Other processes are notified by the user_settings trigger (migration 012)
+        cls.invalidate_user(user_id)
+        return True
     
     # ========== Mission Operations ==========
     
@@ -414,11 +864,24 @@ class DatabaseService:
             return mission_id
     
     @classmethod
-    async def get_mission(cls, mission_id: str) -> Optional[Dict]:
-        """Get mission by ID."""
+    @retry_on_stale_statement
+    async def get_mission(
+        cls,
+        mission_id: str,
+        after_seq: int = 0,
+        resolve_context: bool = False,
+    ) -> Optional[Dict]:
+        """
+        Get mission by ID.
+
+        Events are read from the mission_events log; only events with a
+        sequence number greater than `after_seq` are attached, so pollers can
+        pass their last seen `event_seq` and receive just the new tail.
+        Offloaded context values stay as references unless `resolve_context`.
+        """
         async with cls.connection() as conn:
             row = await conn.fetchrow(
-                "SELECT * FROM missions WHERE id = $1",
+                cls.SQL_MISSION_BY_ID,
                 mission_id
             )
             if not row:
@@ -426,12 +889,134 @@ class DatabaseService:
             
             mission = dict(row)
             # Parse JSON fields
-            for field in ['input_data', 'output_data', 'context', 'events', 'artifacts']:
+            for field in ['input_data', 'output_data', 'context', 'artifacts']:
                 if mission.get(field):
                     mission[field] = json.loads(mission[field]) if isinstance(mission[field], str) else mission[field]
+
+            if after_seq >= mission.get("event_seq", 0):
+                mission["events"] = []
+            else:
+                mission["events"] = await cls._fetch_mission_events(conn, mission_id, after_seq)
+
+            if resolve_context and mission.get("context"):
+                mission["context"] = await cls._resolve_context_refs(conn, mission_id, mission["context"])
             return mission
+
+    @staticmethod
+    def is_context_ref(value: Any) -> bool:
+        """True for the placeholder left in missions.context by an offloaded value."""
+        return isinstance(value, dict) and value.get("$ref") == "mission_context_blobs"
+
+    @classmethod
+    def _split_context(cls, values: Dict) -> Tuple[Dict, List[Tuple[str, str]]]:
+        """
+        Split context values into inline values and offloaded blobs.
+
+        Returns the values to store in missions.context (offloaded ones
+        replaced by references) and `(key, json)` pairs for mission_context_blobs.
+        """
+        inline: Dict[str, Any] = {}
+        blobs: List[Tuple[str, str]] = []
+        for key, value in values.items():
+            encoded = json.dumps(value)
+            if key in cls.OFFLOADED_CONTEXT_KEYS or len(encoded) > cls.CONTEXT_INLINE_LIMIT:
+                blobs.append((key, encoded))
+                inline[key] = {"$ref": "mission_context_blobs", "key": key, "bytes": len(encoded)}
+            else:
+                inline[key] = value
+        return inline, blobs
+
+    @classmethod
+    async def _resolve_context_refs(cls, conn: Connection, mission_id: str, context: Dict) -> Dict:
+        keys = [key for key, value in context.items() if cls.is_context_ref(value)]
+        if not keys:
+            return context
+        rows = await conn.fetch(
+            "SELECT key, value FROM mission_context_blobs WHERE mission_id = $1 AND key = ANY($2::text[])",
+            mission_id, keys
+        )
+        resolved = dict(context)
+        for row in rows:
+            value = row["value"]
+            resolved[row["key"]] = json.loads(value) if isinstance(value, str) else value
+        return resolved
+
+    @classmethod
+    async def get_mission_status(cls, mission_id: str) -> Optional[str]:
+        """Just the mission's status, for cheap polling."""
+        async with cls.connection() as conn:
+            return await conn.fetchval("SELECT status FROM missions WHERE id = $1", mission_id)
+
+    @classmethod
+    async def get_mission_events(
+        cls,
+        mission_id: str,
+        after_seq: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Read a mission's events in sequence order, starting after `after_seq`."""
+        async with cls.connection() as conn:
+            return await cls._fetch_mission_events(conn, mission_id, after_seq, limit)
+
+    @staticmethod
+    async def _fetch_mission_events(
+        conn: Connection,
+        mission_id: str,
+        after_seq: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        query = """
+            SELECT seq, type, message, data, created_at
+            FROM mission_events
+            WHERE mission_id = $1 AND seq > $2
+            ORDER BY seq
+        """
+        params: list = [mission_id, after_seq]
+        if limit is not None:
+            query += " LIMIT $3"
+            params.append(limit)
+
+        rows = await conn.fetch(query, *params)
+        return [DatabaseService._event_from_row(row) for row in rows]
+
+    @staticmethod
+    def _event_from_row(row) -> Dict:
+        data = row["data"]
+        return {
+            "seq": row["seq"],
+            "type": row["type"],
+            "message": row["message"],
+            "data": json.loads(data) if isinstance(data, str) else data,
+            "timestamp": row["created_at"].isoformat() if row["created_at"] else None,
+        }
+
+    @staticmethod
+    async def _insert_mission_events(conn: Connection, mission_id: str, last_seq: int, events: List[Dict]):
+        """Write events whose sequence numbers end at `last_seq` (already reserved on the mission row)."""
+        first_seq = last_seq - len(events) + 1
+        records = []
+        for offset, event in enumerate(events):
+            timestamp = event.get("timestamp")
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp)
+            records.append((
+                mission_id,
+                first_seq + offset,
+                event.get("type", "log"),
+                event.get("message"),
+                json.dumps(event.get("data")) if event.get("data") is not None else None,
+                timestamp or datetime.now(),
+            ))
+        await conn.executemany(
+            """
+            INSERT INTO mission_events (mission_id, seq, type, message, data, created_at)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            """,
+            records,
+        )
     
     @classmethod
+    @retry_on_stale_statement
     async def update_mission(
         cls,
         mission_id: str,
@@ -440,6 +1025,8 @@ class DatabaseService:
         progress: Optional[int] = None,
         output_data: Optional[Dict] = None,
         context: Optional[Dict] = None,
+        context_patch: Optional[Dict] = None,
+        context_remove: Optional[List[str]] = None,
         events: Optional[List] = None,
         artifacts: Optional[List] = None,
         error: Optional[str] = None,
@@ -448,7 +1035,17 @@ class DatabaseService:
         user_feedback: Optional[str] = None,
         completed_at: Optional[str] = None,
     ) -> bool:
-        """Update mission fields."""
+        """
+        Update mission fields.
+
+        `events` are *new* events to append to the mission's event log; they
+        are written in the same transaction as the field updates.
+
+        `context` replaces the whole context; `context_patch` merges the given
+        keys into it (jsonb `||`) and `context_remove` deletes keys. Large
+        values and OFFLOADED_CONTEXT_KEYS go to mission_context_blobs with a
+        reference left inline (see get_mission's `resolve_context`).
+        """
         updates = []
         params = []
         param_idx = 1
@@ -467,27 +1064,91 @@ class DatabaseService:
                 param_idx += 1
         
         # Handle JSON fields
+        blobs: List[Tuple[str, str]] = []
+        if context is not None:
+            context, blobs = cls._split_context(context)
         json_fields = {
             'output_data': output_data, 'context': context,
-            'events': events, 'artifacts': artifacts
+            'artifacts': artifacts
         }
         for field, value in json_fields.items():
             if value is not None:
                 updates.append(f"{field} = ${param_idx}")
                 params.append(json.dumps(value))
                 param_idx += 1
+
+        # Merge changed context keys in place instead of rewriting the blob
+        if context is None and (context_patch or context_remove):
+            inline_patch, blobs = cls._split_context(context_patch or {})
+            updates.append(
+                f"context = (COALESCE(context, '{{}}'::jsonb) - ${param_idx}::text[]) || ${param_idx + 1}::jsonb"
+            )
+            params.extend([list(context_remove or []), json.dumps(inline_patch)])
+            param_idx += 2
+
+        # Reserve sequence numbers for new events on the mission row itself
+        if events:
+            updates.append(f"event_seq = event_seq + ${param_idx}")
+            params.append(len(events))
+            param_idx += 1
         
         if not updates:
             return False
         
         params.append(mission_id)
-        query = f"UPDATE missions SET {', '.join(updates)} WHERE id = ${param_idx}"
+        query = f"UPDATE missions SET {', '.join(updates)} WHERE id = ${param_idx} RETURNING event_seq"
         
-        async with cls.connection() as conn:
-            result = await conn.execute(query, *params)
-            return result == "UPDATE 1"
+        async with cls.connection(kind="missions") as conn:
+            async with conn.transaction():
+                last_seq = await conn.fetchval(query, *params)
+                if last_seq is None:
+                    return False
+                if events:
+                    await cls._insert_mission_events(conn, mission_id, last_seq, events)
+                if context is not None or context_patch or context_remove:
+                    await cls._sync_context_blobs(conn, mission_id, blobs, context, context_patch, context_remove)
+                return True
+
+    @staticmethod
+    async def _sync_context_blobs(
+        conn: Connection,
+        mission_id: str,
+        blobs: List[Tuple[str, str]],
+        context: Optional[Dict],
+        context_patch: Optional[Dict],
+        context_remove: Optional[List[str]],
+    ):
+        """Write offloaded values and drop blobs whose keys are now inline or gone."""
+        blob_keys = [key for key, _ in blobs]
+        if context is not None:
+            # Full replace: keep only the blobs just written
+            await conn.execute(
+                "DELETE FROM mission_context_blobs WHERE mission_id = $1 AND NOT (key = ANY($2::text[]))",
+                mission_id, blob_keys
+            )
+        else:
+            stale = [key for key in (context_remove or []) if key not in blob_keys]
+            stale += [key for key in (context_patch or {}) if key not in blob_keys]
+            if stale:
+                await conn.execute(
+                    "DELETE FROM mission_context_blobs WHERE mission_id = $1 AND key = ANY($2::text[])",
+                    mission_id, stale
+                )
+        if blobs:
+            await conn.executemany(
+                """
+                INSERT INTO mission_context_blobs (mission_id, key, value, bytes)
+                VALUES ($1, $2, $3::jsonb, $4)
+                ON CONFLICT (mission_id, key) DO UPDATE SET
+                    value = EXCLUDED.value,
+                    bytes = EXCLUDED.bytes,
+                    updated_at = NOW()
+                """,
+                [(mission_id, key, encoded, len(encoded)) for key, encoded in blobs]
+            )
 
     @classmethod
+    @retry_on_stale_statement
     async def add_mission_event(
         cls,
         mission_id: str,
@@ -495,7 +1156,7 @@ class DatabaseService:
         message: str,
         data: Optional[Dict] = None
     ) -> bool:
-        """Append an event to the mission's events list."""
+        """Append a single event to the mission's event log."""
         event = {
             "type": type,
             "message": message,
@@ -503,20 +1164,16 @@ class DatabaseService:
             "timestamp": datetime.now().isoformat()
         }
         
-        query = """
-            UPDATE missions 
-            SET events = (
-                CASE 
-                    WHEN events IS NULL OR events = 'null'::jsonb THEN '[]'::jsonb 
-                    ELSE events 
-                END
-            ) || $1::jsonb 
-            WHERE id = $2
-        """
-        
-        async with cls.connection() as conn:
-            result = await conn.execute(query, json.dumps([event]), mission_id)
-            return result == "UPDATE 1"
+        async with cls.connection(kind="missions") as conn:
+            async with conn.transaction():
+                last_seq = await conn.fetchval(
+                    "UPDATE missions SET event_seq = event_seq + 1 WHERE id = $1 RETURNING event_seq",
+                    mission_id
+                )
+                if last_seq is None:
+                    return False
+                await cls._insert_mission_events(conn, mission_id, last_seq, [event])
+                return True
 
     
     @classmethod
@@ -526,13 +1183,23 @@ class DatabaseService:
         status: Optional[str] = None,
         limit: int = 20,
         offset: int = 0,
-        summary: bool = True
+        summary: bool = True,
+        recent_events: int = 5,
+        cursor: Optional[str] = None,
     ) -> List[Dict]:
-        """List missions for a user. Optimized for performance by excluding large fields in summary mode."""
+        """
+        List missions for a user. Optimized for performance by excluding large fields in summary mode.
+
+        Each mission carries only its `recent_events` latest events (all fetched
+        with one extra query); pass 0 to skip the event log entirely. The total
+        number of events is `event_seq`; the full log is served by
+        `get_mission` / `get_mission_events`. `cursor`
+        seeks past the previous page on (created_at, id) instead of using `offset`.
+        """
         async with cls.connection() as conn:
             if summary:
                 # Exclude large context and input_data for list view
-                fields = "id, user_id, agent_type, status, current_node, progress, artifacts, events, created_at"
+                fields = "id, user_id, agent_type, status, current_node, progress, artifacts, event_seq, created_at"
             else:
                 fields = "*"
                 
@@ -542,52 +1209,89 @@ class DatabaseService:
             if status:
                 query += " AND status = $2"
                 params.append(status)
+
+            if cursor:
+                query += cls._keyset_clause(cursor, "created_at", "id", params)
+                offset = 0
             
-            query += f" ORDER BY created_at DESC LIMIT ${len(params)+1} OFFSET ${len(params)+2}"
+            query += f" ORDER BY created_at DESC, id DESC LIMIT ${len(params)+1} OFFSET ${len(params)+2}"
             params.extend([limit, offset])
             
             rows = await conn.fetch(query, *params)
             missions = []
             
             # Fields that need JSON parsing
-            json_fields = ['artifacts', 'events'] if summary else ['input_data', 'output_data', 'context', 'events', 'artifacts']
+            json_fields = ['artifacts'] if summary else ['input_data', 'output_data', 'context', 'artifacts']
             
             for row in rows:
                 mission = dict(row)
                 for field in json_fields:
                     if mission.get(field):
                         mission[field] = json.loads(mission[field]) if isinstance(mission[field], str) else mission[field]
+                mission["events"] = []
                 missions.append(mission)
+
+            if recent_events and missions:
+                event_rows = await conn.fetch(
+                    """
+                    SELECT mission_id, seq, type, message, data, created_at FROM (
+                        SELECT *, row_number() OVER (PARTITION BY mission_id ORDER BY seq DESC) AS rn
+                        FROM mission_events
+                        WHERE mission_id = ANY($1::text[])
+                    ) e
+                    WHERE rn <= $2
+                    ORDER BY mission_id, seq
+                    """,
+                    [m["id"] for m in missions], recent_events
+                )
+                by_id = {m["id"]: m for m in missions}
+                for event_row in event_rows:
+                    by_id[event_row["mission_id"]]["events"].append(cls._event_from_row(event_row))
             return missions
 
+    @classmethod
+    @retry_on_stale_statement
+    async def get_user_counters(cls, user_id: str) -> Dict[str, Any]:
+        """
+        Get the trigger-maintained counter rollup for a user.
+
+        Returns totals for every table in COUNTED_TABLES plus `status_counts`,
+        a per-table mapping of status -> count. Users with no rows yet get zeros.
+        """
+        async with cls.connection() as conn:
+            row = await conn.fetchrow(
+                cls.SQL_USER_COUNTERS,
+                user_id
+            )
+
+        counters: Dict[str, Any] = {table: 0 for table in cls.COUNTED_TABLES}
+        counters["status_counts"] = {}
+        if row:
+            counters.update({table: row[table] for table in cls.COUNTED_TABLES})
+            status_counts = row["status_counts"]
+            counters["status_counts"] = json.loads(status_counts) if isinstance(status_counts, str) else status_counts
+        return counters
+
     @classmethod
     async def get_dashboard_stats(cls, user_id: str) -> Dict[str, Any]:
         """Get summary statistics for the dashboard KPI strip."""
-        async with cls.connection() as conn:
-            jobs_count = await conn.fetchval(
-                "SELECT count(*) FROM jobs WHERE user_id = $1", user_id
-            ) or 0
-            apps_count = await conn.fetchval(
-                "SELECT count(*) FROM applications WHERE user_id = $1", user_id
-            ) or 0
-            resumes_count = await conn.fetchval(
-                "SELECT count(*) FROM resumes WHERE user_id = $1", user_id
-            ) or 0
-            active_missions = await conn.fetchval(
-                "SELECT count(*) FROM missions WHERE user_id = $1 AND status IN ('running', 'pending', 'waiting_approval')",
-                user_id,
-            ) or 0
-
-            # Estimated time saved: 30min per app, 45min per resume
-            time_saved_hrs = round((apps_count * 0.5) + (resumes_count * 0.75), 1)
+        counters = await cls.get_user_counters(user_id)
+        jobs_count = counters["jobs"]
+        apps_count = counters["applications"]
+        resumes_count = counters["resumes"]
+        mission_statuses = counters["status_counts"].get("missions", {})
+        active_missions = sum(mission_statuses.get(s, 0) for s in cls.ACTIVE_MISSION_STATUSES)
 
-            return {
-                "jobs_found": jobs_count,
-                "applications_sent": apps_count,
-                "resumes_generated": resumes_count,
-                "active_missions": active_missions,
-                "time_saved_hrs": time_saved_hrs,
-            }
+        # Estimated time saved: 30min per app, 45min per resume
+        time_saved_hrs = round((apps_count * 0.5) + (resumes_count * 0.75), 1)
+
+        return {
+            "jobs_found": jobs_count,
+            "applications_sent": apps_count,
+            "resumes_generated": resumes_count,
+            "active_missions": active_missions,
+            "time_saved_hrs": time_saved_hrs,
+        }
 
 
     @classmethod
@@ -597,7 +1301,18 @@ class DatabaseService:
         user_id: str,
         status: Optional[str] = None
     ) -> int:
-        """Get total count of records in a table for a specific user, with optional status filter."""
+        """
+        Get total count of records in a table for a specific user, with optional status filter.
+
+        Tables tracked in user_counters are answered from the rollup; anything
+        else falls back to a count(*) scan.
+        """
+        if table_name in cls.COUNTED_TABLES:
+            counters = await cls.get_user_counters(user_id)
+            if status:
+                return counters["status_counts"].get(table_name, {}).get(status, 0)
+            return counters[table_name]
+
         query = f"SELECT COUNT(*) FROM {table_name} WHERE user_id = $1"
         params = [user_id]
         
@@ -612,6 +1327,11 @@ class DatabaseService:
     @classmethod
     async def get_insights(cls, user_id: str):
         """Aggregate insights for the dashboard."""
+        # Real-time stats
+        counters = await cls.get_user_counters(user_id)
+        total_apps = counters["applications"]
+        total_jobs = counters["jobs"]
+
         async with cls.connection() as conn:
             # Skill gaps from recent mission
             skill_gap_mission = await conn.fetchrow(
@@ -631,9 +1351,6 @@ class DatabaseService:
                 user_id
             )
             
-            # Real-time stats
-            total_apps = await conn.fetchval("SELECT count(*) FROM applications WHERE user_id = $1", user_id)
-            total_jobs = await conn.fetchval("SELECT count(*) FROM jobs WHERE user_id = $1", user_id)
             avg_match = 0.85 # Fallback as match_score column does not exist on jobs table
 
             return {
@@ -651,8 +1368,16 @@ class DatabaseService:
             }
 
     @classmethod
-    async def get_artifacts(cls, user_id: str, job_id: Optional[str] = None, mission_id: Optional[str] = None, artifact_type: Optional[str] = None):
-        """List artifacts for a user with optional filters."""
+    async def get_artifacts(
+        cls,
+        user_id: str,
+        job_id: Optional[str] = None,
+        mission_id: Optional[str] = None,
+        artifact_type: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ):
+        """List artifacts for a user with optional filters, newest first, keyset-paginated on (created_at, id)."""
         query = "SELECT * FROM artifacts WHERE user_id = $1"
         params: list = [user_id]
         idx = 2
@@ -668,7 +1393,10 @@ class DatabaseService:
             query += f" AND type = ${idx}"
             params.append(artifact_type)
             idx += 1
-        query += " ORDER BY created_at DESC"
+        if cursor:
+            query += cls._keyset_clause(cursor, "created_at", "id", params)
+        query += f" ORDER BY created_at DESC, id DESC LIMIT ${len(params)+1}"
+        params.append(limit)
         
         async with cls.connection() as conn:
             rows = await conn.fetch(query, *params)
@@ -699,23 +1427,115 @@ class DatabaseService:
             return str(res)
 
     @classmethod
-    async def get_linkedin_posts(cls, user_id: str, status: Optional[str] = None, limit: int = 20, offset: int = 0):
-        """Fetch LinkedIn posts for a user."""
+    async def get_linkedin_posts(cls, user_id: str, status: Optional[str] = None, limit: int = 20, offset: int = 0, cursor: Optional[str] = None):
+        """Fetch LinkedIn posts for a user, keyset-paginated on (created_at, id) when `cursor` is given."""
         query = "SELECT * FROM linkedin_posts WHERE user_id = $1"
         params = [user_id]
-        param_idx = 2
         
         if status:
-            query += f" AND status = ${param_idx}"
+            query += f" AND status = ${len(params)+1}"
             params.append(status)
-            param_idx += 1
+
+        if cursor:
+            query += cls._keyset_clause(cursor, "created_at", "id", params)
+            offset = 0
             
-        query += f" ORDER BY created_at DESC LIMIT ${param_idx} OFFSET ${param_idx+1}"
+        param_idx = len(params) + 1
+        query += f" ORDER BY created_at DESC, id DESC LIMIT ${param_idx} OFFSET ${param_idx+1}"
         params.extend([limit, offset])
         
         async with cls.connection() as conn:
             rows = await conn.fetch(query, *params)
             return [dict(r) for r in rows]
 
+    # ========== Embedding Cache ==========
+    
+    @classmethod
+    async def get_cached_embeddings(cls, keys: List[str]) -> Dict[str, Any]:
+        """Cached vectors by content-hash key (see rag/embedding_cache), for the keys present."""
+        if not keys:
+            return {}
+        async with cls.connection() as conn:
+            rows = await conn.fetch(
+                "SELECT key, embedding FROM embedding_cache WHERE key = ANY($1::text[])",
+                keys,
+            )
+            return {row["key"]: row["embedding"] for row in rows}
+    
+    @classmethod
+    async def store_cached_embeddings(cls, model: str, vectors: Dict[str, List[float]]):
+        """Insert vectors by content-hash key; keys already cached are left as they are."""
+        if not vectors:
+            return
+        async with cls.connection() as conn:
+            await conn.executemany(
+                """
+                INSERT INTO embedding_cache (key, model, embedding)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (key) DO NOTHING
+                """,
+                [(key, model, vector) for key, vector in vectors.items()],
+            )
+
+    # Tables with embeddings, and the column each embedding is computed from
+    EMBEDDED_TABLES = {"jobs": "description", "resume_chunks": "content"}
+    
+    @classmethod
+    async def get_degraded_embeddings(cls, table: str, limit: int = 100, after_id: Any = None) -> List[Dict]:
+        """
+        Rows of `table` whose embedding is a degraded fallback or missing, with the text to embed.
+        
+        Pages by id: pass the last id of the previous page as `after_id`, so
+        rows that still fail do not come back on every page.
+        """
+        column = cls.EMBEDDED_TABLES[table]
+        async with cls.connection() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT id, {column} AS text
+                FROM {table}
+                WHERE (embedding_degraded OR embedding IS NULL) AND {column} IS NOT NULL
+                  AND ($2::uuid IS NULL OR id > $2::uuid)
+                ORDER BY id
+                LIMIT $1
+                """,
+                limit,
+                after_id,
+            )
+            return [dict(row) for row in rows]
+    
+    @classmethod
+    async def update_embeddings(cls, table: str, updates: List[Tuple[Any, List[float]]]):
+        """Store re-computed embeddings by row id and clear their degraded flag."""
+        if table not in cls.EMBEDDED_TABLES:
+            raise Exception(f"Unknown embedded table: {table}")
+        if not updates:
+            return
+        async with cls.connection() as conn:
+            await conn.executemany(
+                f"UPDATE {table} SET embedding = $2, embedding_degraded = FALSE WHERE id = $1",
+                updates,
+            )
+
+    # ========== LLM Call Telemetry ==========
+    
+    @classmethod
+    async def insert_llm_calls(cls, records: List[tuple]):
+        """Write buffered LLM call records (see core/llm_telemetry) in one batch."""
+        if not records:
+            return
+        async with cls.connection() as conn:
+            await conn.executemany(
+                """
+                INSERT INTO llm_calls (
+                    mission_id, node, operation, provider, model, status, error, retries,
+                    queue_wait_ms, ttft_ms, latency_ms, prompt_tokens, completion_tokens,
+                    cost_usd, created_at
+                )
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
+                """,
+                records,
+            )
+
 # Singleton instance
 db = DatabaseService()
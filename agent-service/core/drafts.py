@@ -0,0 +1,87 @@
+"""
+In-process fan-out of LLM draft tokens to mission subscribers.
+
+Agents publish deltas while a draft (resume, cover letter, LinkedIn post) is
+being generated; the mission stream endpoint relays them over SSE. The text
+generated so far is buffered per draft so late subscribers catch up, and
+dropped when the draft finishes (the finished text lives in the artifact).
+When a mission run ends, `close` ends its subscriptions.
+
+Missions run in the API process, so no external broker is needed; with
+several workers a client only sees drafts generated by its own worker.
+"""
+
+import asyncio
+from typing import AsyncIterator, Dict, Set
+
+_CLOSED = object()  # queued by `close` to end a subscription
+
+
+class DraftStreams:
+    """Per-mission draft buffers and subscriber queues."""
+
+    def __init__(self):
+        self._drafts: Dict[str, Dict[str, str]] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def publish(self, mission_id: str, draft: str, delta: str):
+        """Append `delta` to a draft and forward it to current subscribers."""
+        drafts = self._drafts.setdefault(mission_id, {})
+        drafts[draft] = drafts.get(draft, "") + delta
+        self._send(mission_id, {"draft": draft, "delta": delta})
+
+    def finish(self, mission_id: str, draft: str):
+        """Mark a draft complete and drop its buffer."""
+        drafts = self._drafts.get(mission_id)
+        if drafts is not None:
+            drafts.pop(draft, None)
+            if not drafts:
+                del self._drafts[mission_id]
+        self._send(mission_id, {"draft": draft, "done": True})
+
+    def close(self, mission_id: str):
+        """The mission's run is over: end its subscriptions and drop leftover buffers."""
+        self._drafts.pop(mission_id, None)
+        self._send(mission_id, _CLOSED)
+
+    def _send(self, mission_id: str, event):
+        for queue in self._subscribers.get(mission_id, ()):
+            queue.put_nowait(event)
+
+    async def subscribe(self, mission_id: str, keepalive: float = 15.0) -> AsyncIterator[dict]:
+        """
+        Yield draft events for a mission: first the text buffered so far for
+        each in-progress draft, then live deltas, until `close` is called
+        for the mission. Yields None every `keepalive` seconds without events
+        so callers can ping the client (and check the mission is still running).
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(mission_id, set()).add(queue)
+        try:
+            for draft, text in list(self._drafts.get(mission_id, {}).items()):
+                yield {"draft": draft, "delta": text}
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is _CLOSED:
+                    return
+                yield event
+        finally:
+            subscribers = self._subscribers.get(mission_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[mission_id]
+
+    def stats(self) -> dict:
+        return {
+            "active_drafts": sum(len(d) for d in self._drafts.values()),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+        }
+
+
+# Global instance
+draft_streams = DraftStreams()
@@ -3,17 +3,39 @@ OpenRouter LLM Client for AI Career Agent.
 Provides unified interface for both free and paid models.
 """
 
-from openai import AsyncOpenAI
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-from typing import AsyncGenerator, Optional, Literal
-import tiktoken
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional, Literal, Tuple, get_origin
+from pydantic import BaseModel, TypeAdapter
 
 from core.config import get_settings
+from core.llm_cache import get_response_cache, make_cache_key
+from core.cache import SingleFlight, MISSING
+from core.llm_limiter import get_limiter
+from core.llm_health import get_health, get_hedge_budget, order_providers
+from core.clients import get_encoding, get_http_client, get_openai_client
+from core.structured import IncrementalJSONParser, loads_lenient, unwrap_single_key
+from core.llm_telemetry import CallTrace
+from contextlib import aclosing
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Identical requests in flight at the same time share one upstream call
+_inflight_requests = SingleFlight()
+
+
+@dataclass
+class ChatResult:
+    """Outcome of one request in `LLMClient.chat_many`."""
+    content: Optional[str] = None
+    error: Optional[Exception] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 
 class LLMClient:
     """
@@ -33,9 +55,10 @@ class LLMClient:
         if self.settings.gemini_api_key:
             self.providers.append({
                 "name": "Gemini",
-                "client": AsyncOpenAI(
-                    api_key=self.settings.gemini_api_key,
-                    base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
+                "client": get_openai_client(
+                    self.settings.gemini_api_key,
+                    self.settings.gemini_base_url,
+                    self.settings,
                 ),
                 "model": self.settings.gemini_model,
                 "is_openrouter": False
@@ -45,26 +68,50 @@ class LLMClient:
         if self.settings.openrouter_api_key:
             self.providers.append({
                 "name": "OpenRouter",
-                "client": AsyncOpenAI(
-                    api_key=self.settings.openrouter_api_key,
-                    base_url=self.settings.openrouter_base_url,
+                "client": get_openai_client(
+                    self.settings.openrouter_api_key,
+                    self.settings.openrouter_base_url,
+                    self.settings,
                 ),
                 "model": self.model,
                 "is_openrouter": True
             })
         
-        # Token counter (approximate)
-        
-        # Token counter (approximate)
-        try:
-            self.encoding = tiktoken.encoding_for_model("gpt-4")
-        except:
-            self.encoding = tiktoken.get_encoding("cl100k_base")
+        # Token counter (approximate), shared across clients
+        self.encoding = get_encoding()
+    
+    @property
+    def model_chain(self) -> str:
+        """Provider models in failover order; identifies the model for caching."""
+        return ",".join(p["model"] for p in self.providers)
     
     def count_tokens(self, text: str) -> int:
         """Count tokens in text."""
         return len(self.encoding.encode(text))
     
+    def prompt_budget(self, max_tokens: int = 2048, *fixed_texts: str) -> int:
+        """
+        Tokens available for packed prompt context in one request.
+
+        Uses the smallest context window in the failover chain, less the
+        completion budget and the fixed prompt parts (system message,
+        template), and is capped by LLM_MAX_PROMPT_TOKENS.
+        """
+        windows = [
+            self.settings.llm_context_windows.get(p["model"], self.settings.llm_context_window)
+            for p in self.providers
+        ] or [self.settings.llm_context_window]
+        fixed = sum(self.count_tokens(text) for text in fixed_texts)
+        # Margin for message framing and per-line counting drift
+        margin = 64
+        available = min(windows) - max_tokens - fixed - margin
+        return max(0, min(available, self.settings.llm_max_prompt_tokens - fixed - margin))
+    
+    def estimate_tokens(self, messages: list[dict], max_tokens: int) -> int:
+        """Upper-bound token cost of a request: prompt tokens plus the completion budget."""
+        prompt_tokens = sum(self.count_tokens(m.get("content") or "") + 4 for m in messages)
+        return prompt_tokens + max_tokens
+    
     async def chat(
         self,
         messages: list[dict],
@@ -72,88 +119,405 @@ class LLMClient:
         max_tokens: int = 2048,
         max_retries: int = None, # Calculated based on providers
         on_retry: Optional[callable] = None,
+        cache: Optional[bool] = None,
+        on_token: Optional[callable] = None,
+        response_format: Optional[dict] = None,
+        on_finish: Optional[callable] = None,
+    ) -> str:
+        """
+        Chat completion with provider failover.
+
+        With `on_token`, the completion is streamed via `chat_stream` and each
+        delta is awaited through `on_token(delta)` as it arrives; the full
+        text is still returned. Streamed calls are not coalesced.
+
+        `response_format` is passed to providers as-is (see `chat_json`); a
+        provider that rejects it is retried without.
+
+        `on_finish(finish_reason)` is awaited with why the completion ended:
+        "stop", "length" when cut off at `max_tokens`, or None if the
+        provider did not say. Cut-off replies are never cached, so cached
+        replies report "stop".
+
+        With LLM_CACHE_ENABLED, responses are served from the response cache
+        when `cache=True`, or when `cache` is None and the temperature is at
+        most LLM_CACHE_MAX_TEMPERATURE. `cache=False` always calls the provider.
+
+        Unless `cache=False`, concurrent identical requests (same cache key)
+        are coalesced into one upstream call whose result or error is shared;
+        only the first caller's `on_retry` sees retry messages.
+        """
+        temp = temperature if temperature is not None else self.settings.temperature
+        
+        response_cache = get_response_cache(self.settings) if cache is not False else None
+        cache_key = None
+        if response_cache and (cache or temp <= self.settings.llm_cache_max_temperature):
+            cache_key = make_cache_key(self.model_chain, messages, temp, max_tokens, response_format)
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                if on_token: await on_token(cached)
+                if on_finish: await on_finish("stop")
+                return cached
+        
+        if on_token is not None:
+            parts = []
+            finish_reason = None
+            
+            async def record_finish(reason: Optional[str]):
+                nonlocal finish_reason
+                finish_reason = reason
+            
+            async for delta in self.chat_stream(messages, temp, max_tokens, on_retry, response_format, record_finish):
+                parts.append(delta)
+                await on_token(delta)
+            content = "".join(parts)
+            if cache_key and content and finish_reason != "length":
+                await response_cache.set(cache_key, self.model_chain, content)
+            if on_finish: await on_finish(finish_reason)
+            return content
+        
+        async def call_upstream() -> Tuple[Optional[str], Optional[str]]:
+            content, finish_reason = await self._chat_with_failover(messages, temp, max_tokens, on_retry, response_format)
+            if cache_key and content and finish_reason != "length":
+                await response_cache.set(cache_key, self.model_chain, content)
+            return content, finish_reason
+        
+        if cache is False or not self.settings.llm_coalesce_requests:
+            content, finish_reason = await call_upstream()
+        else:
+            flight_key = cache_key or make_cache_key(self.model_chain, messages, temp, max_tokens, response_format)
+            content, finish_reason = await _inflight_requests.do(flight_key, call_upstream)
+        if on_finish: await on_finish(finish_reason)
+        return content
+    
+    async def _chat_with_failover(
+        self,
+        messages: list[dict],
+        temp: float,
+        max_tokens: int,
+        on_retry: Optional[callable] = None,
+        response_format: Optional[dict] = None,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        One chat completion, retried and failed over across providers.
+        Returns the content and the provider's finish_reason.
+
+        Providers are tried healthiest first (core/llm_health); a provider
+        whose circuit is open is skipped without spending a request on it.
+
+        With LLM_HEDGE_ENABLED, if the primary has not answered by
+        LLM_HEDGE_PERCENTILE of its recent latency, the request is also sent
+        to the next healthy provider; the first answer wins and the other
+        call is cancelled. Hedges are capped by LLM_HEDGE_BUDGET.
+        """
+        import asyncio
+        
+        hedge = self._hedge_plan()
+        if hedge is None:
+            return await self._traced_chat("chat", messages, temp, max_tokens, on_retry, response_format)
+        backup, delay = hedge
+        
+        budget = get_hedge_budget(self.settings)
+        budget.record_call()
+        primary = asyncio.ensure_future(
+            self._traced_chat("chat", messages, temp, max_tokens, on_retry, response_format)
+        )
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not budget.try_spend():
+                return await primary
+            
+            logger.warning(f"No reply after {delay:.1f}s. Hedging request to {backup['name']}...")
+            hedged = asyncio.ensure_future(
+                self._traced_chat("hedge", messages, temp, max_tokens, None, response_format, providers=[backup])
+            )
+            tasks.append(hedged)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedged:
+                            budget.hedge_wins += 1
+                        return task.result()
+            # Both failed: report the primary's error, as without hedging
+            raise primary.exception()
+        finally:
+            # The losing call, or both if the caller gave up
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _hedge_plan(self) -> Optional[tuple]:
+        """(backup provider, delay) when this call may be hedged, else None."""
+        settings = self.settings
+        if not settings.llm_hedge_enabled or len(self.providers) < 2:
+            return None
+        providers = order_providers(self.providers, settings)
+        primary = get_health(providers[0]["name"], settings)
+        if not primary.closed or len(primary.latencies) < settings.llm_hedge_min_samples:
+            return None
+        backup = next((p for p in providers[1:] if get_health(p["name"], settings).closed), None)
+        if backup is None:
+            return None
+        delay = max(primary.latency_percentile(settings.llm_hedge_percentile), settings.llm_hedge_min_delay_seconds)
+        return backup, delay
+    
+    async def _traced_chat(
+        self,
+        operation: str,
+        messages: list[dict],
+        temp: float,
+        max_tokens: int,
+        on_retry: Optional[callable],
+        response_format: Optional[dict],
+        providers: Optional[List[dict]] = None,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """`_chat_attempts`, recorded in core/llm_telemetry whether it succeeds or not."""
+        trace = CallTrace.start(operation)
+        try:
+            content = await self._chat_attempts(messages, temp, max_tokens, on_retry, response_format, trace, providers)
+        except BaseException as e:
+            trace.finish(e)
+            raise
+        trace.finish()
+        return content, trace.finish_reason
+    
+    async def _chat_attempts(
+        self,
+        messages: list[dict],
+        temp: float,
+        max_tokens: int,
+        on_retry: Optional[callable],
+        response_format: Optional[dict],
+        trace: CallTrace,
+        providers: Optional[List[dict]] = None,
     ) -> str:
         import asyncio
+        
+        async def send(provider: dict, messages: list[dict], response_format: Optional[dict], permit):
+            response = await asyncio.wait_for(
+                provider["client"].chat.completions.create(
+                    model=provider["model"],
+                    messages=messages,
+                    temperature=temp,
+                    max_tokens=max_tokens,
+                    extra_headers=self._extra_headers(provider),
+                    **({"response_format": response_format} if response_format else {}),
+                ),
+                timeout=60.0
+            )
+            usage = getattr(response, "usage", None)
+            total_tokens = getattr(usage, "total_tokens", None)
+            permit.settle(total_tokens if isinstance(total_tokens, int) else None)
+            prompt_tokens = getattr(usage, "prompt_tokens", None)
+            completion_tokens = getattr(usage, "completion_tokens", None)
+            if isinstance(prompt_tokens, int):
+                trace.prompt_tokens = prompt_tokens
+                trace.completion_tokens = completion_tokens if isinstance(completion_tokens, int) else None
+            else:
+                trace.prompt_tokens = self.estimate_tokens(messages, 0)
+            choice = response.choices[0]
+            if isinstance(choice.finish_reason, str):
+                trace.finish_reason = choice.finish_reason
+            yield choice.message.content
+        
+        content = None
+        # Run the attempts to completion so the success is recorded
+        async for content in self._failover_attempts(send, messages, max_tokens, on_retry, response_format, trace, providers):
+            pass
+        return content
+    
+    async def chat_stream(
+        self,
+        messages: list[dict],
+        temperature: Optional[float] = None,
+        max_tokens: int = 2048,
+        on_retry: Optional[callable] = None,
+        response_format: Optional[dict] = None,
+        on_finish: Optional[callable] = None,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+
+        Uses the same provider ordering, circuit breaking, admission limits,
+        retries and system-message fallback as `chat`. Failures before the
+        first token are retried or failed over; once output has been yielded
+        a failure is raised, since the partial text cannot be taken back.
+        The call is recorded in core/llm_telemetry, success or not.
+        `on_finish` is awaited with the finish_reason, as for `chat`.
+        """
+        temp = temperature if temperature is not None else self.settings.temperature
+        trace = CallTrace.start("stream")
+        attempts = self._stream_attempts(messages, temp, max_tokens, on_retry, response_format, trace)
+        try:
+            async for delta in attempts:
+                trace.first_token()
+                yield delta
+        except GeneratorExit:
+            trace.finish()  # the consumer stopped reading
+            raise
+        except BaseException as e:
+            trace.finish(e)
+            raise
+        finally:
+            await attempts.aclose()
+        trace.finish()
+        if on_finish: await on_finish(trace.finish_reason)
+    
+    def _stream_attempts(
+        self,
+        messages: list[dict],
+        temp: float,
+        max_tokens: int,
+        on_retry: Optional[callable],
+        response_format: Optional[dict],
+        trace: CallTrace,
+    ) -> AsyncGenerator[str, None]:
+        import asyncio
+        
+        async def send(provider: dict, messages: list[dict], response_format: Optional[dict], permit):
+            stream = await asyncio.wait_for(
+                provider["client"].chat.completions.create(
+                    model=provider["model"],
+                    messages=messages,
+                    temperature=temp,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    extra_headers=self._extra_headers(provider),
+                    **({"response_format": response_format} if response_format else {}),
+                ),
+                timeout=60.0
+            )
+            parts = []
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                reason = chunk.choices[0].finish_reason if chunk.choices else None
+                if isinstance(reason, str):
+                    trace.finish_reason = reason
+                if delta:
+                    parts.append(delta)
+                    yield delta
+            # Streams carry no usage; settle on the counted completion
+            prompt_tokens = self.estimate_tokens(messages, 0)
+            completion_tokens = self.count_tokens("".join(parts))
+            permit.settle(prompt_tokens + completion_tokens)
+            trace.prompt_tokens = prompt_tokens
+            trace.completion_tokens = completion_tokens
+        
+        return self._failover_attempts(send, messages, max_tokens, on_retry, response_format, trace)
+    
+    @staticmethod
+    def _extra_headers(provider: dict) -> dict:
+        return {
+            "HTTP-Referer": "https://ai-career-agent.vercel.app",
+            "X-Title": "AI Career Agent"
+        } if provider["is_openrouter"] else {}
+    
+    async def _failover_attempts(
+        self,
+        send: Callable[..., AsyncIterator[str]],
+        messages: list[dict],
+        max_tokens: int,
+        on_retry: Optional[callable],
+        response_format: Optional[dict],
+        trace: CallTrace,
+        providers: Optional[List[dict]] = None,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Retry and failover loop shared by `chat` and `chat_stream`.
+        
+        Handles provider order, circuit checks, admission through the
+        provider limiter, the system-message and response_format fallbacks,
+        and hard/soft failure handling. `send(provider, messages,
+        response_format, permit)` is an async generator that makes one request
+        and yields its output. Failures before anything was yielded are
+        retried or failed over; after that they are raised, since output
+        already passed on cannot be taken back.
+        """
+        import asyncio
         import random
+        import time
         from openai import RateLimitError, APIError, APITimeoutError, NotFoundError, BadRequestError
         
-        temp = temperature if temperature is not None else self.settings.temperature
+        providers = providers or order_providers(self.providers, self.settings)
         provider_idx = 0
         current_messages = messages
         system_instruction_hack_applied = False
         
         # We try each provider up to 2 times before moving to the next
         # total attempts = num_providers * 2 (max 6)
-        total_attempts = len(self.providers) * 2
+        total_attempts = len(providers) * 2
         
         for attempt in range(total_attempts):
-            provider = self.providers[provider_idx]
-            active_client = provider["client"]
-            active_model = provider["model"]
-            
             # Linear failover: move to next provider every 2 attempts
             # But only if we haven't already moved forward due to a hard failure
-            if attempt > 0 and attempt % 2 == 0:
-                if provider_idx < len(self.providers) - 1:
+            if attempt > 0 and attempt % 2 == 0 and provider_idx < len(providers) - 1:
+                provider_idx += 1
+                msg = f"Primary failed. Switching to backup provider: {providers[provider_idx]['name']}..."
+                logger.warning(msg)
+                if on_retry: await on_retry(msg)
+            provider = providers[provider_idx]
+            
+            health = get_health(provider["name"], self.settings)
+            if not health.allow_request():
+                if provider_idx < len(providers) - 1:
                     provider_idx += 1
-                    provider = self.providers[provider_idx]
-                    active_client = provider["client"]
-                    active_model = provider["model"]
-                    
-                    msg = f"Primary failed. Switching to backup provider: {provider['name']}..."
+                    msg = f"{provider['name']} is unavailable (circuit open). Skipping to {providers[provider_idx]['name']}..."
                     logger.warning(msg)
                     if on_retry: await on_retry(msg)
-
+                    continue
+                raise Exception(f"All providers unavailable: circuit open for {provider['name']}")
+            
+            # Queue for the provider's shared concurrency/RPM/TPM budget
+            limiter = get_limiter(provider["name"], provider["model"], self.settings)
+            trace.attempt(provider["name"], provider["model"])
+            yielded = False
+            upstream = False  # whether the error came from the provider call, not our own queueing
             try:
-                response = await asyncio.wait_for(
-                    active_client.chat.completions.create(
-                        model=active_model,
-                        messages=current_messages,
-                        temperature=temp,
-                        max_tokens=max_tokens,
-                        extra_headers={
-                            "HTTP-Referer": "https://ai-career-agent.vercel.app",
-                            "X-Title": "AI Career Agent"
-                        } if provider["is_openrouter"] else {}
-                    ),
-                    timeout=60.0
-                )
-                return response.choices[0].message.content
+                async with limiter.acquire(self.estimate_tokens(current_messages, max_tokens)) as permit:
+                    trace.queue_wait += permit.queue_wait
+                    started = time.monotonic()
+                    upstream = True
+                    async with aclosing(send(provider, current_messages, response_format, permit)) as outputs:
+                        async for output in outputs:
+                            yielded = True
+                            yield output
+                    upstream = False
+                    health.record_success(time.monotonic() - started)
+                return
             except (RateLimitError, NotFoundError, BadRequestError, APIError) as e:
                 error_msg = str(e).lower()
+                if yielded:
+                    health.record_failure()
+                    raise Exception(f"Streaming error from {provider['name']} after partial output: {e}") from e
                 
                 if ("developer instruction" in error_msg or "system message" in error_msg) and not system_instruction_hack_applied:
+                    # A request-shape problem, not a provider health problem
+                    health.release()
                     logger.warning(f"System instructions rejected by {provider['name']}. Applying fallback...")
-                    new_messages = []
-                    system_content = ""
-                    first_user_idx = -1
-                    for i, msg in enumerate(messages):
-                        if msg["role"] == "system":
-                            system_content += msg["content"] + "\n\n"
-                        elif msg["role"] == "user" and first_user_idx == -1:
-                            first_user_idx = i
-                    if system_content:
-                        for i, msg in enumerate(messages):
-                            if msg["role"] == "system": continue
-                            if i == first_user_idx:
-                                new_messages.append({
-                                    "role": "user", 
-                                    "content": f"INSTRUCTIONS:\n{system_content}USER REQUEST: {msg['content']}"
-                                })
-                            else:
-                                new_messages.append(msg)
-                        current_messages = new_messages
+                    merged = merge_system_messages(messages)
+                    if merged is not None:
+                        current_messages = merged
                         system_instruction_hack_applied = True
                         continue
+                
+                if response_format and is_response_format_error(error_msg):
+                    health.release()
+                    logger.warning(f"{provider['name']} rejected response_format. Retrying without it...")
+                    response_format = None
+                    continue
 
                 # Handling Hard Failures (Invalid Key, Quota Hit) -> Skip Provider Immediately
                 is_hard_failure = any(x in error_msg for x in ["402", "payment", "quota", "invalid", "400", "401"])
+                health.record_failure(hard=is_hard_failure)
                 
                 if is_hard_failure:
                     logger.error(f"Hard failure on {provider['name']}: {error_msg}")
-                    if len(self.providers) > provider_idx + 1:
+                    if len(providers) > provider_idx + 1:
                         provider_idx += 1
-                        msg = f"{provider['name']} failed (Hard Error). Skipping to {self.providers[provider_idx]['name']}..."
+                        msg = f"{provider['name']} failed (Hard Error). Skipping to {providers[provider_idx]['name']}..."
                         if on_retry: await on_retry(msg)
                         continue 
                     else:
@@ -161,6 +525,9 @@ class LLMClient:
 
                 # Handling Soft Failures (Rate Limit, Transient API Error) -> Backoff or Cascade
                 wait_time = (2 ** (attempt % 2)) + random.uniform(0.5, 1.5)
+                if isinstance(e, RateLimitError):
+                    # Hold back every queued call to this provider, not just this one
+                    limiter.backoff(wait_time)
                 msg = f"{provider['name']} API issue. Retrying in {wait_time:.1f}s..."
                 logger.warning(msg)
                 if on_retry: await on_retry(msg)
@@ -169,100 +536,173 @@ class LLMClient:
                 continue
 
             except (APITimeoutError, asyncio.TimeoutError) as e:
+                health.record_failure()
+                if yielded:
+                    raise Exception(f"Stream from {provider['name']} timed out after partial output") from e
                 logger.warning(f"Timeout on {provider['name']} (attempt {attempt+1})")
                 if attempt < total_attempts - 1:
                     await asyncio.sleep(1)
                     continue
                 raise Exception(f"Timed out after {total_attempts} attempts across providers") from e
                 
+            except (asyncio.CancelledError, GeneratorExit):
+                # Lost a hedge race or the caller gave up: no verdict on the provider
+                health.release()
+                raise
+                
             except Exception as e:
+                if upstream:
+                    health.record_failure()
+                else:
+                    # Limiter or token-estimate error: says nothing about the provider
+                    health.release()
                 logger.error(f"Unexpected error on {provider['name']}: {e}")
-                raise e
+                raise
         
         raise Exception("Max attempts reached across all providers.")
     
-    async def chat_stream(
+    def structured_output_format(self, schema: Any) -> Optional[dict]:
+        """
+        `response_format` for a JSON reply validated against `schema`, per
+        LLM_STRUCTURED_OUTPUT. Native JSON modes require a top-level object,
+        so list-shaped schemas rely on local repair only.
+        """
+        mode = self.settings.llm_structured_output
+        is_model = isinstance(schema, type) and issubclass(schema, BaseModel)
+        if mode == "off" or not (is_model or schema is dict or get_origin(schema) is dict):
+            return None
+        if mode == "json_schema" and is_model:
+            return {
+                "type": "json_schema",
+                "json_schema": {"name": schema.__name__, "schema": schema.model_json_schema()},
+            }
+        return {"type": "json_object"}
+    
+    async def chat_json(
         self,
         messages: list[dict],
-        temperature: float = 0.7,
+        schema: Any = None,
+        temperature: Optional[float] = None,
         max_tokens: int = 2048,
-    ) -> AsyncGenerator[str, None]:
+        on_retry: Optional[callable] = None,
+        cache: Optional[bool] = None,
+        on_partial: Optional[callable] = None,
+        fallback: Any = MISSING,
+    ) -> Any:
         """
-        Stream a chat completion response.
+        Chat completion parsed as JSON.
+        
+        Args:
+            messages: Chat messages; the prompt should still ask for JSON
+            schema: Pydantic model or type to validate against
+                (e.g. JobAnalysis, List[str]); None returns plain JSON data
+            on_partial: Awaited with each new partial value while the reply
+                streams (see core/structured.IncrementalJSONParser)
+            fallback: Returned when no valid reply could be obtained;
+                without it the last parse error is raised
+            
+        Returns:
+            The validated value (a model instance for model schemas)
+        
+        The provider is asked for JSON natively where supported, near-JSON is
+        repaired locally, and an unusable reply (invalid, truncated, or cut
+        off at `max_tokens`) is re-asked once with the error, rather than
+        failing the mission. Partial values are only ever passed to
+        `on_partial`, never returned.
         """
-        from openai import APIError
+        response_format = self.structured_output_format(schema)
+        adapter = TypeAdapter(schema) if schema is not None else None
+        attempt_messages = messages
+        last_error: Optional[Exception] = None
         
-        current_messages = messages
-        try:
-            stream = await self.client.chat.completions.create(
-                model=self.model,
-                messages=current_messages,
+        for attempt in range(2):
+            on_token = None
+            if on_partial is not None:
+                parser = IncrementalJSONParser()
+                last_partial = None
+                
+                async def on_token(delta: str):
+                    nonlocal last_partial
+                    value = parser.feed(delta)
+                    if value is not None and value != last_partial:
+                        last_partial = value
+                        await on_partial(value)
+            
+            finish_reason = None
+            
+            async def on_finish(reason: Optional[str]):
+                nonlocal finish_reason
+                finish_reason = reason
+            
+            text = await self.chat(
+                attempt_messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                stream=True,
-                extra_headers={
-                    "HTTP-Referer": "https://ai-career-agent.vercel.app",
-                    "X-Title": "AI Career Agent"
-                }
+                on_retry=on_retry,
+                cache=cache if attempt == 0 else False,
+                on_token=on_token,
+                response_format=response_format,
+                on_finish=on_finish,
             )
+            try:
+                if finish_reason == "length":
+                    raise ValueError(f"Reply was cut off at the {max_tokens}-token limit; keep the JSON shorter")
+                data = loads_lenient(text or "")
+                return adapter.validate_python(unwrap_single_key(schema, data)) if adapter else data
+            except ValueError as e:  # includes pydantic.ValidationError
+                last_error = e
+                logger.warning(f"Unusable JSON reply (attempt {attempt + 1}): {str(e)[:300]}")
+                # An empty reply is left out: some backends reject null/empty assistant turns
+                reply = [{"role": "assistant", "content": text}] if text else []
+                attempt_messages = messages + reply + [
+                    {"role": "user", "content": f"That reply could not be used: {str(e)[:500]}\nRespond again with only the corrected JSON."},
+                ]
+        
+        if fallback is not MISSING:
+            logger.error(f"Falling back after invalid JSON replies: {last_error}")
+            return fallback
+        raise last_error
+    
+    async def chat_many(
+        self,
+        requests: List[dict],
+        max_concurrency: Optional[int] = None,
+    ) -> List[ChatResult]:
+        """
+        Run independent chat requests concurrently.
+        
+        Args:
+            requests: Keyword arguments for `chat`, one dict per request
+            max_concurrency: Requests in flight at once from this batch
+                (default LLM_MAX_CONCURRENCY); provider limits still apply
+                through the shared limiter
             
-            async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
-        except APIError as e:
-            error_msg = str(e).lower()
-            if "developer instruction" in error_msg or "system message" in error_msg:
-                # Merge system messages into the first user message
-                new_messages = []
-                system_content = ""
-                first_user_idx = -1
-                
-                for i, msg in enumerate(messages):
-                    if msg["role"] == "system":
-                        system_content += msg["content"] + "\n\n"
-                    elif msg["role"] == "user" and first_user_idx == -1:
-                        first_user_idx = i
-                
-                if system_content:
-                    for i, msg in enumerate(messages):
-                        if msg["role"] == "system":
-                            continue
-                        if i == first_user_idx:
-                            new_messages.append({
-                                "role": "user", 
-                                "content": f"INSTRUCTIONS:\n{system_content}USER REQUEST: {msg['content']}"
-                            })
-                        else:
-                            new_messages.append(msg)
-                    
-                    # Retry with the merged messages (not recursive to avoid infinite loops)
-                    stream = await self.client.chat.completions.create(
-                        model=self.model,
-                        messages=new_messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        stream=True,
-                        extra_headers={
-                            "HTTP-Referer": "https://ai-career-agent.vercel.app",
-                            "X-Title": "AI Career Agent"
-                        }
-                    )
-                    async for chunk in stream:
-                        if chunk.choices[0].delta.content:
-                            yield chunk.choices[0].delta.content
-                    return
-
-            raise Exception(f"Streaming error: {e}") from e
-        except Exception as e:
-            raise Exception(f"Unexpected streaming error: {e}") from e
+        Returns:
+            One ChatResult per request, in input order. A failed request
+            carries its exception instead of failing the batch.
+        """
+        import asyncio
+        
+        slots = asyncio.Semaphore(max_concurrency or self.settings.llm_max_concurrency)
+        
+        async def run(index: int, request: dict) -> ChatResult:
+            async with slots:
+                try:
+                    return ChatResult(content=await self.chat(**request))
+                except Exception as e:
+                    logger.warning(f"Batched chat request {index} failed: {e}")
+                    return ChatResult(error=e)
+        
+        return list(await asyncio.gather(*(run(i, r) for i, r in enumerate(requests))))
     
-    async def simple_prompt(self, prompt: str, system: Optional[str] = None) -> str:
+    async def simple_prompt(self, prompt: str, system: Optional[str] = None, cache: Optional[bool] = None) -> str:
         """
         Simple prompt with optional system message.
         
         Args:
             prompt: The user's prompt
             system: Optional system message
+            cache: Response cache policy, as for `chat`
             
         Returns:
             The assistant's response
@@ -272,7 +712,7 @@ class LLMClient:
             messages.append({"role": "system", "content": system})
         messages.append({"role": "user", "content": prompt})
         
-        return await self.chat(messages)
+        return await self.chat(messages, cache=cache)
 
 
 def get_langchain_llm(mode: Optional[Literal["free", "paid"]] = None) -> ChatOpenAI:
@@ -299,11 +739,69 @@ def get_langchain_llm(mode: Optional[Literal["free", "paid"]] = None) -> ChatOpe
         },
         temperature=settings.temperature,
         streaming=True,
+        http_async_client=get_http_client(settings),
     )
 
 
+def is_response_format_error(error_msg: str) -> bool:
+    """Whether a provider error says it does not support the requested response_format."""
+    return any(x in error_msg for x in ("response_format", "json_schema", "json mode", "structured output"))
+
+
+def merge_system_messages(messages: list[dict]) -> Optional[list[dict]]:
+    """
+    Fold system messages into the first user message, for providers that
+    reject system instructions. Returns None when there is nothing to merge.
+    """
+    system_content = ""
+    first_user_idx = -1
+    for i, msg in enumerate(messages):
+        if msg["role"] == "system":
+            system_content += msg["content"] + "\n\n"
+        elif msg["role"] == "user" and first_user_idx == -1:
+            first_user_idx = i
+    if not system_content:
+        return None
+    
+    new_messages = []
+    for i, msg in enumerate(messages):
+        if msg["role"] == "system":
+            continue
+        if i == first_user_idx:
+            new_messages.append({
+                "role": "user",
+                "content": f"INSTRUCTIONS:\n{system_content}USER REQUEST: {msg['content']}"
+            })
+        else:
+            new_messages.append(msg)
+    return new_messages
+
+
+_llm_clients: Dict[Optional[str], LLMClient] = {}  # None: the default mode
+
+
+def get_llm_client(mode: Optional[Literal["free", "paid"]] = None) -> LLMClient:
+    """
+    Shared LLMClient for a model mode.
+
+    Agents and routers should use this rather than constructing LLMClient per
+    call: the settings read, provider clients and encoder are set up once.
+    Settings (including DEFAULT_MODEL_MODE when no mode is given) are read
+    when the client is first created, so changes to `.env` take effect on
+    restart.
+    """
+    client = _llm_clients.get(mode)
+    if client is None:
+        resolved = mode or get_settings().default_model_mode
+        client = _llm_clients.get(resolved) or LLMClient(resolved)
+        _llm_clients[resolved] = client
+        # Cache the default under None too, so later calls skip the settings read
+        _llm_clients[mode] = client
+    return client
+
+
 # Convenience function
 async def quick_llm(prompt: str, system: Optional[str] = None) -> str:
     """Quick one-off LLM call."""
-    client = LLMClient()
+    client = get_llm_client()
     return await client.simple_prompt(prompt, system)
@@ -0,0 +1,171 @@
+"""
+Persistent response cache for LLMClient.chat.
+
+Responses are keyed on the model, the normalized messages, the temperature
+and max_tokens. An in-memory LRU sits in front of a TTL'd SQLite file so
+repeated prompts (job description analysis, company research, chunk
+classification) skip the provider round trip, also across restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from core.cache import TTLCache, MISSING
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_HORIZONTAL_WS = re.compile(r"[ \t]+")
+
+
+def normalize_content(content: str) -> str:
+    """Collapse formatting-only differences: line endings, runs of spaces, edge whitespace."""
+    lines = content.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(_HORIZONTAL_WS.sub(" ", line).strip() for line in lines).strip()
+
+
+def make_cache_key(
+    model: str,
+    messages: list[dict],
+    temperature: float,
+    max_tokens: int,
+    response_format: Optional[dict] = None,
+) -> str:
+    """Stable hash of everything that determines a completion."""
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": m.get("role"), "content": normalize_content(m.get("content") or "")}
+            for m in messages
+        ],
+        "temperature": round(float(temperature), 3),
+        "max_tokens": max_tokens,
+    }
+    if response_format:
+        payload["response_format"] = response_format
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-level response cache: in-memory LRU over a SQLite file.
+
+    SQLite calls run in a worker thread so the event loop never blocks on
+    disk. Expired rows are ignored on read and pruned periodically on write.
+    """
+
+    PRUNE_EVERY = 200  # writes between expired-row sweeps
+
+    def __init__(self, path: str, ttl: float, memory_entries: int = 512):
+        self.path = path
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=memory_entries, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_expires ON llm_responses(expires_at)")
+            self._conn = conn
+        return self._conn
+
+    def _read(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT response FROM llm_responses WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _write(self, key: str, model: str, response: str):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, model, response, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now + self.ttl),
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+            conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Cached response for `key`, or None."""
+        value = self.memory.get(key)
+        if value is MISSING:
+            try:
+                value = await asyncio.to_thread(self._read, key)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache read failed: {e}")
+                value = None
+            if value is not None:
+                self.memory.set(key, value)
+        if value is None or value is MISSING:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, model: str, response: str):
+        """Store a response in both levels. Disk errors are logged, not raised."""
+        self.memory.set(key, response)
+        try:
+            await asyncio.to_thread(self._write, key, model, response)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self.memory),
+            "ttl_seconds": self.ttl,
+            "path": self.path,
+        }
+
+
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_response_cache(settings=None) -> Optional[LLMResponseCache]:
+    """The process-wide response cache, or None when LLM_CACHE_ENABLED is off."""
+    global _response_cache
+    settings = settings or get_settings()
+    if not settings.llm_cache_enabled:
+        return None
+    if _response_cache is None:
+        _response_cache = LLMResponseCache(
+            path=settings.llm_cache_path,
+            ttl=settings.llm_cache_ttl_seconds,
+            memory_entries=settings.llm_cache_memory_entries,
+        )
+    return _response_cache
@@ -0,0 +1,220 @@
+"""
+Shared provider health tracking and circuit breaking for LLM failover.
+
+Each provider gets a ProviderHealth that records recent call latencies and
+failures. Repeated failures open its circuit: calls skip the provider until a
+cooldown passes, then a single half-open probe decides whether it closes
+again. LLMClient orders providers by current health before each request.
+
+With LLM_HEDGE_ENABLED, a chat that outlasts a percentile of the primary's
+recent latency is also sent to the next healthy provider (see
+LLMClient._chat_with_failover); HedgeBudget caps those extra calls.
+"""
+
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from core.config import get_settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of `values` (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class ProviderHealth:
+    """
+    Rolling health and circuit state for one provider.
+
+    closed -> open after `failure_threshold` consecutive failures (a hard
+    failure such as an invalid key or exhausted quota opens it at once);
+    open -> half_open once `cooldown` seconds pass, admitting one probe;
+    a successful probe closes the circuit, a failed one reopens it with the
+    cooldown doubled (up to `max_cooldown`).
+    """
+
+    WINDOW = 50  # recent calls kept for rates and percentiles
+
+    def __init__(self, name: str, failure_threshold: int = 3, cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_started_at: Optional[float] = None
+        self.consecutive_failures = 0
+        self.outcomes: deque = deque(maxlen=self.WINDOW)  # True/False per call
+        self.latencies: deque = deque(maxlen=self.WINDOW)  # seconds, successful calls
+
+    def _refresh(self):
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            self.probe_started_at = None
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to this provider now (claims the probe when half-open)."""
+        self._refresh()
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN:
+            # A probe that never reported back (caller gave up) is released after a cooldown
+            now = time.monotonic()
+            if self.probe_started_at is None or now - self.probe_started_at >= self.cooldown:
+                self.probe_started_at = now
+                return True
+        return False
+
+    @property
+    def closed(self) -> bool:
+        """Whether the circuit is closed (fully healthy, no probe needed)."""
+        self._refresh()
+        return self.state == CLOSED
+
+    def release(self):
+        """Give back a claimed probe without recording an outcome."""
+        self.probe_started_at = None
+
+    def record_success(self, latency: float):
+        self.outcomes.append(True)
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.cooldown = self.base_cooldown
+        self.probe_started_at = None
+
+    def record_failure(self, hard: bool = False):
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        self.probe_started_at = None
+        if self.state == HALF_OPEN:
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open()
+        elif hard or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        return percentile(list(self.latencies), pct)
+
+    def sort_key(self) -> tuple:
+        """
+        Lower is healthier: circuit state, then error rate (in 10% steps),
+        then median latency (in 5 s steps). Coarse steps keep the configured
+        order among providers that are roughly equally healthy.
+        """
+        self._refresh()
+        state_rank = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}[self.state]
+        p50 = self.latency_percentile(0.5)
+        return (state_rank, round(self.error_rate, 1), int(p50 // 5) if p50 is not None else 0)
+
+    def stats(self) -> dict:
+        self._refresh()
+        p50, p95 = self.latency_percentile(0.5), self.latency_percentile(0.95)
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate, 3),
+            "consecutive_failures": self.consecutive_failures,
+            "calls": len(self.outcomes),
+            "latency_p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "cooldown_seconds": self.cooldown,
+        }
+
+
+class HedgeBudget:
+    """
+    Caps hedged requests to a fraction of calls.
+
+    Every eligible call earns `ratio` of a hedge, up to `burst` banked
+    hedges; a hedge spends one. With ratio 0.05 at most about 5% of calls
+    are duplicated, however slow the primary gets.
+    """
+
+    def __init__(self, ratio: float, burst: float = 5.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.credit = 0.0
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.denied = 0
+
+    def record_call(self):
+        self.calls += 1
+        self.credit = min(self.burst, self.credit + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.credit >= 1.0:
+            self.credit -= 1.0
+            self.hedged += 1
+            return True
+        self.denied += 1
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "denied": self.denied,
+            "hedge_rate": round(self.hedged / self.calls, 4) if self.calls else 0.0,
+        }
+
+
+_health: Dict[str, ProviderHealth] = {}
+_hedge_budget: Optional[HedgeBudget] = None
+
+
+def get_health(provider: str, settings=None) -> ProviderHealth:
+    """Shared health record for a provider."""
+    health = _health.get(provider)
+    if health is None:
+        settings = settings or get_settings()
+        health = ProviderHealth(
+            provider,
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            cooldown=settings.llm_breaker_cooldown_seconds,
+        )
+        _health[provider] = health
+    return health
+
+
+def order_providers(providers: List[dict], settings=None) -> List[dict]:
+    """Providers sorted healthiest first; ties keep the configured order."""
+    return sorted(providers, key=lambda p: get_health(p["name"], settings).sort_key())
+
+
+def get_health_metrics() -> Dict[str, dict]:
+    return {name: health.stats() for name, health in _health.items()}
+
+
+def get_hedge_budget(settings=None) -> HedgeBudget:
+    """Shared hedge budget across all LLM clients."""
+    global _hedge_budget
+    if _hedge_budget is None:
+        settings = settings or get_settings()
+        _hedge_budget = HedgeBudget(settings.llm_hedge_budget)
+    return _hedge_budget
+
+
+def get_hedge_metrics() -> Optional[dict]:
+    return _hedge_budget.stats() if _hedge_budget is not None else None
@@ -0,0 +1,173 @@
+"""
+Process-wide admission control for LLM provider calls.
+
+Every LLMClient shares one ProviderLimiter per (provider, model). A limiter
+caps in-flight requests and keeps requests-per-minute and tokens-per-minute
+token buckets, admitting queued calls in arrival order. Calls wait for
+capacity up front instead of being sent, rejected with 429, and retried.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to `per_minute` units."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float):
+        """Take `amount` units; the level may go negative to record a debt."""
+        self._refill()
+        self.level -= amount
+
+
+class Permit:
+    """Handle for an admitted call; reconciles estimated and actual token use."""
+
+    def __init__(self, limiter: "ProviderLimiter", estimated_tokens: int):
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.queue_wait = 0.0
+
+    def settle(self, actual_tokens: Optional[int]):
+        """Refund (or charge) the difference once the provider reports usage."""
+        if actual_tokens is None:
+            return
+        self.limiter.tokens.consume(actual_tokens - self.estimated_tokens)
+        self.limiter.tokens_used += actual_tokens
+
+
+class ProviderLimiter:
+    """
+    Concurrency cap plus RPM/TPM buckets for one provider/model.
+
+    Admission is FIFO: asyncio.Lock wakes waiters in order, and the caller at
+    the head holds it until it has a concurrency slot and bucket capacity.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, rpm: int, tpm: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._admission = asyncio.Lock()
+        self._blocked_until = 0.0
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.tokens_used = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def backoff(self, seconds: float):
+        """Pause admissions, e.g. after the provider still returned a 429."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    @asynccontextmanager
+    async def acquire(self, estimated_tokens: int):
+        """Wait for a slot and bucket capacity, then hold the slot for the call."""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._admission:
+                await self._slots.acquire()
+                try:
+                    while True:
+                        wait = max(
+                            self._blocked_until - time.monotonic(),
+                            self.requests.time_until(1),
+                            self.tokens.time_until(estimated_tokens),
+                        )
+                        if wait <= 0:
+                            break
+                        await asyncio.sleep(wait)
+                except BaseException:
+                    self._slots.release()
+                    raise
+                self.requests.consume(1)
+                self.tokens.consume(estimated_tokens)
+        finally:
+            self.waiting -= 1
+
+        permit = Permit(self, estimated_tokens)
+        permit.queue_wait = time.monotonic() - started
+        self.admitted += 1
+        self.queue_wait_total += permit.queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, permit.queue_wait)
+        self.in_flight += 1
+        try:
+            yield permit
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "rpm_available": round(max(self.requests.level, 0), 1),
+            "tpm_available": round(max(self.tokens.level, 0)),
+            "tokens_used": self.tokens_used,
+            "queue_wait_avg_ms": round(self.queue_wait_total / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "queue_wait_max_ms": round(self.queue_wait_max * 1000, 2),
+        }
+
+
+_limiters: Dict[Tuple[str, str], ProviderLimiter] = {}
+
+
+def get_limiter(provider: str, model: str, settings=None) -> ProviderLimiter:
+    """
+    Shared limiter for a provider/model.
+
+    Limits come from LLM_PROVIDER_LIMITS, looked up as "<provider>:<model>"
+    and then "<provider>", falling back to the LLM_MAX_CONCURRENCY / LLM_RPM /
+    LLM_TPM defaults.
+    """
+    key = (provider, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        settings = settings or get_settings()
+        overrides = settings.llm_provider_limits.get(f"{provider}:{model}") \
+            or settings.llm_provider_limits.get(provider) or {}
+        limiter = ProviderLimiter(
+            name=f"{provider}:{model}",
+            max_concurrency=int(overrides.get("max_concurrency", settings.llm_max_concurrency)),
+            rpm=int(overrides.get("rpm", settings.llm_rpm)),
+            tpm=int(overrides.get("tpm", settings.llm_tpm)),
+        )
+        _limiters[key] = limiter
+    return limiter
+
+
+def get_limiter_metrics() -> Dict[str, dict]:
+    """Per provider/model admission metrics."""
+    return {limiter.name: limiter.stats() for limiter in _limiters.values()}
@@ -0,0 +1,276 @@
+"""
+Per-call LLM telemetry.
+
+LLMClient opens a CallTrace for every upstream call (after the response
+cache). A trace records the mission and graph node it ran for, the provider
+and model that served it, queue wait, time to first token, total latency,
+token usage, retries and cost. Finished traces feed an in-memory aggregate
+(exposed on /metrics) and are written to the `llm_calls` table in batches
+by a background flush started with the app, so recording never adds a
+database round trip to a call.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.config import get_settings
+from core.llm_health import percentile
+
+logger = logging.getLogger(__name__)
+
+_call_context: ContextVar[Tuple[Optional[str], Optional[str]]] = ContextVar("llm_call_context", default=(None, None))
+
+
+@contextmanager
+def llm_call_context(mission_id: Optional[str] = None, node: Optional[str] = None):
+    """Attribute LLM calls made inside the block to a mission and graph node."""
+    token = _call_context.set((mission_id, node))
+    try:
+        yield
+    finally:
+        _call_context.reset(token)
+
+
+def traced_node(node: str, fn: Callable) -> Callable:
+    """Wrap a LangGraph node so its LLM calls are attributed to it."""
+    @wraps(fn)
+    async def wrapper(state, *args, **kwargs):
+        with llm_call_context(state.get("mission_id"), node):
+            return await fn(state, *args, **kwargs)
+    return wrapper
+
+
+@dataclass
+class CallTrace:
+    """Measurements for one LLM call, including its retries."""
+    operation: str  # "chat", "hedge" or "stream"
+    mission_id: Optional[str] = None
+    node: Optional[str] = None
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    attempts: int = 0
+    queue_wait: float = 0.0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    status: str = "ok"
+    error: Optional[str] = None
+    finish_reason: Optional[str] = None  # as reported by the provider ("stop", "length", ...)
+    started: float = field(default_factory=time.monotonic)
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    created_at: datetime = field(default_factory=datetime.now)
+
+    @classmethod
+    def start(cls, operation: str) -> "CallTrace":
+        mission_id, node = _call_context.get()
+        return cls(operation=operation, mission_id=mission_id, node=node)
+
+    def attempt(self, provider: str, model: str):
+        """A request is being sent to `provider`."""
+        self.attempts += 1
+        self.provider, self.model = provider, model
+
+    def first_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.finished_at = time.monotonic()
+        if isinstance(error, asyncio.CancelledError):
+            self.status = "cancelled"
+        elif error is not None:
+            self.status = "error"
+            self.error = (str(error) or type(error).__name__)[:500]
+        record_call(self)
+
+    @property
+    def retries(self) -> int:
+        return max(self.attempts - 1, 0)
+
+    @property
+    def latency_ms(self) -> float:
+        return ((self.finished_at or time.monotonic()) - self.started) * 1000
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        return (self.first_token_at - self.started) * 1000 if self.first_token_at else None
+
+    def cost_usd(self, prices: Dict[str, Dict[str, float]]) -> Optional[float]:
+        """Cost from LLM_MODEL_PRICES (USD per million prompt/completion tokens)."""
+        price = prices.get(self.model or "")
+        if not price or self.prompt_tokens is None:
+            return None
+        return (
+            self.prompt_tokens * price.get("prompt", 0.0)
+            + (self.completion_tokens or 0) * price.get("completion", 0.0)
+        ) / 1_000_000
+
+
+class CallAggregate:
+    """Rolling totals and latency percentiles for one group of calls."""
+
+    WINDOW = 500
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.queue_wait_total = 0.0
+        self.latencies: deque = deque(maxlen=self.WINDOW)
+        self.ttfts: deque = deque(maxlen=self.WINDOW)
+
+    def add(self, trace: CallTrace, cost: Optional[float]):
+        self.calls += 1
+        self.errors += trace.status == "error"
+        self.retries += trace.retries
+        self.prompt_tokens += trace.prompt_tokens or 0
+        self.completion_tokens += trace.completion_tokens or 0
+        self.cost_usd += cost or 0.0
+        self.queue_wait_total += trace.queue_wait
+        self.latencies.append(trace.latency_ms)
+        if trace.ttft_ms is not None:
+            self.ttfts.append(trace.ttft_ms)
+
+    def stats(self) -> dict:
+        latencies, ttfts = list(self.latencies), list(self.ttfts)
+
+        def ms(value):
+            return round(value, 1) if value is not None else None
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "queue_wait_avg_ms": round(self.queue_wait_total / self.calls * 1000, 1) if self.calls else 0.0,
+            "latency_p50_ms": ms(percentile(latencies, 0.5)),
+            "latency_p95_ms": ms(percentile(latencies, 0.95)),
+            "ttft_p50_ms": ms(percentile(ttfts, 0.5)),
+            "ttft_p95_ms": ms(percentile(ttfts, 0.95)),
+        }
+
+
+class LLMTelemetry:
+    """In-memory aggregates plus a buffered writer to the llm_calls table."""
+
+    MAX_BUFFER = 5000  # rows kept while the database is unreachable
+
+    def __init__(self):
+        self.by_model: Dict[str, CallAggregate] = {}
+        self.by_node: Dict[str, CallAggregate] = {}
+        self._buffer: deque = deque(maxlen=self.MAX_BUFFER)
+        self._flush_task: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self.written = 0
+        # LLM_TELEMETRY_ENABLED / LLM_MODEL_PRICES, read once by configure()
+        self.enabled: Optional[bool] = None
+        self.prices: Dict[str, Dict[str, float]] = {}
+
+    def configure(self, settings):
+        """Read the telemetry settings; `.env` changes take effect on restart."""
+        self.enabled = settings.llm_telemetry_enabled
+        self.prices = settings.llm_model_prices
+
+    def record(self, trace: CallTrace):
+        if self.enabled is None:
+            self.configure(get_settings())
+        if not self.enabled:
+            return
+        cost = trace.cost_usd(self.prices)
+        self.by_model.setdefault(f"{trace.provider}:{trace.model}", CallAggregate()).add(trace, cost)
+        self.by_node.setdefault(trace.node or "(none)", CallAggregate()).add(trace, cost)
+
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(self._row(trace, cost))
+
+    @staticmethod
+    def _row(trace: CallTrace, cost: Optional[float]) -> tuple:
+        return (
+            trace.mission_id, trace.node, trace.operation, trace.provider, trace.model,
+            trace.status, trace.error, trace.retries,
+            round(trace.queue_wait * 1000, 2), trace.ttft_ms, trace.latency_ms,
+            trace.prompt_tokens, trace.completion_tokens, cost, trace.created_at,
+        )
+
+    def start(self, interval: float, settings=None):
+        """Read settings and start the periodic flush (app startup)."""
+        self.configure(settings or get_settings())
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop(interval))
+
+    async def stop(self):
+        """Stop the periodic flush and write what is left (app shutdown)."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    async def flush(self):
+        """
+        Write buffered rows; on failure they stay buffered for the next flush.
+
+        Rows recorded while the write was in flight always stay; failed rows
+        go back in front of them only as far as the buffer has room, and the
+        oldest that do not fit are counted in `dropped`.
+        """
+        if not self._buffer:
+            return
+        rows = list(self._buffer)
+        self._buffer.clear()
+        try:
+            from core.database import db
+            await db.insert_llm_calls(rows)
+            self.written += len(rows)
+        except Exception as e:
+            logger.warning(f"Could not write {len(rows)} LLM call records: {e}")
+            room = self._buffer.maxlen - len(self._buffer)
+            keep = rows[len(rows) - room:] if room > 0 else []
+            self.dropped += len(rows) - len(keep)
+            self._buffer.extendleft(reversed(keep))
+
+    def metrics(self) -> dict:
+        return {
+            "by_model": {key: agg.stats() for key, agg in self.by_model.items()},
+            "by_node": {key: agg.stats() for key, agg in self.by_node.items()},
+            "pending_rows": len(self._buffer),
+            "written_rows": self.written,
+            "dropped_rows": self.dropped,
+        }
+
+
+# Global instance
+telemetry = LLMTelemetry()
+
+
+def record_call(trace: CallTrace):
+    try:
+        telemetry.record(trace)
+    except Exception as e:  # telemetry must never fail a call
+        logger.warning(f"LLM telemetry record failed: {e}")
+
+
+def get_call_metrics() -> Dict[str, Any]:
+    return telemetry.metrics()
@@ -2,7 +2,7 @@
 Pydantic models for validating LLM JSON responses.
 """
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationError, field_validator
 from typing import List, Optional
 
 
@@ -41,30 +41,32 @@ class InterviewQuestion(BaseModel):
 def parse_llm_json(json_str: str, model: type[BaseModel], fallback: Optional[BaseModel] = None) -> BaseModel:
     """
     Safely parse LLM JSON response with validation.
-    Handles markdown code blocks and common formatting issues.
+    Handles markdown code blocks and common formatting issues, repairing
+    near-JSON and truncated replies (see core/structured.py).
+    
+    New code should prefer LLMClient.chat_json, which also re-asks the
+    model when the reply is unusable.
     """
-    import json
     import logging
-    import re
+    from core.structured import loads_lenient
     
     logger = logging.getLogger(__name__)
     
-    # 1. Clean the string
     cleaned_str = json_str.strip()
     
-    # 2. Extract JSON from markdown blocks if present
-    # Matches ```json {..} ``` or ``` {..} ```
-    markdown_match = re.search(r'```(?:json)?\s*(.*?)\s*```', cleaned_str, re.DOTALL)
-    if markdown_match:
-        cleaned_str = markdown_match.group(1).strip()
-    
     try:
-        # Try parsing as JSON
-        data = json.loads(cleaned_str)
+        # Parse, repairing if needed
+        data = loads_lenient(cleaned_str)
         
         # Validate with Pydantic
         return model.model_validate(data)
-    except json.JSONDecodeError as e:
+    except ValidationError as e:
+        logger.error(f"Validation error: {e}")
+        logger.error(f"Data was: {cleaned_str[:500]}")
+        if fallback:
+            return fallback
+        return model()
+    except ValueError as e:
         logger.error(f"JSON decode error: {e}")
         logger.error(f"Failed string (first 500 chars): {cleaned_str[:500]}")
         if fallback:
@@ -0,0 +1,98 @@
+"""
+Token-budgeted packing of prompt context.
+
+Agents describe the variable parts of a prompt (job analysis, feedback,
+retrieved resume chunks, job descriptions) as prioritized sections and pack
+them into the tokens a request can afford (see LLMClient.prompt_budget).
+Higher-priority sections are filled first; sections that do not fit are
+trimmed at line (bullet) or sentence boundaries, never mid-sentence.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class PromptSection:
+    """
+    A named, prioritized piece of prompt context.
+
+    Lower `priority` values are packed first. Sections sharing a priority
+    split the remaining budget evenly, with unused share passed on to the
+    others. `max_tokens` caps a section even when more budget is left.
+    """
+    name: str
+    text: str
+    priority: int = 0
+    max_tokens: Optional[int] = None
+
+
+def trim_to_tokens(text: str, max_tokens: int, count_tokens: Callable[[str], int]) -> str:
+    """
+    Longest prefix of `text` within `max_tokens` that ends on a line or
+    sentence boundary. Trailing headers left without content are dropped.
+    """
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    kept: List[str] = []
+    used = 0
+    for line in text.split("\n"):
+        separator = 1 if kept else 0  # the joining newline
+        cost = count_tokens(line) + separator
+        if used + cost <= max_tokens:
+            kept.append(line)
+            used += cost
+            continue
+
+        # Keep the whole sentences of this line that still fit
+        sentences: List[str] = []
+        for sentence in _SENTENCE_END.split(line):
+            if used + count_tokens(" ".join(sentences + [sentence])) + separator > max_tokens:
+                break
+            sentences.append(sentence)
+        if sentences:
+            kept.append(" ".join(sentences))
+        break
+
+    while kept and (not kept[-1].strip() or kept[-1].lstrip().startswith("#")):
+        kept.pop()
+    return "\n".join(kept)
+
+
+def pack_sections(
+    sections: List[PromptSection],
+    budget: int,
+    count_tokens: Callable[[str], int],
+) -> Dict[str, str]:
+    """
+    Fit `sections` into `budget` tokens.
+
+    Returns the (possibly trimmed) text for every section by name; sections
+    that did not fit at all map to "".
+    """
+    packed = {section.name: "" for section in sections}
+    remaining = max(budget, 0)
+
+    for priority in sorted({section.priority for section in sections}):
+        group = [s for s in sections if s.priority == priority]
+        needs = {}
+        for section in group:
+            need = count_tokens(section.text) if section.text else 0
+            needs[section.name] = need if section.max_tokens is None else min(need, section.max_tokens)
+
+        # Smallest first, so what they leave of their even share goes to the rest
+        pending = sorted(group, key=lambda s: needs[s.name])
+        while pending:
+            share = remaining // len(pending)
+            section = pending.pop(0)
+            text = trim_to_tokens(section.text, min(needs[section.name], share), count_tokens)
+            packed[section.name] = text
+            if text:
+                remaining -= count_tokens(text)
+    return packed
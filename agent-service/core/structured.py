@@ -0,0 +1,257 @@
+"""
+Lenient JSON handling for LLM output.
+
+- `repair_json` fixes the usual near-JSON mistakes locally (code fences,
+  leading prose, single quotes, Python literals, trailing commas, raw
+  newlines in strings, mismatched closers).
+- `IncrementalJSONParser` consumes a streamed reply and yields the largest
+  valid prefix as a value, so partial results can be shown before the
+  completion ends (LLMClient.chat_json's `on_partial`).
+- `loads_lenient` parses a finished reply: as-is, then repaired. A
+  truncated reply is an error, never a salvaged prefix, so callers can
+  re-ask instead of accepting half a value.
+"""
+
+import json
+import re
+from typing import Any, List, Optional, get_origin
+
+_FENCED = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+_OPEN_FENCE = re.compile(r"^```(?:json)?\s*")
+_PARTIAL_ESCAPE = re.compile(r"\\u[0-9a-fA-F]{0,3}$")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def strip_code_fences(text: str) -> str:
+    """Contents of the first ``` block, or `text` without an unterminated opening fence."""
+    text = text.strip()
+    match = _FENCED.search(text)
+    if match:
+        return match.group(1).strip()
+    return _OPEN_FENCE.sub("", text)
+
+
+def repair_json(text: str) -> str:
+    """
+    Normalize near-JSON into JSON, starting at the first object or array.
+
+    Stops after the first complete top-level value. A truncated value is
+    returned as-is (and will not parse).
+    """
+    text = strip_code_fences(text)
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    quote = '"'
+    escape = False
+    i = min(starts)
+    while i < len(text):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+                if ch == "'":
+                    out[-1] = "'"  # \' is not a JSON escape
+                else:
+                    out.append(ch)
+            elif ch == "\\":
+                escape = True
+                out.append(ch)
+            elif ch == quote:
+                in_string = False
+                out.append('"')
+            elif ch == '"':
+                out.append('\\"')  # double quote inside a single-quoted string
+            elif ch == "\n":
+                out.append("\\n")
+            else:
+                out.append(ch)
+        elif ch in "\"'":
+            in_string, quote = True, ch
+            out.append('"')
+        elif ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                out.append(_CLOSERS[stack.pop()])
+            if not stack:
+                break
+        else:
+            literal = next(
+                (k for k in _PYTHON_LITERALS if text.startswith(k, i)
+                 and not text[i + len(k):i + len(k) + 1].isalnum()),
+                None,
+            )
+            if literal:
+                out.append(_PYTHON_LITERALS[literal])
+                i += len(literal)
+                continue
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def _strip_trailing_comma(out: List[str]):
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j:]
+
+
+class IncrementalJSONParser:
+    """
+    Streaming parser for one JSON object or array.
+
+    `feed(chunk)` scans only the new text and returns the current partial
+    value: containers closed at the last complete element, plus an
+    in-progress string value. Text before the first `{` or `[` (prose,
+    code fences) is skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._stack: List[list] = []  # [opener, what comes next]
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._in_scalar = False
+        self._safe_end: Optional[int] = None
+        self._safe_closers = ""
+
+    @property
+    def complete(self) -> bool:
+        return self._end is not None
+
+    def feed(self, chunk: str) -> Any:
+        self.buffer += chunk
+        self._scan()
+        return self.partial()
+
+    def _closers(self) -> str:
+        return "".join(_CLOSERS[opener] for opener, _ in reversed(self._stack))
+
+    def _open(self, ch: str, i: int):
+        self._stack.append([ch, "key" if ch == "{" else "value"])
+        self._safe_end, self._safe_closers = i + 1, self._closers()
+
+    def _value_done(self, end: int):
+        if not self._stack:
+            self._end = end
+            return
+        self._stack[-1][1] = "comma"
+        self._safe_end, self._safe_closers = end, self._closers()
+
+    def _scan(self):
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf) and self._end is None:
+            ch = buf[i]
+            if self._start is None:
+                if ch in "{[":
+                    self._start = i
+                    self._open(ch, i)
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        self._stack[-1][1] = "colon"
+                    else:
+                        self._value_done(i + 1)
+            else:
+                if self._in_scalar and ch in ",}] \t\r\n":
+                    self._in_scalar = False
+                    self._value_done(i)
+                if self._in_scalar:
+                    pass
+                elif ch == '"':
+                    self._in_string = True
+                    opener, expect = self._stack[-1]
+                    self._string_is_key = opener == "{" and expect == "key"
+                elif ch in "{[":
+                    self._open(ch, i)
+                elif ch in "}]":
+                    if self._stack:
+                        self._stack.pop()
+                    self._value_done(i + 1)
+                elif ch == ":":
+                    self._stack[-1][1] = "value"
+                elif ch == ",":
+                    self._stack[-1][1] = "key" if self._stack[-1][0] == "{" else "value"
+                elif not ch.isspace():
+                    self._in_scalar = True
+            i += 1
+        self._pos = i
+
+    def partial(self) -> Any:
+        """The value parsed so far, or None before anything usable arrived."""
+        if self._start is None:
+            return None
+        if self._end is not None:
+            candidates = [self.buffer[self._start:self._end]]
+        else:
+            candidates = []
+            if self._in_string and not self._string_is_key:
+                text = self.buffer[self._start:self._pos]
+                if self._escape:
+                    text = text[:-1]
+                candidates.append(_PARTIAL_ESCAPE.sub("", text) + '"' + self._closers())
+            if self._safe_end is not None:
+                candidates.append(self.buffer[self._start:self._safe_end] + self._safe_closers)
+        for candidate in candidates:
+            try:
+                return json.loads(candidate)
+            except ValueError:
+                continue
+        return None
+
+
+def loads_lenient(text: str) -> Any:
+    """
+    Parse LLM output as JSON: as-is, then repaired. Raises ValueError if
+    neither parses, including for a reply cut off mid-value.
+    """
+    cleaned = strip_code_fences(text)
+    try:
+        return json.loads(cleaned)
+    except ValueError:
+        pass
+
+    repaired = repair_json(cleaned)
+    try:
+        return json.loads(repaired)
+    except ValueError as e:
+        error = e
+
+    parser = IncrementalJSONParser()
+    if parser.feed(repaired) is None:
+        raise ValueError(f"No JSON value found in reply: {text[:200]!r}")
+    if not parser.complete:
+        raise ValueError("Reply was cut off before the JSON value was complete")
+    raise ValueError(f"Invalid JSON in reply: {error}")
+
+
+def unwrap_single_key(schema: Any, data: Any) -> Any:
+    """
+    When a list is expected but the model wrapped it in an object with one
+    key (e.g. {"skills": [...]}, common in JSON object mode), return the list.
+    """
+    if (schema is list or get_origin(schema) is list) and isinstance(data, dict) and len(data) == 1:
+        (value,) = data.values()
+        if isinstance(value, list):
+            return value
+    return data
@@ -3,9 +3,12 @@ Shared state definitions for LangGraph agents.
 """
 
 from typing import TypedDict, Annotated, Optional, List, Dict, Literal, Any
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+import hashlib
+import json
 import operator
 
 
@@ -183,3 +186,97 @@ def get_retry_callback(mission_id: str):
         )
     return log_retry
 
+
+@asynccontextmanager
+async def stream_draft(mission_id: str, draft: str):
+    """
+    Yield an `on_token` callback that forwards LLM deltas for `draft` to the
+    mission's stream subscribers; the draft is marked finished on exit.
+    """
+    from core.drafts import draft_streams
+    
+    async def forward(delta: str):
+        draft_streams.publish(mission_id, draft, delta)
+    
+    try:
+        yield forward
+    finally:
+        draft_streams.finish(mission_id, draft)
+
+
+class ContextDelta:
+    """
+    Tracks which mission context keys have been persisted, so runners write
+    only the keys that changed since the last successful update_mission.
+
+    The first write of a run replaces the whole context, so keys left on the
+    row by a previous run (e.g. before a regeneration) do not survive.
+
+    Pass `**delta.diff(context)` to update_mission and call
+    `delta.mark_persisted()` once the write succeeds (runners go through
+    MissionSync, which pairs this with the event log).
+    Context values must be JSON-serializable (dicts, not models/dataclasses).
+    """
+
+    def __init__(self):
+        self._persisted: Dict[str, str] = {}  # key -> digest of the stored value
+        self._pending: Dict[str, str] = {}
+        self._synced = False  # a full context has been written this run
+
+    @staticmethod
+    def _digest(value: Any) -> str:
+        # Same encoding as update_mission, so unserializable values fail here too
+        encoded = json.dumps(value, sort_keys=True)
+        return hashlib.sha1(encoded.encode()).hexdigest()
+
+    def diff(self, context: Optional[Dict]) -> Dict[str, Any]:
+        """update_mission kwargs for what changed: `context` on the first write, then `context_patch` / `context_remove`."""
+        context = context or {}
+        self._pending = {key: self._digest(value) for key, value in context.items()}
+        if not self._synced:
+            return {"context": context}
+
+        changes: Dict[str, Any] = {}
+        patch = {key: context[key] for key, digest in self._pending.items() if self._persisted.get(key) != digest}
+        removed = [key for key in self._persisted if key not in context]
+        if patch:
+            changes["context_patch"] = patch
+        if removed:
+            changes["context_remove"] = removed
+        return changes
+
+    def mark_persisted(self):
+        """Record the last diffed context as stored."""
+        self._persisted = self._pending
+        self._synced = True
+
+
+class MissionSync:
+    """
+    Tracks which of a run's events and context keys are on the mission row.
+
+    Runners pass `**sync.pending(state)` to each per-node update_mission and
+    call `sync.mark_persisted()` once it succeeds. A failed write is only
+    logged and leaves the marks where they were, so the next write - or the
+    final write in `_run_mission`, which owns the tracker - sends the tail
+    that was never stored.
+    """
+
+    def __init__(self):
+        self.persisted_events = 0  # events already appended to the mission log
+        self.context_delta = ContextDelta()  # context keys already written to the mission row
+        self._pending_events = 0
+
+    def pending(self, state: AgentState) -> Dict[str, Any]:
+        """update_mission kwargs for the events and context changes not yet stored."""
+        events = state.get("events", [])
+        self._pending_events = len(events)
+        return {
+            **self.context_delta.diff(state.get("context")),
+            "events": [e.to_dict() if hasattr(e, "to_dict") else e for e in events[self.persisted_events:]],
+        }
+
+    def mark_persisted(self):
+        """Record the last `pending` result as stored."""
+        self.persisted_events = self._pending_events
+        self.context_delta.mark_persisted()
@@ -0,0 +1,131 @@
+"""
+Embedding backends for EmbeddingService.
+
+- `OpenAIEmbeddingBackend`: the OpenAI-compatible embeddings API (OpenRouter).
+- `HashedNgramBackend`: deterministic local embeddings computed with numpy,
+  no network. Used with EMBEDDING_BACKEND=local for offline runs, tests and
+  benchmarks, and as the degraded-mode fallback for stored rows when the
+  API fails (query embeddings never fall back).
+
+Local vectors are not comparable with API vectors, so rows embedded by the
+fallback are flagged (`embedding_degraded`), left out of similarity search
+and re-embedded later (scripts/reembed_degraded.py).
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+from core.clients import get_openai_client
+from core.llm_cache import normalize_content
+
+_WORD = re.compile(r"[a-z0-9+#]+(?:[.\-][a-z0-9+#]+)*")
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into vectors of `dimension` floats. `model` identifies the vector space."""
+
+    name: str = ""
+    model: str = ""
+    dimension: int = 0
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """One vector per text, in input order."""
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """Embeddings from an OpenAI-compatible API; errors propagate for the caller to retry."""
+
+    name = "api"
+
+    def __init__(self, client, model: str, dimension: int):
+        self.client = client
+        self.model = model
+        self.dimension = dimension
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        response = await self.client.embeddings.create(
+            model=self.model,
+            input=texts,
+        )
+        if len(response.data) != len(texts):
+            raise Exception(f"Expected {len(texts)} embeddings, got {len(response.data)}")
+        return [d.embedding for d in response.data]
+
+
+@lru_cache(maxsize=262144)
+def _feature_slot(feature: str, dimension: int) -> Tuple[int, float]:
+    """Stable (index, sign) for a feature; Python's hash() is salted per process."""
+    value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+    return value % dimension, 1.0 if value >> 63 else -1.0
+
+
+class HashedNgramBackend(EmbeddingBackend):
+    """
+    Deterministic local embeddings via the hashing trick.
+
+    Words, word bigrams and character 3-5 grams of each word are hashed into
+    `dimension` signed buckets with sublinear (1 + log tf) weights, and the
+    result is L2-normalized. Texts sharing vocabulary get a high cosine
+    similarity, which is enough for offline retrieval and tests; it is not
+    a semantic model.
+    """
+
+    name = "local"
+    CHAR_NGRAMS = (3, 4, 5)
+    CHAR_WEIGHT = 0.5  # character n-grams add typo/inflection overlap without dominating words
+
+    def __init__(self, dimension: int = 1536):
+        self.dimension = dimension
+        self.model = f"local/hashed-ngram-v1-{dimension}"
+
+    def _features(self, text: str) -> Counter:
+        words = _WORD.findall(normalize_content(text).lower())
+        features: Counter = Counter(words)
+        features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"<{word}>"
+            for n in self.CHAR_NGRAMS:
+                features.update(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature, count in self._features(text).items():
+            index, sign = _feature_slot(feature, self.dimension)
+            weight = self.CHAR_WEIGHT if feature.startswith("c:") else 1.0
+            vector[index] += sign * weight * (1.0 + math.log(count))
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            # Empty text still needs a valid direction for cosine distance
+            index, sign = _feature_slot("<empty>", self.dimension)
+            vector[index] = sign
+            return vector
+        return vector / norm
+
+    def embed_sync(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_one(text).tolist() for text in texts]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        # CPU-bound; keep long batches off the event loop
+        if sum(len(text) for text in texts) > 20_000:
+            return await asyncio.to_thread(self.embed_sync, texts)
+        return self.embed_sync(texts)
+
+
+def get_embedding_backend(settings, dimension: int) -> EmbeddingBackend:
+    """The primary backend selected by EMBEDDING_BACKEND ("api" or "local")."""
+    if settings.embedding_backend == "local":
+        return HashedNgramBackend(dimension)
+    if settings.embedding_backend != "api":
+        raise Exception(f"Unknown EMBEDDING_BACKEND: {settings.embedding_backend}")
+    client = get_openai_client(settings.openrouter_api_key, settings.openrouter_base_url, settings)
+    return OpenAIEmbeddingBackend(client, settings.embedding_model, dimension)
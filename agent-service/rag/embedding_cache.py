@@ -0,0 +1,111 @@
+"""
+Content-hash cache for embeddings.
+
+Vectors are keyed on the embedding model and the normalized text, so the
+same job description scraped for several users, the per-regeneration
+retrieval query and re-uploaded resume chunks are embedded once. An
+in-memory LRU sits in front of the `embedding_cache` table, which is shared
+by every worker and survives restarts.
+"""
+
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.cache import TTLCache, MISSING
+from core.config import get_settings
+from core.database import db
+from core.llm_cache import normalize_content
+
+logger = logging.getLogger(__name__)
+
+
+def make_embedding_key(model: str, text: str) -> str:
+    """Stable hash of the model and the text, ignoring formatting-only differences."""
+    return hashlib.sha256(f"{model}\n{normalize_content(text)}".encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-level embedding cache: in-memory LRU over Postgres.
+
+    Vectors are held in memory as float32 arrays (about 6 KB each at 1536
+    dimensions). Database errors are logged and treated as misses, so an
+    unavailable cache never fails an embedding call.
+    """
+
+    def __init__(self, memory_entries: int = 2048, memory_ttl: float = 24 * 3600):
+        self.memory = TTLCache(maxsize=memory_entries, ttl=memory_ttl)
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+
+    async def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Cached vectors for whichever of `keys` are known."""
+        found: Dict[str, List[float]] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            vector = self.memory.get(key)
+            if vector is MISSING:
+                missing.append(key)
+            else:
+                found[key] = vector.tolist()
+
+        if missing:
+            try:
+                rows = await db.get_cached_embeddings(missing)
+            except Exception as e:
+                logger.warning(f"Embedding cache read failed: {e}")
+                rows = {}
+            for key, vector in rows.items():
+                vector = np.asarray(vector, dtype=np.float32)
+                self.memory.set(key, vector)
+                found[key] = vector.tolist()
+
+        self.hits += len(found)
+        self.misses += len(dict.fromkeys(keys)) - len(found)
+        return found
+
+    async def get(self, key: str) -> Optional[List[float]]:
+        return (await self.get_many([key])).get(key)
+
+    async def set_many(self, model: str, vectors: Dict[str, List[float]]):
+        """Store vectors in both levels. Database errors are logged, not raised."""
+        if not vectors:
+            return
+        for key, vector in vectors.items():
+            self.memory.set(key, np.asarray(vector, dtype=np.float32))
+
+        try:
+            await db.store_cached_embeddings(model, vectors)
+            self.stored += len(vectors)
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "memory_entries": len(self.memory),
+        }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache(settings=None) -> Optional[EmbeddingCache]:
+    """The process-wide embedding cache, or None when EMBEDDING_CACHE_ENABLED is off."""
+    global _embedding_cache
+    settings = settings or get_settings()
+    if not settings.embedding_cache_enabled:
+        return None
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(memory_entries=settings.embedding_cache_memory_entries)
+    return _embedding_cache
+
+
+def get_embedding_cache_metrics() -> Optional[dict]:
+    return _embedding_cache.stats() if _embedding_cache is not None else None
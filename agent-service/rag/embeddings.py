@@ -1,32 +1,90 @@
 """
 Embedding service for AI Career Agent.
-Uses OpenRouter-compatible embedding model.
+Uses OpenRouter-compatible embedding model, or the local backend
+(see rag/embedding_backends.py).
+Vectors are cached by content hash (see rag/embedding_cache.py).
 """
 
-from openai import AsyncOpenAI
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import logging
 import numpy as np
 
 from core.config import get_settings
+from core.clients import get_encoding
+from rag.embedding_backends import HashedNgramBackend, get_embedding_backend
+from rag.embedding_cache import get_embedding_cache, make_embedding_key
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingUnavailableError(Exception):
+    """The embedding API could not embed a query; callers skip the search."""
+
+
+@dataclass
+class EmbeddingBatch:
+    """
+    Outcome of `EmbeddingService.embed_texts`, one entry per input.
+    
+    `failed` items have no vector. `degraded` items carry a local fallback
+    vector that is not comparable with API vectors; rows stored with one
+    should be flagged for re-embedding.
+    """
+    vectors: List[Optional[List[float]]]
+    failed: List[bool]
+    degraded: List[bool] = field(default_factory=list)
+    
+    def __post_init__(self):
+        if not self.degraded:
+            self.degraded = [False] * len(self.vectors)
+    
+    @property
+    def ok(self) -> bool:
+        return not any(self.failed)
+    
+    @property
+    def failed_count(self) -> int:
+        return sum(self.failed)
+    
+    @property
+    def degraded_count(self) -> int:
+        return sum(self.degraded)
 
 
 class EmbeddingService:
     """
     Generates embeddings for text using OpenAI-compatible API via OpenRouter.
+    
+    EMBEDDING_BACKEND=local swaps in deterministic local embeddings (no
+    network). With EMBEDDING_FALLBACK=local, texts the API fails to embed in
+    `embed_texts` get a local vector marked as degraded instead of an error;
+    query embeddings (`embed_text`) never fall back.
     """
     
     def __init__(self):
         self.settings = get_settings()
-        self.client = AsyncOpenAI(
-            api_key=self.settings.openrouter_api_key,
-            base_url=self.settings.openrouter_base_url,
-        )
-        self.model = self.settings.embedding_model
         self.dimension = 1536  # text-embedding-3-small dimension
+        self.backend = get_embedding_backend(self.settings, self.dimension)
+        self.model = self.backend.model
+        self.fallback = (
+            HashedNgramBackend(self.dimension)
+            if self.settings.embedding_fallback == "local" and self.backend.name != "local"
+            else None
+        )
+    
+    def _cache(self):
+        # Local vectors are cheaper to compute than to look up
+        return get_embedding_cache(self.settings) if self.backend.name != "local" else None
     
     async def embed_text(self, text: str, max_retries: int = 3) -> List[float]:
         """
-        Generate embedding for a single text with retry logic.
+        Generate embedding for a single query text with retry logic.
+        
+        Query vectors are compared against stored API vectors, so the local
+        fallback is never used here: a degraded query vector would return
+        meaningless matches. Stored rows go through `embed_texts`, which
+        flags fallback vectors instead.
         
         Args:
             text: Text to embed
@@ -36,37 +94,23 @@ class EmbeddingService:
             Embedding vector as list of floats
             
         Raises:
-            Exception: If all retries fail
+            EmbeddingUnavailableError: If all retries fail
         """
-        import asyncio
-        from openai import RateLimitError, APIError
+        cache = self._cache()
+        key = make_embedding_key(self.model, text)
+        if cache:
+            cached = await cache.get(key)
+            if cached is not None:
+                return cached
         
-        for attempt in range(max_retries):
-            try:
-                response = await self.client.embeddings.create(
-                    model=self.model,
-                    input=text,
-                )
-                return response.data[0].embedding
-            except RateLimitError:
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
-                    continue
-                # Fallback: return zero vector
-                return [0.0] * self.dimension
-            except APIError as e:
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(1)
-                    continue
-                # Fallback: return zero vector
-                return [0.0] * self.dimension
-            except Exception:
-                # Fallback: return zero vector
-                return [0.0] * self.dimension
-        
-        return [0.0] * self.dimension
+        embedding = (await self._embed_batch([text], max_retries))[0]
+        if embedding is None:
+            raise EmbeddingUnavailableError(f"Embedding failed after {max_retries} attempts ({self.model})")
+        if cache:
+            await cache.set_many(self.model, {key: embedding})
+        return embedding
     
-    async def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    async def embed_texts(self, texts: List[str]) -> EmbeddingBatch:
         """
         Generate embeddings for multiple texts (batch).
         
@@ -74,21 +118,112 @@ class EmbeddingService:
             texts: List of texts to embed
             
         Returns:
-            List of embedding vectors
+            EmbeddingBatch with vectors in input order, a per-item failure
+            mask and a per-item degraded mask; a failed batch does not fail
+            the others
+        
+        Cached texts are served from the cache; only the misses (each
+        distinct text once) are sent to the API, split into batches of at
+        most EMBEDDING_BATCH_SIZE texts and EMBEDDING_BATCH_MAX_TOKENS
+        tokens, EMBEDDING_MAX_CONCURRENCY at a time.
         """
-        # Batch in groups of 100 (API limit)
-        all_embeddings = []
-        batch_size = 100
+        import asyncio
+        
+        cache = self._cache()
+        keys = [make_embedding_key(self.model, text) for text in texts]
+        found: Dict[str, List[float]] = await cache.get_many(keys) if cache else {}
+        
+        # Distinct uncached texts, first occurrence wins
+        pending: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in pending:
+                pending[key] = text
+        
+        slots = asyncio.Semaphore(self.settings.embedding_max_concurrency)
+        
+        async def run(batch_keys: List[str]):
+            async with slots:
+                vectors = await self._embed_batch([pending[key] for key in batch_keys])
+            fresh = {key: vector for key, vector in zip(batch_keys, vectors) if vector is not None}
+            found.update(fresh)
+            if cache:
+                await cache.set_many(self.model, fresh)
+        
+        await asyncio.gather(*(run(batch) for batch in self._split_batches(pending)))
+        
+        failed_keys = [key for key in pending if key not in found]
+        degraded: Dict[str, List[float]] = {}
+        if failed_keys and self.fallback is not None:
+            fallback_vectors = await self.fallback.embed([pending[key] for key in failed_keys])
+            degraded = dict(zip(failed_keys, fallback_vectors))
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i+batch_size]
-            response = await self.client.embeddings.create(
-                model=self.model,
-                input=batch,
-            )
-            all_embeddings.extend([d.embedding for d in response.data])
+        vectors = [found.get(key, degraded.get(key)) for key in keys]
+        result = EmbeddingBatch(
+            vectors=vectors,
+            failed=[vector is None for vector in vectors],
+            degraded=[key in degraded for key in keys],
+        )
+        if not result.ok:
+            logger.warning(f"Failed to embed {result.failed_count} of {len(texts)} texts")
+        if result.degraded_count:
+            logger.warning(f"Using degraded local embeddings for {result.degraded_count} of {len(texts)} texts")
+        return result
+    
+    def _split_batches(self, texts: Dict[str, str]) -> List[List[str]]:
+        """Group keys into request batches bounded by item count and token count."""
+        encoding = get_encoding()
+        max_items = self.settings.embedding_batch_size
+        max_tokens = self.settings.embedding_batch_max_tokens
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for key, text in texts.items():
+            tokens = len(encoding.encode(text, disallowed_special=()))
+            if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(key)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _embed_batch(self, texts: List[str], max_retries: Optional[int] = None) -> List[Optional[List[float]]]:
+        """
+        One backend batch, retried with backoff on rate limits and transient
+        errors. A rejected batch (e.g. one input over the model's token
+        limit) is split in half until the bad input is isolated, so only it
+        fails. Returns None for each text that could not be embedded.
+        """
+        import asyncio
+        import random
+        from openai import RateLimitError, APIError, APITimeoutError, BadRequestError
         
-        return all_embeddings
+        max_retries = max_retries or self.settings.embedding_max_retries
+        for attempt in range(max_retries):
+            try:
+                return await self.backend.embed(texts)
+            except BadRequestError as e:
+                if len(texts) == 1:
+                    logger.warning(f"Embedding input rejected: {e}")
+                    return [None]
+                middle = len(texts) // 2
+                first, second = await asyncio.gather(
+                    self._embed_batch(texts[:middle], max_retries),
+                    self._embed_batch(texts[middle:], max_retries),
+                )
+                return first + second
+            except (RateLimitError, APITimeoutError, APIError) as e:
+                if attempt < max_retries - 1:
+                    wait_time = 2 ** attempt + random.uniform(0, 0.5)
+                    logger.warning(f"Embedding batch of {len(texts)} failed ({e}). Retrying in {wait_time:.1f}s...")
+                    await asyncio.sleep(wait_time)
+                    continue
+                logger.error(f"Embedding batch of {len(texts)} failed after {max_retries} attempts: {e}")
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(texts)} failed: {e}")
+                break
+        return [None] * len(texts)
     
     @staticmethod
     def cosine_similarity(a: List[float], b: List[float]) -> float:
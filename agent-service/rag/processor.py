@@ -1,8 +1,9 @@
+import asyncio
 import io
 import logging
 from typing import List, Dict, Any, Optional
 import PyPDF2
-from core.llm import LLMClient
+from core.llm import get_llm_client
 from core.database import db
 from rag.embeddings import embeddings
 from rag.retriever import ChunkType
@@ -30,7 +31,7 @@ class ResumeProcessor:
     """
     
     def __init__(self):
-        self.llm = LLMClient()
+        self.llm = get_llm_client()
         
     async def process_resume(self, user_id: str, resume_id: str, pdf_content: bytes) -> bool:
         """
@@ -54,26 +55,34 @@ class ResumeProcessor:
             raw_chunks = self.chunk_text(text)
             logger.info(f"Generated {len(raw_chunks)} raw chunks from resume")
             
-            # 3. Classify and store chunks
-            for i, chunk_content in enumerate(raw_chunks):
-                if not chunk_content.strip():
-                    continue
-                    
+            # 3. Classify and embed all chunks concurrently, then store
+            indexed_chunks = [(i, c) for i, c in enumerate(raw_chunks) if c.strip()]
+            classifications, chunk_embeddings = await asyncio.gather(
+                self.llm.chat_many([
+                    {
+                        "messages": [
+                            {"role": "system", "content": "You are a specialized classifier. Respond with exactly one word."},
+                            {"role": "user", "content": CLASSIFY_CHUNK_PROMPT.format(snippet=chunk_content[:500])},
+                        ],
+                        "cache": True,
+                    }
+                    for _, chunk_content in indexed_chunks
+                ]),
+                embeddings.embed_texts([chunk_content for _, chunk_content in indexed_chunks]),
+            )
+            
+            for (i, chunk_content), result, embedding, degraded in zip(
+                indexed_chunks, classifications, chunk_embeddings.vectors, chunk_embeddings.degraded
+            ):
                 # Classify chunk type
                 try:
-                    chunk_type_str = await self.llm.simple_prompt(
-                        CLASSIFY_CHUNK_PROMPT.format(snippet=chunk_content[:500]),
-                        system="You are a specialized classifier. Respond with exactly one word."
-                    )
-                    chunk_type_str = chunk_type_str.strip().lower()
-                    chunk_type = ChunkType(chunk_type_str)
+                    if not result.ok:
+                        raise result.error
+                    chunk_type = ChunkType(result.content.strip().lower())
                 except Exception as e:
                     logger.warning(f"Classification failed for chunk {i}, defaulting to OTHER: {e}")
                     chunk_type = ChunkType.OTHER
                     
-                # Generate embedding
-                embedding = await embeddings.embed_text(chunk_content)
-                
                 # Store in database
                 await db.create_resume_chunk(
                     user_id=user_id,
@@ -81,7 +90,8 @@ class ResumeProcessor:
                     chunk_type=chunk_type.value,
                     content=chunk_content,
                     embedding=embedding,
-                    metadata={"index": i, "length": len(chunk_content)}
+                    metadata={"index": i, "length": len(chunk_content)},
+                    embedding_degraded=degraded,
                 )
                 
             return True
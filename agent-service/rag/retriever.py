@@ -6,9 +6,12 @@ Implements priority-based retrieval with type filtering.
 from typing import List, Dict, Optional, Literal
 from dataclasses import dataclass
 from enum import Enum
+import logging
 
 from core.database import db
-from rag.embeddings import embeddings
+from rag.embeddings import EmbeddingUnavailableError, embeddings
+
+logger = logging.getLogger(__name__)
 
 
 class ChunkType(str, Enum):
@@ -89,8 +92,12 @@ class RAGRetriever:
         # Use default limits if not provided
         type_limits = limits or DEFAULT_LIMITS
         
-        # Generate query embedding
-        query_embedding = await embeddings.embed_text(query)
+        # Generate query embedding; without one there is nothing to compare
+        try:
+            query_embedding = await embeddings.embed_text(query)
+        except EmbeddingUnavailableError as e:
+            logger.warning(f"Skipping resume chunk retrieval: {e}")
+            return []
         
         # Retrieve chunks for each type
         all_chunks: List[RetrievedChunk] = []
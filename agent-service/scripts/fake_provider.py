@@ -0,0 +1,299 @@
+"""
+Local OpenAI-compatible stand-in for Gemini / OpenRouter.
+
+Serves chat completions (plain and streamed), embeddings and a model list
+with configurable latency and injected faults, so LLMClient and
+EmbeddingService failover, rate limiting and concurrency can be load-tested
+on a laptop with no network. Outputs are deterministic: the same request
+always gets the same text or vector.
+
+Run it and point the service at it:
+
+    python scripts/fake_provider.py --port 8900 --latency-ms 400 --rate-429 0.05
+
+    OPENROUTER_BASE_URL=http://localhost:8900/v1
+    GEMINI_BASE_URL=http://localhost:8900/v1
+
+Faults can be changed while it runs (POST /_fake/config with any of the
+FakeProviderConfig fields), forced per request with an `X-Fake-Fault: 429 |
+500 | 503 | timeout` header, and counters are at GET /_fake/stats. Every
+option can also be set as FAKE_PROVIDER_<FIELD> in the environment.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import AsyncIterator, Dict, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+@dataclass
+class FakeProviderConfig:
+    """Latency and fault settings; rates are probabilities per request."""
+    latency_ms: float = 300.0  # median time to first byte
+    latency_jitter_ms: float = 150.0  # uniform: +/- jitter; lognormal: sets the spread
+    latency_distribution: str = "lognormal"
+    token_interval_ms: float = 15.0  # between streamed chunks
+    tokens_per_chunk: int = 3
+    completion_tokens: int = 120  # reply length when max_tokens allows
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    rate_timeout: float = 0.0
+    rate_stream_cut: float = 0.0  # streams that fail after partial output
+    timeout_seconds: float = 120.0  # how long a "timeout" request hangs
+    retry_after_seconds: float = 1.0
+    embedding_dimension: int = 1536
+    seed: int = 0
+
+    def update(self, values: Dict):
+        known = {f.name: f.type for f in fields(self)}
+        for key, value in values.items():
+            if key not in known:
+                raise ValueError(f"Unknown fake provider option: {key}")
+            setattr(self, key, type(getattr(self, key))(value))
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_distribution must be one of {LATENCY_DISTRIBUTIONS}")
+
+    @classmethod
+    def from_env(cls) -> "FakeProviderConfig":
+        config = cls()
+        config.update({
+            f.name: os.environ[f"FAKE_PROVIDER_{f.name.upper()}"]
+            for f in fields(cls)
+            if f"FAKE_PROVIDER_{f.name.upper()}" in os.environ
+        })
+        return config
+
+
+def _digest(*parts) -> bytes:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).digest()
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token), enough for usage fields."""
+    return max(1, len(text) // 4)
+
+
+def fake_completion(model: str, messages: List[dict], length: int, json_mode: bool) -> str:
+    """Deterministic reply text for a request."""
+    seed = _digest(model, messages).hex()
+    last = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    if json_mode:
+        return json.dumps({"id": seed[:12], "model": model, "echo": str(last)[:200]})
+    rng = random.Random(seed)
+    words = ["career", "resume", "skills", "role", "impact", "team", "python", "data",
+             "project", "growth", "delivered", "led", "built", "improved", "users"]
+    text = [f"[{seed[:8]}]"]
+    while count_tokens(" ".join(text)) < length:
+        text.append(rng.choice(words))
+    return " ".join(text)
+
+
+def fake_embedding(model: str, text: str, dimension: int) -> List[float]:
+    """Deterministic unit vector for `text`."""
+    rng = np.random.default_rng(int.from_bytes(_digest(model, text)[:8], "big"))
+    vector = rng.standard_normal(dimension)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def create_app(config: Optional[FakeProviderConfig] = None) -> FastAPI:
+    config = config or FakeProviderConfig()
+    app = FastAPI(title="Fake LLM provider")
+    app.state.config = config
+    stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0, "faults": {}}
+    rng = random.Random(config.seed)
+
+    def pick_fault(request: Request) -> Optional[str]:
+        forced = request.headers.get("x-fake-fault")
+        if forced:
+            return forced
+        roll = rng.random()
+        for fault, rate in (("429", config.rate_429), ("500", config.rate_5xx), ("timeout", config.rate_timeout)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    def latency() -> float:
+        median = config.latency_ms / 1000
+        jitter = config.latency_jitter_ms / 1000
+        if config.latency_distribution == "fixed" or median <= 0:
+            return max(median, 0.0)
+        if config.latency_distribution == "uniform":
+            return max(0.0, rng.uniform(median - jitter, median + jitter))
+        # Lognormal around the median: a long tail like real providers
+        return rng.lognormvariate(np.log(median), jitter / median if median else 0.0)
+
+    async def admit(request: Request) -> Optional[JSONResponse]:
+        """Count the request, wait out the latency and return a fault response if one was drawn."""
+        stats["requests"] += 1
+        fault = pick_fault(request)
+        if fault:
+            stats["faults"][fault] = stats["faults"].get(fault, 0) + 1
+        if fault == "timeout":
+            await asyncio.sleep(config.timeout_seconds)
+        await asyncio.sleep(latency())
+        if fault == "429":
+            return JSONResponse(
+                {"error": {"message": "Rate limit exceeded (fake)", "type": "rate_limit_error", "code": 429}},
+                status_code=429,
+                headers={"retry-after": str(config.retry_after_seconds)},
+            )
+        if fault in ("500", "502", "503"):
+            return JSONResponse(
+                {"error": {"message": f"Upstream error {fault} (fake)", "type": "server_error", "code": int(fault)}},
+                status_code=int(fault),
+            )
+        return None
+
+    def track(delta: int):
+        stats["in_flight"] += delta
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake-model")
+        messages = body.get("messages", [])
+        stream = bool(body.get("stream"))
+        json_mode = (body.get("response_format") or {}).get("type") in ("json_object", "json_schema")
+        length = min(config.completion_tokens, body.get("max_tokens") or config.completion_tokens)
+        content = fake_completion(model, messages, length, json_mode)
+        prompt_tokens = sum(count_tokens(str(m.get("content") or "")) for m in messages)
+        completion_id = "chatcmpl-" + _digest(model, messages).hex()[:24]
+
+        track(1)
+        try:
+            error = await admit(request)
+        except BaseException:
+            track(-1)
+            raise
+        if error is not None:
+            track(-1)
+            return error
+
+        if not stream:
+            track(-1)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": count_tokens(content),
+                    "total_tokens": prompt_tokens + count_tokens(content),
+                },
+            }
+
+        cut = rng.random() < config.rate_stream_cut
+
+        async def events() -> AsyncIterator[str]:
+            try:
+                words = content.split(" ")
+                step = max(1, config.tokens_per_chunk)
+                for i in range(0, len(words), step):
+                    if cut and i >= len(words) // 2:
+                        stats["faults"]["stream_cut"] = stats["faults"].get("stream_cut", 0) + 1
+                        yield "data: " + json.dumps({"error": {"message": "Stream interrupted (fake)", "code": 500}}) + "\n\n"
+                        return
+                    delta = " ".join(words[i:i + step]) + (" " if i + step < len(words) else "")
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+                    }
+                    yield "data: " + json.dumps(chunk) + "\n\n"
+                    await asyncio.sleep(config.token_interval_ms / 1000)
+                done = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                }
+                yield "data: " + json.dumps(done) + "\n\n"
+                yield "data: [DONE]\n\n"
+            finally:
+                track(-1)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake-embedding")
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+
+        track(1)
+        try:
+            error = await admit(request)
+        finally:
+            track(-1)
+        if error is not None:
+            return error
+
+        tokens = sum(count_tokens(str(text)) for text in inputs)
+        return {
+            "object": "list",
+            "model": model,
+            "data": [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(model, str(text), config.embedding_dimension)}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "fake-model", "object": "model", "owned_by": "fake"}]}
+
+    @app.get("/_fake/stats")
+    async def get_stats():
+        return {**stats, "config": asdict(config)}
+
+    @app.post("/_fake/config")
+    async def set_config(request: Request):
+        try:
+            config.update(await request.json())
+        except (ValueError, TypeError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return asdict(config)
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None):
+    import uvicorn
+
+    config = FakeProviderConfig.from_env()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    for f in fields(FakeProviderConfig):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", dest=f.name, type=type(getattr(config, f.name)), default=None)
+    args = parser.parse_args(argv)
+    config.update({f.name: getattr(args, f.name) for f in fields(config) if getattr(args, f.name) is not None})
+
+    print(f"🧪 Fake provider on http://{args.host}:{args.port}/v1 ({json.dumps(asdict(config))})")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, access_log=False)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Re-embed rows stored with degraded (local fallback) or missing embeddings.
+
+Rows are flagged `embedding_degraded` when EmbeddingService fell back to
+the local backend (see rag/embedding_backends.py); they are skipped by
+similarity search until this script replaces their vectors with API ones.
+
+    python scripts/reembed_degraded.py [--table jobs|resume_chunks] [--batch 100]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import Tuple
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import db
+from rag.embeddings import embeddings
+
+
+async def reembed_table(table: str, batch_size: int) -> Tuple[int, int]:
+    """
+    Re-embed every degraded row in `table`; returns (fixed, still failing).
+
+    Rows the API still cannot embed keep their flag and are skipped, so one
+    bad row does not block the rows after it; they are retried on a later run.
+    """
+    fixed = failing = 0
+    last_id = None
+    while True:
+        rows = await db.get_degraded_embeddings(table, limit=batch_size, after_id=last_id)
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        result = await embeddings.embed_texts([row["text"] for row in rows])
+        updates = [
+            (row["id"], vector)
+            for row, vector, failed, degraded in zip(rows, result.vectors, result.failed, result.degraded)
+            if not failed and not degraded
+        ]
+        await db.update_embeddings(table, updates)
+        fixed += len(updates)
+        failing += len(rows) - len(updates)
+        print(f"  {table}: re-embedded {len(updates)}/{len(rows)}")
+    return fixed, failing
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Re-embed rows with degraded embeddings")
+    parser.add_argument("--table", choices=sorted(db.EMBEDDED_TABLES), action="append")
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    if embeddings.backend.name == "local":
+        print("❌ EMBEDDING_BACKEND=local; re-embedding needs the API backend")
+        return 1
+
+    for table in args.table or sorted(db.EMBEDDED_TABLES):
+        fixed, failing = await reembed_table(table, args.batch)
+        print(f"✅ {table}: {fixed} rows re-embedded")
+        if failing:
+            print(f"⚠️  {table}: {failing} rows still degraded; run again later")
+    await db.close_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, patch, MagicMock
 from agents.job_finder import run_job_finder
 from agents.resume_agent import run_resume_agent
 from graphs.state import AgentState, MissionStatus
+from rag.embeddings import EmbeddingBatch
 
 # Mock data
 MOCK_JOBS = [
@@ -22,6 +23,7 @@ def mock_db_fixture():
         mock_db.update_mission = AsyncMock()
         mock_db.get_jobs = AsyncMock(return_value=[])
         mock_db.create_job = AsyncMock(return_value="job-123")
+        mock_db.create_jobs_bulk = AsyncMock(return_value=["job-123"])
         yield mock_db
 
 @pytest.fixture
@@ -32,7 +34,7 @@ def mock_llm_fixture():
 @pytest.fixture
 def mock_embeddings():
     with patch('agents.job_finder.embeddings') as mock_embed:
-        mock_embed.embed_texts = AsyncMock(return_value=[[0.1] * 1536])
+        mock_embed.embed_texts = AsyncMock(return_value=EmbeddingBatch(vectors=[[0.1] * 1536], failed=[False]))
         yield mock_embed
 
 @pytest.mark.asyncio
@@ -53,7 +55,7 @@ async def test_run_job_finder(mock_db_fixture, mock_llm_fixture, mock_embeddings
 async def test_run_resume_agent():
     # Mock dependencies specifically for resume agent
     with patch('agents.resume_agent.db') as mock_db, \
-         patch('agents.resume_agent.LLMClient') as mock_llm_client, \
+         patch('agents.resume_agent.get_llm_client') as mock_llm_client, \
          patch('agents.resume_agent.RAGRetriever') as mock_retriever:
         
         # Setup mocks
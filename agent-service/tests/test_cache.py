@@ -0,0 +1,48 @@
+"""
+TTLCache Tests
+
+Unit tests for the in-process LRU/TTL cache in core/cache.py.
+"""
+
+from unittest.mock import patch
+
+from core.cache import TTLCache, MISSING
+
+
+class TestTTLCache:
+    """Tests for expiry, eviction and invalidation"""
+
+    def test_miss_then_hit(self):
+        """Stored values are returned until they expire"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        assert cache.get("k") is MISSING
+        cache.set("k", None)
+        assert cache.get("k") is None
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_entries_expire(self):
+        """Entries older than the TTL read as misses"""
+        cache = TTLCache(maxsize=10, ttl=5)
+        with patch("core.cache.time.monotonic", return_value=100.0):
+            cache.set("k", "v")
+        with patch("core.cache.time.monotonic", return_value=104.0):
+            assert cache.get("k") == "v"
+        with patch("core.cache.time.monotonic", return_value=106.0):
+            assert cache.get("k") is MISSING
+        assert len(cache) == 0
+
+    def test_least_recently_used_evicted(self):
+        """Reading an entry protects it from eviction"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+    def test_disabled_cache_stores_nothing(self):
+        """A zero TTL turns the cache off"""
+        cache = TTLCache(maxsize=10, ttl=0)
+        cache.set("k", "v")
+        assert cache.get("k") is MISSING
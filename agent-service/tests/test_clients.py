@@ -0,0 +1,77 @@
+"""
+Client Registry Tests
+
+Unit tests for the shared connection pool, provider clients and encoder in
+core/clients.py, and for the shared LLMClient from get_llm_client.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from core import clients
+from core.config import get_settings
+from core.llm import get_llm_client
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    with patch.object(clients, "_http_client", None), \
+         patch.object(clients, "_encoding", None), \
+         patch.dict(clients._openai_clients, clear=True), \
+         patch.dict("core.llm._llm_clients", clear=True):
+        yield
+
+
+class TestProviderClients:
+    """Tests for connection reuse"""
+
+    def test_clients_share_one_connection_pool(self):
+        a = clients.get_openai_client("key-a", "https://a.example/v1")
+        b = clients.get_openai_client("key-b", "https://b.example/v1")
+        assert a is not b
+        assert a._client is b._client is clients.get_http_client()
+
+    def test_same_endpoint_reuses_client(self):
+        a = clients.get_openai_client("key", "https://a.example/v1")
+        assert clients.get_openai_client("key", "https://a.example/v1") is a
+
+    @pytest.mark.asyncio
+    async def test_close_recreates_on_next_use(self):
+        first = clients.get_http_client()
+        await clients.close_clients()
+        assert first.is_closed
+        assert clients.get_http_client() is not first
+
+    def test_http2_requires_h2(self):
+        with patch.object(clients, "http2_available", return_value=False):
+            clients.get_http_client()
+        assert clients.get_client_metrics()["http2"] is False
+
+
+class TestSharedEncoder:
+    """Tests for the single tokenizer load"""
+
+    def test_encoder_loaded_once(self):
+        with patch.object(clients, "tiktoken") as mock_tiktoken:
+            clients.get_encoding()
+            clients.get_encoding()
+        mock_tiktoken.encoding_for_model.assert_called_once_with("gpt-4")
+
+
+class TestSharedLLMClient:
+    """Tests for get_llm_client"""
+
+    def test_agents_get_one_client_per_mode(self):
+        with patch("core.llm.get_encoding", return_value=MagicMock()):
+            free = get_llm_client("free")
+            assert get_llm_client("free") is free
+            assert get_llm_client("paid") is not free
+
+    def test_default_mode_reads_settings_once(self):
+        with patch("core.llm.get_encoding", return_value=MagicMock()), \
+             patch("core.llm.get_settings", wraps=get_settings) as settings:
+            default = get_llm_client()
+            calls = settings.call_count
+            assert get_llm_client() is default
+            assert get_llm_client(get_settings().default_model_mode) is default
+        assert settings.call_count == calls
@@ -0,0 +1,647 @@
+"""
+DatabaseService Tests
+
+Unit tests for query construction and result mapping in core/database.py.
+Connections are mocked; no live Postgres is required.
+"""
+
+import json
+
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import asyncpg
+
+from core.database import DatabaseService, PoolStats, encode_cursor, decode_cursor, next_page_cursor
+from core.config import Settings, is_pooler_url
+
+
+def make_mock_conn():
+    """Build a mock asyncpg connection whose transaction() works as a context manager."""
+    conn = AsyncMock()
+
+    @asynccontextmanager
+    async def _transaction():
+        yield
+
+    conn.transaction = MagicMock(side_effect=_transaction)
+    return conn
+
+
+def patch_connection(conn):
+    """Patch DatabaseService.connection to yield the given mock connection."""
+    @asynccontextmanager
+    async def _connection(*args, **kwargs):
+        yield conn
+
+    return patch.object(DatabaseService, "connection", side_effect=_connection)
+
+
+class TestCreateJobsBulk:
+    """Tests for the batched job ingestion path"""
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_skips_database(self):
+        """An empty batch should not open a connection"""
+        with patch.object(DatabaseService, "connection") as mock_conn_ctx:
+            result = await DatabaseService.create_jobs_bulk("user-1", [])
+
+        assert result == []
+        mock_conn_ctx.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_ids_returned_in_input_order(self):
+        """Inserted ids line up with the input, skipped rows map to None"""
+        conn = make_mock_conn()
+        conn.fetch = AsyncMock(return_value=[
+            {"id": "id-b", "url": "http://b"},
+            {"id": "id-a", "url": "http://a"},
+        ])
+        jobs = [
+            {"title": "A", "company": "X", "url": "http://a", "source": "linkedin", "embedding": [0.1, 0.2]},
+            {"title": "Dup", "company": "Y", "url": "http://existing", "source": "linkedin"},
+            {"title": "B", "company": "Z", "url": "http://b", "source": "linkedin"},
+            {"title": "A again", "company": "X", "url": "http://a", "source": "linkedin"},
+        ]
+
+        with patch_connection(conn):
+            result = await DatabaseService.create_jobs_bulk("user-1", jobs)
+
+        assert result == ["id-a", None, "id-b", None]
+
+        # Whole batch goes through a single COPY and a single INSERT
+        conn.copy_records_to_table.assert_awaited_once()
+        records = conn.copy_records_to_table.call_args.kwargs["records"]
+        assert [r[0] for r in records] == [0, 1, 2, 3]
+        conn.fetch.assert_awaited_once()
+        query = conn.fetch.call_args[0][0]
+        assert "ON CONFLICT (user_id, url) DO NOTHING" in query
+
+
+class TestVectorCodec:
+    """Tests for the binary pgvector codec registration"""
+
+    @pytest.mark.asyncio
+    async def test_pool_registers_vector_codec(self):
+        """Every pooled connection is initialised with the vector codec"""
+        with patch("core.database.asyncpg.create_pool", new_callable=AsyncMock) as mock_create, \
+             patch("core.database.get_settings") as mock_settings, \
+             patch.dict(DatabaseService._pools, clear=True):
+            mock_settings.return_value.database_url = "postgresql://localhost/test"
+            mock_settings.return_value.user_cache_max_entries = 1024
+            mock_settings.return_value.user_cache_ttl_seconds = 300
+            mock_settings.return_value.statement_cache_size = 0
+            with patch.object(DatabaseService, "_start_listener", new_callable=AsyncMock):
+                await DatabaseService.get_pool()
+
+        assert mock_create.call_args.kwargs["init"] is DatabaseService._init_connection
+
+    @pytest.mark.asyncio
+    async def test_embeddings_passed_without_text_formatting(self):
+        """Embeddings are bound as-is rather than formatted to strings"""
+        conn = make_mock_conn()
+        conn.fetch = AsyncMock(return_value=[])
+        embedding = [0.1, 0.2, 0.3]
+
+        with patch_connection(conn):
+            await DatabaseService.search_jobs_by_embedding("user-1", embedding)
+
+        assert conn.fetch.call_args[0][2] is embedding
+
+
+class TestMissionEvents:
+    """Tests for the append-only mission event log"""
+
+    @pytest.mark.asyncio
+    async def test_update_mission_appends_only_new_events(self):
+        """Events reserve sequence numbers on the mission row and are inserted, not rewritten"""
+        conn = make_mock_conn()
+        conn.fetchval = AsyncMock(return_value=7)
+        events = [
+            {"type": "log", "message": "a", "data": None, "timestamp": "2026-01-01T10:00:00"},
+            {"type": "log", "message": "b", "data": {"k": 1}, "timestamp": "2026-01-01T10:00:01"},
+        ]
+
+        with patch_connection(conn):
+            updated = await DatabaseService.update_mission("m-1", progress=50, events=events)
+
+        assert updated is True
+        query, *params = conn.fetchval.call_args[0]
+        assert "event_seq = event_seq + $2" in query
+        assert "events =" not in query.replace("event_seq", "")
+        assert params[1] == 2
+
+        records = conn.executemany.call_args[0][1]
+        assert [r[1] for r in records] == [6, 7]
+        assert records[1][4] == '{"k": 1}'
+
+    @pytest.mark.asyncio
+    async def test_get_mission_skips_event_read_when_caught_up(self):
+        """A poller that has seen every event gets no event payload"""
+        conn = make_mock_conn()
+        conn.fetchrow = AsyncMock(return_value={"id": "m-1", "user_id": "u", "event_seq": 4, "artifacts": "[]"})
+
+        with patch_connection(conn):
+            mission = await DatabaseService.get_mission("m-1", after_seq=4)
+
+        assert mission["events"] == []
+        conn.fetch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_mission_events_uses_cursor(self):
+        """Events are read after the given sequence number, in order"""
+        from datetime import datetime
+
+        conn = make_mock_conn()
+        conn.fetch = AsyncMock(return_value=[
+            {"seq": 3, "type": "log", "message": "x", "data": None, "created_at": datetime(2026, 1, 1)},
+        ])
+
+        with patch_connection(conn):
+            events = await DatabaseService.get_mission_events("m-1", after_seq=2)
+
+        query, *params = conn.fetch.call_args[0]
+        assert "seq > $2" in query and "ORDER BY seq" in query
+        assert params == ["m-1", 2]
+        assert events == [{"seq": 3, "type": "log", "message": "x", "data": None, "timestamp": "2026-01-01T00:00:00"}]
+
+
+class TestUserCounters:
+    """Tests for the trigger-maintained user_counters rollup"""
+
+    @pytest.mark.asyncio
+    async def test_dashboard_stats_single_lookup(self):
+        """Dashboard KPIs come from one user_counters row"""
+        conn = make_mock_conn()
+        conn.fetchrow = AsyncMock(return_value={
+            "user_id": "user-1", "jobs": 120, "applications": 4, "resumes": 2,
+            "linkedin_posts": 1, "missions": 9,
+            "status_counts": '{"missions": {"running": 1, "pending": 2, "completed": 6}}',
+        })
+
+        with patch_connection(conn):
+            stats = await DatabaseService.get_dashboard_stats("user-1")
+
+        conn.fetchrow.assert_awaited_once()
+        conn.fetchval.assert_not_called()
+        assert stats["jobs_found"] == 120
+        assert stats["active_missions"] == 3
+        assert stats["time_saved_hrs"] == 3.5
+
+    @pytest.mark.asyncio
+    async def test_table_count_uses_status_breakdown(self):
+        """Status-filtered totals read the per-status breakdown"""
+        conn = make_mock_conn()
+        conn.fetchrow = AsyncMock(return_value={
+            "user_id": "user-1", "jobs": 10, "applications": 0, "resumes": 0,
+            "linkedin_posts": 0, "missions": 0, "status_counts": {"jobs": {"saved": 3}},
+        })
+
+        with patch_connection(conn):
+            assert await DatabaseService.get_table_count("jobs", "user-1") == 10
+            assert await DatabaseService.get_table_count("jobs", "user-1", "saved") == 3
+            assert await DatabaseService.get_table_count("jobs", "user-1", "rejected") == 0
+
+    @pytest.mark.asyncio
+    async def test_missing_counter_row_reads_as_zero(self):
+        """A user with no rollup row yet has zero of everything"""
+        conn = make_mock_conn()
+        conn.fetchrow = AsyncMock(return_value=None)
+
+        with patch_connection(conn):
+            assert await DatabaseService.get_table_count("missions", "new-user", "running") == 0
+
+
+class TestKeysetPagination:
+    """Tests for cursor-based list pagination"""
+
+    def test_cursor_round_trip(self):
+        """A cursor decodes back to the position it was built from"""
+        from datetime import datetime
+
+        ts = datetime(2026, 3, 1, 12, 30, 5, 123456)
+        cursor = encode_cursor(ts, "job-9")
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (ts, "job-9")
+
+    def test_invalid_cursor_raises_value_error(self):
+        """Tampered or garbage cursors are rejected with ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_next_page_cursor_only_on_full_page(self):
+        """A short page is the last page"""
+        from datetime import datetime
+
+        rows = [{"id": "a", "created_at": datetime(2026, 1, 2)}, {"id": "b", "created_at": datetime(2026, 1, 1)}]
+        assert next_page_cursor(rows, "created_at", 3) is None
+        assert decode_cursor(next_page_cursor(rows, "created_at", 2)) == (datetime(2026, 1, 1), "b")
+
+    @pytest.mark.asyncio
+    async def test_get_jobs_seeks_past_cursor(self):
+        """A cursor adds a row-value predicate and drops the offset"""
+        from datetime import datetime
+
+        conn = make_mock_conn()
+        conn.fetch = AsyncMock(return_value=[])
+        cursor = encode_cursor(datetime(2026, 1, 1), "job-1")
+
+        with patch_connection(conn):
+            await DatabaseService.get_jobs("user-1", limit=20, offset=40, status="new", cursor=cursor)
+
+        query, *params = conn.fetch.call_args[0]
+        assert "(scraped_at, id) < ($3, $4)" in query
+        assert "ORDER BY scraped_at DESC, id DESC" in query
+        assert params == ["user-1", "new", datetime(2026, 1, 1), "job-1", 20, 0]
+
+
+class TestJobProjections:
+    """Tests for the lean column sets used by job list reads"""
+
+    @pytest.mark.asyncio
+    async def test_list_projection_skips_embedding(self):
+        """The list view truncates descriptions in SQL and never selects the embedding"""
+        conn = make_mock_conn()
+        conn.fetch = AsyncMock(return_value=[])
+
+        with patch_connection(conn):
+            await DatabaseService.get_jobs("user-1", projection="list")
+
+        query = conn.fetch.call_args[0][0]
+        assert "SELECT *" not in query
+        assert "embedding" not in query
+        assert "left(description, 200)" in query
+
+    @pytest.mark.asyncio
+    async def test_analysis_projection_keeps_description_for_packing(self):
+        """Skill analysis trims descriptions to its prompt budget, not in SQL"""
+        conn = make_mock_conn()
+        conn.fetch = AsyncMock(return_value=[])
+
+        with patch_connection(conn):
+            await DatabaseService.get_jobs("user-1", projection="analysis")
+
+        query = conn.fetch.call_args[0][0]
+        assert "embedding" not in query
+        assert "left(description, 1000)" not in query
+
+    @pytest.mark.asyncio
+    async def test_unknown_projection_rejected(self):
+        """Projection names are looked up, never interpolated"""
+        with pytest.raises(ValueError):
+            await DatabaseService.get_jobs("user-1", projection="embedding")
+
+
+class TestStatementCache:
+    """Tests for the prepared statement cache and its schema-change recovery"""
+
+    @pytest.mark.asyncio
+    async def test_pool_uses_configured_cache_size(self):
+        """The statement cache is on and the schema listener is started"""
+        with patch("core.database.asyncpg.create_pool", new_callable=AsyncMock) as mock_create, \
+             patch("core.database.get_settings") as mock_settings, \
+             patch.object(DatabaseService, "_start_listener", new_callable=AsyncMock) as mock_listen, \
+             patch.dict(DatabaseService._pools, clear=True):
+            mock_settings.return_value.database_url = "postgresql://localhost/test"
+            mock_settings.return_value.user_cache_max_entries = 1024
+            mock_settings.return_value.user_cache_ttl_seconds = 300
+            mock_settings.return_value.statement_cache_size = 100
+            await DatabaseService.get_pool()
+
+        assert mock_create.call_args.kwargs["statement_cache_size"] == 100
+        mock_listen.assert_awaited_once()
+
+    def test_pooler_url_disables_cache_and_listener_by_default(self):
+        """Behind PgBouncer / Neon's pooler: no prepared statements, LISTEN only on a direct URL"""
+        pooled = "postgresql://u:p@ep-x-pooler.us-east-1.aws.neon.tech/db?sslmode=require"
+        direct = "postgresql://u:p@ep-x.us-east-1.aws.neon.tech/db?sslmode=require"
+
+        settings = Settings(DATABASE_URL=pooled, OPENROUTER_API_KEY="test")
+        assert settings.statement_cache_size == 0
+        assert settings.listen_database_url is None
+
+        settings = Settings(DATABASE_URL=pooled, DATABASE_DIRECT_URL=direct, OPENROUTER_API_KEY="test")
+        assert settings.statement_cache_size == 0
+        assert settings.listen_database_url == direct
+
+        settings = Settings(DATABASE_URL=direct, OPENROUTER_API_KEY="test")
+        assert settings.statement_cache_size == 100
+        assert settings.listen_database_url == direct
+
+        assert is_pooler_url("postgresql://u:p@localhost:6432/db?pgbouncer=true")
+
+    @pytest.mark.asyncio
+    async def test_listener_skipped_without_direct_connection(self):
+        """No LISTEN connection is attempted through a pooler"""
+        with patch("core.database.asyncpg.connect", new_callable=AsyncMock) as mock_connect, \
+             patch.object(DatabaseService, "_listener_skipped", False):
+            await DatabaseService._start_listener(None)
+            assert DatabaseService._listener_skipped is True
+
+        mock_connect.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_stale_statement_in_transaction_retried_once(self):
+        """A stale plan inside a transaction resets the cache and reruns the method"""
+        conn = make_mock_conn()
+        conn.fetchval = AsyncMock(side_effect=[
+            asyncpg.exceptions.InvalidCachedStatementError("cached plan must not change result type"),
+            3,
+        ])
+
+        with patch_connection(conn), \
+             patch.object(DatabaseService, "reset_statement_cache", new_callable=AsyncMock) as mock_reset:
+            updated = await DatabaseService.update_mission("m-1", progress=10)
+
+        assert updated is True
+        mock_reset.assert_awaited_once()
+        assert conn.fetchval.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_hot_statements_warmed_with_null_args(self):
+        """Each hot statement is run once so it lands in the connection cache"""
+        conn = make_mock_conn()
+
+        with patch.object(DatabaseService, "_statement_cache_enabled", True):
+            await DatabaseService._prepare_hot_statements(conn)
+
+        queries = [c.args[0] for c in conn.fetchrow.call_args_list]
+        assert DatabaseService.SQL_MISSION_BY_ID in queries
+        assert conn.fetchrow.await_count == len(DatabaseService.HOT_STATEMENTS)
+
+    def test_schema_version_notification_resets_cache(self):
+        """A new version on the channel expires the pooled connections"""
+        with patch.object(DatabaseService, "_schema_version", 4), \
+             patch("core.database.asyncio.ensure_future") as mock_future, \
+             patch.object(DatabaseService, "reset_statement_cache", new=MagicMock()):
+            DatabaseService._on_schema_version(None, 1, "schema_version", "4")
+            mock_future.assert_not_called()
+            DatabaseService._on_schema_version(None, 1, "schema_version", "5")
+            mock_future.assert_called_once()
+
+
+class TestPoolTelemetry:
+    """Tests for named pools and acquire metrics"""
+
+    @staticmethod
+    def make_pool():
+        pool = MagicMock()
+        pool.acquire = AsyncMock(return_value="conn")
+        pool.release = AsyncMock()
+        pool.get_size.return_value = 4
+        pool.get_idle_size.return_value = 1
+        pool.get_min_size.return_value = 1
+        pool.get_max_size.return_value = 5
+        return pool
+
+    @pytest.mark.asyncio
+    async def test_connection_records_wait_and_in_use(self):
+        """Each acquire is timed and the pool's usage shows up in the metrics"""
+        pool = self.make_pool()
+
+        with patch.dict(DatabaseService._pools, {"missions": pool}, clear=True), \
+             patch.dict(DatabaseService._pool_stats, clear=True):
+            DatabaseService._pool_stats["missions"] = PoolStats()
+            async with DatabaseService.connection(kind="missions") as conn:
+                assert conn == "conn"
+            metrics = DatabaseService.get_pool_metrics()
+
+        pool.release.assert_awaited_once_with("conn")
+        assert metrics["missions"]["acquires"] == 1
+        assert metrics["missions"]["in_use"] == 3
+        assert metrics["missions"]["queue_depth"] == 0
+        assert "interactive" not in metrics
+
+    @pytest.mark.asyncio
+    async def test_use_pool_routes_default_kind(self):
+        """connection() without a kind follows the enclosing use_pool() block"""
+        with patch.object(DatabaseService, "get_pool", new_callable=AsyncMock) as mock_get_pool, \
+             patch.dict(DatabaseService._pool_stats, clear=True):
+            DatabaseService._pool_stats.update({k: PoolStats() for k in DatabaseService.POOL_KINDS})
+            mock_get_pool.return_value = self.make_pool()
+
+            with DatabaseService.use_pool("streaming"):
+                async with DatabaseService.connection():
+                    pass
+            async with DatabaseService.connection():
+                pass
+
+        assert [c.args[0] for c in mock_get_pool.call_args_list] == ["streaming", "interactive"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_callers_share_one_pool(self):
+        """Racing get_pool() calls for the same kind create the pool once"""
+        import asyncio
+
+        async def create_pool(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return MagicMock()
+
+        with patch("core.database.asyncpg.create_pool", side_effect=create_pool) as mock_create, \
+             patch("core.database.get_settings") as mock_settings, \
+             patch.object(DatabaseService, "_start_listener", new_callable=AsyncMock), \
+             patch.object(DatabaseService, "_pool_locks", {}), \
+             patch.dict(DatabaseService._pools, clear=True):
+            mock_settings.return_value.statement_cache_size = 0
+            mock_settings.return_value.user_cache_max_entries = 1024
+            mock_settings.return_value.user_cache_ttl_seconds = 300
+            pools = await asyncio.gather(*(DatabaseService.get_pool("missions") for _ in range(5)))
+            await DatabaseService.get_pool("streaming")
+
+        assert all(pool is pools[0] for pool in pools)
+        assert mock_create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_pool_kind_rejected(self):
+        """Pool kinds are a closed set"""
+        with pytest.raises(ValueError):
+            await DatabaseService.get_pool("reports")
+
+
+class TestUserCache:
+    """Tests for the users / user_settings read-through cache"""
+
+    @pytest.fixture(autouse=True)
+    def clear_caches(self):
+        for cache in (DatabaseService._user_cache, DatabaseService._settings_cache):
+            cache.clear()
+            cache.maxsize, cache.ttl = 1024, 300
+        yield
+        DatabaseService._user_cache.clear()
+        DatabaseService._settings_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_email_lookup_cached_until_invalidated(self):
+        """Repeated e-mail lookups hit the database once; a notification evicts the user"""
+        conn = make_mock_conn()
+        conn.fetchrow = AsyncMock(return_value={"id": "u-1", "email": "a@b.c", "name": "Ann"})
+
+        with patch_connection(conn):
+            first = await DatabaseService.get_user("a@b.c")
+            second = await DatabaseService.get_user("a@b.c")
+            by_id = await DatabaseService.get_user("u-1")
+            assert conn.fetchrow.await_count == 1
+
+            DatabaseService._on_user_changed(None, 1, "user_cache", "u-1")
+            await DatabaseService.get_user("a@b.c")
+
+        assert first == second == by_id
+        assert conn.fetchrow.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_user_not_cached(self):
+        """A user created by the web app is visible on the next lookup"""
+        conn = make_mock_conn()
+        conn.fetchrow = AsyncMock(return_value=None)
+
+        with patch_connection(conn):
+            assert await DatabaseService.get_user("new@b.c") is None
+            assert await DatabaseService.get_user("new@b.c") is None
+
+        assert conn.fetchrow.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_settings_upsert_invalidates(self):
+        """Writing settings drops the cached row, and callers get their own copy"""
+        conn = make_mock_conn()
+        conn.fetchrow = AsyncMock(return_value={"user_id": "u-1", "target_roles": ["Dev"]})
+
+        with patch_connection(conn):
+            settings = await DatabaseService.get_user_settings("u-1")
+            settings["target_roles"] = None
+            assert (await DatabaseService.get_user_settings("u-1"))["target_roles"] == ["Dev"]
+            assert conn.fetchrow.await_count == 1
+
+            await DatabaseService.upsert_user_settings("u-1", target_roles=["PM"])
+            await DatabaseService.get_user_settings("u-1")
+
+        assert conn.fetchrow.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_settings_cached_under_str_key(self):
+        """A non-str id is cached under the key the user_cache notification evicts"""
+        import uuid
+        user_id = uuid.uuid4()
+        conn = make_mock_conn()
+        conn.fetchrow = AsyncMock(return_value={"user_id": str(user_id), "target_roles": ["Dev"]})
+
+        with patch_connection(conn):
+            await DatabaseService.get_user_settings(user_id)
+            DatabaseService._on_user_changed(None, 1, "user_cache", str(user_id))
+            await DatabaseService.get_user_settings(user_id)
+
+        assert conn.fetchrow.await_count == 2
+
+
+class TestMissionContextDelta:
+    """Tests for patch-based mission context writes"""
+
+    @pytest.mark.asyncio
+    async def test_patch_merges_keys_and_offloads_large_values(self):
+        """Only changed keys are sent; listed and oversized values become references"""
+        conn = make_mock_conn()
+        conn.fetchval = AsyncMock(return_value=0)
+        patch_values = {
+            "parsed_criteria": {"keywords": ["python"]},
+            "scraped_jobs": [{"title": "Dev", "url": "http://a"}],
+            "notes": "x" * (DatabaseService.CONTEXT_INLINE_LIMIT + 1),
+        }
+
+        with patch_connection(conn):
+            await DatabaseService.update_mission("m-1", context_patch=patch_values, context_remove=["old"])
+
+        query, *params = conn.fetchval.call_args[0]
+        assert "context = (COALESCE(context, '{}'::jsonb) - $1::text[]) || $2::jsonb" in query
+        assert params[0] == ["old"]
+        inline = json.loads(params[1])
+        assert inline["parsed_criteria"] == {"keywords": ["python"]}
+        assert DatabaseService.is_context_ref(inline["scraped_jobs"])
+        assert DatabaseService.is_context_ref(inline["notes"])
+
+        blob_records = conn.executemany.call_args[0][1]
+        assert sorted(r[1] for r in blob_records) == ["notes", "scraped_jobs"]
+
+    @pytest.mark.asyncio
+    async def test_resolve_context_loads_blobs(self):
+        """get_mission can swap references back for the stored values"""
+        conn = make_mock_conn()
+        conn.fetchrow = AsyncMock(return_value={
+            "id": "m-1", "event_seq": 0,
+            "context": json.dumps({"scraped_jobs": {"$ref": "mission_context_blobs", "key": "scraped_jobs", "bytes": 9}}),
+        })
+        conn.fetch = AsyncMock(return_value=[{"key": "scraped_jobs", "value": '[{"url": "http://a"}]'}])
+
+        with patch_connection(conn):
+            light = await DatabaseService.get_mission("m-1")
+            full = await DatabaseService.get_mission("m-1", resolve_context=True)
+
+        assert DatabaseService.is_context_ref(light["context"]["scraped_jobs"])
+        assert full["context"]["scraped_jobs"] == [{"url": "http://a"}]
+
+    def test_context_delta_tracks_persisted_keys(self):
+        """Runners send only keys changed since the last successful write"""
+        from graphs.state import ContextDelta
+
+        delta = ContextDelta()
+        # First write of a run replaces the context (drops a previous run's keys)
+        assert delta.diff({"a": 1, "b": [1, 2]}) == {"context": {"a": 1, "b": [1, 2]}}
+        assert delta.diff({"a": 1, "b": [1, 2]}) == {"context": {"a": 1, "b": [1, 2]}}
+        delta.mark_persisted()
+
+        assert delta.diff({"a": 1, "b": [1, 2]}) == {}
+        changes = delta.diff({"b": [1, 2, 3], "c": "new"})
+        # Not marked persisted: a failed write is retried in full next time
+        assert delta.diff({"b": [1, 2, 3], "c": "new"}) == changes
+        assert changes == {"context_patch": {"b": [1, 2, 3], "c": "new"}, "context_remove": ["a"]}
+
+    def test_context_delta_rejects_unserializable_values(self):
+        """Models and dataclasses must be dumped before they enter the context"""
+        from graphs.state import ContextDelta
+        from core.models import JobAnalysis
+
+        with pytest.raises(TypeError):
+            ContextDelta().diff({"job_analysis": JobAnalysis()})
+
+    def test_mission_sync_keeps_unstored_tail(self):
+        """A failed per-node write leaves its events and keys for the next write"""
+        from graphs.state import MissionEvent, MissionSync
+
+        sync = MissionSync()
+        first = MissionEvent(type="log", message="one")
+        state = {"events": [first], "context": {"a": 1}}
+        assert sync.pending(state)["events"] == [first.to_dict()]
+        sync.mark_persisted()
+
+        # This write fails: nothing is marked
+        state = {"events": [first, MissionEvent(type="log", message="two")], "context": {"a": 1, "b": 2}}
+        sync.pending(state)
+
+        tail = sync.pending(state)
+        assert [e["message"] for e in tail["events"]] == ["two"]
+        assert tail["context_patch"] == {"b": 2}
+
+    @pytest.mark.asyncio
+    async def test_final_mission_write_sends_unstored_tail(self):
+        """_run_mission writes what the runner's last per-node write failed to store"""
+        from app.routers.agent import _run_mission
+        from graphs.state import MissionEvent, MissionStatus
+
+        async def run_job_finder(user_id, mission_id, sync, **kwargs):
+            stored = MissionEvent(type="log", message="stored")
+            state = {"status": MissionStatus.COMPLETED, "events": [stored], "context": {"a": 1}}
+            sync.pending(state)
+            sync.mark_persisted()
+            state["events"].append(MissionEvent(type="log", message="lost"))
+            state["context"]["b"] = 2
+            return state
+
+        with patch("app.routers.agent.db") as mock_db, \
+             patch("app.routers.agent.run_job_finder", run_job_finder):
+            mock_db.update_mission = AsyncMock()
+            await _run_mission("m-1", "job_finder", "user-1")
+
+        final = mock_db.update_mission.await_args.kwargs
+        assert final["status"] == "completed"
+        assert [e["message"] for e in final["events"]] == ["lost"]
+        assert final["context_patch"] == {"b": 2}
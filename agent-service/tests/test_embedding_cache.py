@@ -0,0 +1,114 @@
+"""
+Embedding Cache Tests
+
+Unit tests for the content-hash cache in rag/embedding_cache.py and for how
+EmbeddingService uses it to embed only uncached text.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from rag.embedding_cache import EmbeddingCache, make_embedding_key
+from rag.embeddings import EmbeddingService
+
+
+def make_api_response(texts):
+    response = MagicMock()
+    response.data = [MagicMock(embedding=[float(len(text)), 1.0]) for text in texts]
+    return response
+
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    db.get_cached_embeddings = AsyncMock(return_value={})
+    db.store_cached_embeddings = AsyncMock()
+    with patch("rag.embedding_cache.db", db), \
+         patch("rag.embedding_cache._embedding_cache", None):
+        yield db
+
+
+@pytest.fixture
+def service(mock_db):
+    service = EmbeddingService()
+    service.settings = service.settings.model_copy(update={"embedding_cache_enabled": True})
+    service.backend.client = MagicMock()
+    service.backend.client.embeddings.create = AsyncMock(
+        side_effect=lambda model, input: make_api_response([input] if isinstance(input, str) else input)
+    )
+    with patch("rag.embeddings.get_encoding", return_value=MagicMock(encode=lambda text, **kwargs: text.split())):
+        yield service
+
+
+class TestEmbeddingKey:
+    """Tests for cache keys"""
+
+    def test_formatting_only_differences_share_a_key(self):
+        assert make_embedding_key("m", "Senior  Engineer\r\n\nPython ") == make_embedding_key("m", "Senior Engineer\n\nPython")
+
+    def test_model_is_part_of_the_key(self):
+        assert make_embedding_key("a", "text") != make_embedding_key("b", "text")
+
+
+class TestEmbeddingCache:
+    """Tests for the memory and database levels"""
+
+    @pytest.mark.asyncio
+    async def test_memory_hit_skips_database(self, mock_db):
+        cache = EmbeddingCache()
+        await cache.set_many("m", {"k": [0.5, 0.25]})
+        assert await cache.get("k") == [0.5, 0.25]
+        mock_db.get_cached_embeddings.assert_not_called()
+        mock_db.store_cached_embeddings.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_database_hit_fills_memory(self, mock_db):
+        mock_db.get_cached_embeddings.return_value = {"k": [1.0, 2.0]}
+        cache = EmbeddingCache()
+        assert await cache.get_many(["k", "other"]) == {"k": [1.0, 2.0]}
+        assert await cache.get("k") == [1.0, 2.0]
+        assert mock_db.get_cached_embeddings.await_count == 1
+        assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_database_errors_are_misses(self, mock_db):
+        mock_db.get_cached_embeddings.side_effect = Exception("db down")
+        mock_db.store_cached_embeddings.side_effect = Exception("db down")
+        cache = EmbeddingCache()
+        assert await cache.get("k") is None
+        await cache.set_many("m", {"k": [1.0]})
+        assert await cache.get("k") == [1.0]
+
+
+class TestServiceCaching:
+    """Tests for EmbeddingService over the cache"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_text_is_embedded_once(self, service):
+        first = await service.embed_text("python developer")
+        second = await service.embed_text("python  developer")
+        assert first == second
+        assert service.backend.client.embeddings.create.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_embeds_only_distinct_misses(self, service, mock_db):
+        cached_key = make_embedding_key(service.model, "cached")
+        mock_db.get_cached_embeddings.return_value = {cached_key: [9.0, 9.0]}
+
+        result = (await service.embed_texts(["abc", "cached", "abc", "de"])).vectors
+
+        sent = service.backend.client.embeddings.create.await_args.kwargs["input"]
+        assert sent == ["abc", "de"]
+        assert result == [[3.0, 1.0], [9.0, 9.0], [3.0, 1.0], [2.0, 1.0]]
+        stored = mock_db.store_cached_embeddings.await_args.args[1]
+        assert set(stored) == {make_embedding_key(service.model, "abc"), make_embedding_key(service.model, "de")}
+
+    @pytest.mark.asyncio
+    async def test_query_embedding_never_falls_back(self, service, mock_db):
+        from rag.embedding_backends import HashedNgramBackend
+        from rag.embeddings import EmbeddingUnavailableError
+        service.fallback = HashedNgramBackend(service.dimension)
+        service.backend.client.embeddings.create = AsyncMock(side_effect=RuntimeError("down"))
+        with pytest.raises(EmbeddingUnavailableError):
+            await service.embed_text("x", max_retries=1)
+        mock_db.store_cached_embeddings.assert_not_called()
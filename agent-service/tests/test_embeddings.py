@@ -0,0 +1,233 @@
+"""
+Batch Embedding Tests
+
+Unit tests for EmbeddingService.embed_texts batching, concurrency, retries
+and per-item failure reporting, and for the local hashed n-gram backend and
+degraded-mode fallback in rag/embedding_backends.py.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from rag.embedding_backends import EmbeddingBackend, HashedNgramBackend
+from rag.embeddings import EmbeddingService, EmbeddingUnavailableError
+
+real_sleep = asyncio.sleep  # the fixture patches asyncio.sleep to skip backoff
+
+
+def make_api_response(texts):
+    response = MagicMock()
+    response.data = [MagicMock(embedding=[float(len(text))]) for text in texts]
+    return response
+
+
+def make_error(kind, message="error"):
+    from openai import APIError, BadRequestError, RateLimitError
+    if kind is APIError:
+        return APIError(message, request=MagicMock(), body=None)
+    return kind(message, response=MagicMock(status_code=400 if kind is BadRequestError else 429), body=None)
+
+
+@pytest.fixture
+def service():
+    service = EmbeddingService()
+    service.settings = service.settings.model_copy(update={
+        "embedding_cache_enabled": False,
+        "embedding_batch_size": 2,
+        "embedding_batch_max_tokens": 10,
+        "embedding_max_concurrency": 2,
+        "embedding_max_retries": 3,
+    })
+    service.fallback = None
+    service.backend.client = MagicMock()
+    service.backend.client.embeddings.create = AsyncMock(side_effect=lambda model, input: make_api_response(input))
+    with patch("rag.embeddings.get_encoding", return_value=MagicMock(encode=lambda text, **kwargs: text.split())), \
+         patch("asyncio.sleep", new=AsyncMock()):
+        yield service
+
+
+def sent_batches(service):
+    return [call.kwargs["input"] for call in service.backend.client.embeddings.create.await_args_list]
+
+
+class TestBatching:
+    """Tests for splitting by items and tokens"""
+
+    @pytest.mark.asyncio
+    async def test_splits_by_item_count(self, service):
+        result = await service.embed_texts(["a", "bb", "ccc"])
+        assert sent_batches(service) == [["a", "bb"], ["ccc"]]
+        assert result.vectors == [[1.0], [2.0], [3.0]]
+        assert result.ok
+
+    @pytest.mark.asyncio
+    async def test_splits_by_token_count(self, service):
+        long_text = " ".join(["w"] * 8)
+        await service.embed_texts([long_text, "x y z"])
+        assert sent_batches(service) == [[long_text], ["x y z"]]
+
+    @pytest.mark.asyncio
+    async def test_batches_run_concurrently_within_limit(self, service):
+        in_flight = peak = 0
+
+        async def create(model, input):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await real_sleep(0.01)
+            in_flight -= 1
+            return make_api_response(input)
+
+        service.backend.client.embeddings.create = create
+        result = await service.embed_texts([str(i) for i in range(10)])
+        assert result.ok
+        assert peak == 2
+
+
+class TestFailures:
+    """Tests for retries and the per-item failure mask"""
+
+    @pytest.mark.asyncio
+    async def test_transient_error_is_retried(self, service):
+        from openai import RateLimitError
+        responses = [make_error(RateLimitError), make_api_response(["a"])]
+        service.backend.client.embeddings.create = AsyncMock(side_effect=responses)
+        result = await service.embed_texts(["a"])
+        assert result.ok and result.vectors == [[1.0]]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_only_marks_its_items(self, service):
+        from openai import APIError
+
+        async def create(model, input):
+            if "bad" in input:
+                raise make_error(APIError)
+            return make_api_response(input)
+
+        service.backend.client.embeddings.create = create
+        result = await service.embed_texts(["a", "bad", "c"])
+        assert result.failed == [True, True, False]
+        assert result.vectors[2] == [1.0]
+        assert result.failed_count == 2
+
+    @pytest.mark.asyncio
+    async def test_rejected_batch_is_split_to_isolate_input(self, service):
+        from openai import BadRequestError
+
+        async def create(model, input):
+            if "huge" in input:
+                raise make_error(BadRequestError, "input too long")
+            return make_api_response(input)
+
+        service.backend.client.embeddings.create = create
+        result = await service.embed_texts(["a", "huge"])
+        assert result.failed == [False, True]
+        assert result.vectors[0] == [1.0]
+
+
+class TestHashedNgramBackend:
+    """Tests for the local deterministic backend"""
+
+    def test_deterministic_unit_vectors(self):
+        backend = HashedNgramBackend(dimension=256)
+        first, second = backend.embed_sync(["Senior Python Developer", "Senior Python Developer"])
+        assert first == second
+        assert len(first) == 256
+        assert sum(v * v for v in first) == pytest.approx(1.0, abs=1e-5)
+
+    def test_shared_vocabulary_is_closer(self):
+        backend = HashedNgramBackend()
+        query = backend.embed_one("python backend developer")
+        related = backend.embed_one("Backend developer with Python and Django")
+        unrelated = backend.embed_one("registered nurse, night shifts")
+        assert float(query @ related) > float(query @ unrelated) + 0.2
+
+    def test_backends_must_implement_embed(self):
+        class Incomplete(EmbeddingBackend):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_empty_text_is_not_a_zero_vector(self):
+        vector = HashedNgramBackend(dimension=64).embed_one("")
+        assert float((vector ** 2).sum()) == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_local_backend_needs_no_client(self):
+        from core.config import get_settings
+        settings = get_settings().model_copy(update={"embedding_backend": "local"})
+        with patch("rag.embeddings.get_settings", return_value=settings):
+            local = EmbeddingService()
+        assert local.backend.name == "local" and local.fallback is None
+        assert local.model.startswith("local/")
+        with patch("rag.embeddings.get_encoding", return_value=MagicMock(encode=lambda text, **kwargs: text.split())):
+            result = await local.embed_texts(["a b", "c"])
+        assert result.ok and not any(result.degraded)
+
+
+class TestDegradedFallback:
+    """Tests for the local fallback when the API fails"""
+
+    @pytest.mark.asyncio
+    async def test_failed_items_get_flagged_local_vectors(self, service):
+        from openai import APIError
+
+        async def create(model, input):
+            if "bad" in input:
+                raise make_error(APIError)
+            return make_api_response(input)
+
+        service.fallback = HashedNgramBackend(service.dimension)
+        service.backend.client.embeddings.create = create
+        result = await service.embed_texts(["a", "bad", "c"])
+
+        assert result.ok
+        assert result.degraded == [True, True, False]
+        assert result.vectors[0] == service.fallback.embed_sync(["a"])[0]
+        assert result.vectors[2] == [1.0]
+
+    @pytest.mark.asyncio
+    async def test_embed_text_raises_without_fallback(self, service):
+        service.backend.client.embeddings.create = AsyncMock(side_effect=RuntimeError("down"))
+        with pytest.raises(Exception, match="Embedding failed"):
+            await service.embed_text("x", max_retries=1)
+
+    @pytest.mark.asyncio
+    async def test_retrieval_is_skipped_without_query_embedding(self):
+        from rag.retriever import RAGRetriever
+        with patch("rag.retriever.embeddings.embed_text", AsyncMock(side_effect=EmbeddingUnavailableError("down"))), \
+             patch("rag.retriever.db") as mock_db:
+            assert await RAGRetriever("user-1").retrieve("python developer") == []
+        mock_db.search_resume_chunks.assert_not_called()
+
+
+class TestReembedDegraded:
+    """Tests for scripts/reembed_degraded.py"""
+
+    @pytest.mark.asyncio
+    async def test_failing_row_does_not_block_later_rows(self, service):
+        import scripts.reembed_degraded as script
+        from openai import BadRequestError
+        rows = [{"id": i, "text": "bad" if i == 1 else f"row {i}"} for i in range(1, 6)]
+
+        async def get_degraded_embeddings(table, limit, after_id=None):
+            start = 0 if after_id is None else after_id
+            return rows[start:start + limit]
+
+        async def create(model, input):
+            if "bad" in input:
+                raise make_error(BadRequestError)
+            return make_api_response(input)
+
+        service.backend.client.embeddings.create = create
+        mock_db = MagicMock()
+        mock_db.get_degraded_embeddings = get_degraded_embeddings
+        mock_db.update_embeddings = AsyncMock()
+        with patch.object(script, "db", mock_db), patch.object(script, "embeddings", service):
+            assert await script.reembed_table("jobs", batch_size=2) == (4, 1)
+
+        updated = [row_id for call in mock_db.update_embeddings.await_args_list for row_id, _ in call.args[1]]
+        assert updated == [2, 3, 4, 5]
@@ -0,0 +1,99 @@
+"""
+Fake Provider Tests
+
+Tests for the OpenAI-compatible stand-in in scripts/fake_provider.py, driven
+through the real OpenAI SDK and LLMClient over an in-process transport.
+"""
+
+import httpx
+import pytest
+from unittest.mock import MagicMock, patch
+from openai import AsyncOpenAI, RateLimitError
+
+from core.llm import LLMClient
+from scripts.fake_provider import FakeProviderConfig, create_app
+
+
+def fake_client(**options) -> AsyncOpenAI:
+    config = FakeProviderConfig(latency_ms=0, token_interval_ms=0, **options)
+    transport = httpx.ASGITransport(app=create_app(config))
+    return AsyncOpenAI(
+        api_key="test",
+        base_url="http://fake/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=transport, base_url="http://fake"),
+    )
+
+
+@pytest.fixture
+def llm_client():
+    with patch("core.llm.get_encoding", return_value=MagicMock(encode=lambda text: text.split())):
+        client = LLMClient()
+    client.settings.llm_cache_enabled = False
+    with patch.dict("core.llm_limiter._limiters", clear=True), \
+         patch.dict("core.llm_health._health", clear=True):
+        yield client
+
+
+class TestFakeProvider:
+    """Tests for responses and injected faults"""
+
+    @pytest.mark.asyncio
+    async def test_chat_is_deterministic(self):
+        client = fake_client()
+        messages = [{"role": "user", "content": "Tailor my resume"}]
+        first = await client.chat.completions.create(model="m", messages=messages, max_tokens=20)
+        second = await client.chat.completions.create(model="m", messages=messages, max_tokens=20)
+        assert first.choices[0].message.content == second.choices[0].message.content
+        assert first.usage.completion_tokens > 0
+
+    @pytest.mark.asyncio
+    async def test_stream_matches_plain_reply(self):
+        client = fake_client()
+        messages = [{"role": "user", "content": "hello"}]
+        plain = await client.chat.completions.create(model="m", messages=messages)
+        stream = await client.chat.completions.create(model="m", messages=messages, stream=True)
+        parts = [chunk.choices[0].delta.content or "" async for chunk in stream if chunk.choices]
+        assert "".join(parts) == plain.choices[0].message.content
+
+    @pytest.mark.asyncio
+    async def test_json_mode_returns_json(self):
+        import json
+        client = fake_client()
+        reply = await client.chat.completions.create(
+            model="m", messages=[{"role": "user", "content": "x"}], response_format={"type": "json_object"}
+        )
+        assert json.loads(reply.choices[0].message.content)["echo"] == "x"
+
+    @pytest.mark.asyncio
+    async def test_embeddings_are_deterministic_unit_vectors(self):
+        client = fake_client(embedding_dimension=8)
+        first = await client.embeddings.create(model="e", input=["a", "b"])
+        second = await client.embeddings.create(model="e", input="a")
+        assert len(first.data) == 2 and len(first.data[0].embedding) == 8
+        assert first.data[0].embedding == second.data[0].embedding
+        assert sum(v * v for v in first.data[0].embedding) == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_fault(self):
+        client = fake_client(rate_429=1.0)
+        with pytest.raises(RateLimitError):
+            await client.chat.completions.create(model="m", messages=[{"role": "user", "content": "x"}])
+
+    def test_config_rejects_unknown_options(self):
+        with pytest.raises(ValueError):
+            FakeProviderConfig().update({"rate_418": 1})
+
+
+class TestLLMClientAgainstFake:
+    """LLMClient failover over real HTTP semantics"""
+
+    @pytest.mark.asyncio
+    async def test_fails_over_from_erroring_provider(self, llm_client):
+        llm_client.providers = [
+            {"name": "Gemini", "client": fake_client(rate_5xx=1.0), "model": "g", "is_openrouter": False},
+            {"name": "OpenRouter", "client": fake_client(), "model": "o", "is_openrouter": False},
+        ]
+        with patch("asyncio.sleep"):
+            reply = await llm_client.chat([{"role": "user", "content": "hi"}], cache=False)
+        assert reply.startswith("[")
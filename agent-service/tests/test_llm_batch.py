@@ -0,0 +1,82 @@
+"""
+LLM Batch Tests
+
+Unit tests for LLMClient.chat_many ordering, error isolation and
+concurrency bounds.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from core.llm import LLMClient
+
+
+@pytest.fixture
+def llm_client():
+    with patch("core.llm.get_encoding", return_value=MagicMock()):
+        client = LLMClient()
+    client.settings.llm_max_concurrency = 4
+    return client
+
+
+def request(text: str) -> dict:
+    return {"messages": [{"role": "user", "content": text}]}
+
+
+class TestChatMany:
+    """Tests for the batched chat API"""
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order(self, llm_client):
+        delays = {"slow": 0.03, "medium": 0.02, "fast": 0.0}
+
+        async def fake_chat(messages, **kwargs):
+            text = messages[0]["content"]
+            await asyncio.sleep(delays[text])
+            return text.upper()
+
+        with patch.object(llm_client, "chat", side_effect=fake_chat):
+            results = await llm_client.chat_many([request("slow"), request("medium"), request("fast")])
+
+        assert [r.content for r in results] == ["SLOW", "MEDIUM", "FAST"]
+
+    @pytest.mark.asyncio
+    async def test_errors_are_per_item(self, llm_client):
+        async def fake_chat(messages, **kwargs):
+            if messages[0]["content"] == "bad":
+                raise Exception("provider exploded")
+            return "fine"
+
+        with patch.object(llm_client, "chat", side_effect=fake_chat):
+            results = await llm_client.chat_many([request("good"), request("bad"), request("good")])
+
+        assert [r.ok for r in results] == [True, False, True]
+        assert str(results[1].error) == "provider exploded"
+        assert results[1].content is None
+
+    @pytest.mark.asyncio
+    async def test_respects_max_concurrency(self, llm_client):
+        in_flight = peak = 0
+
+        async def fake_chat(messages, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return "ok"
+
+        with patch.object(llm_client, "chat", side_effect=fake_chat):
+            results = await llm_client.chat_many([request(str(i)) for i in range(7)], max_concurrency=2)
+
+        assert len(results) == 7
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_passes_chat_options_through(self, llm_client):
+        with patch.object(llm_client, "chat", return_value="ok") as mock_chat:
+            await llm_client.chat_many([{**request("x"), "temperature": 0.1, "cache": True}])
+        assert mock_chat.call_args.kwargs["temperature"] == 0.1
+        assert mock_chat.call_args.kwargs["cache"] is True
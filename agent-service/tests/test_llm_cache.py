@@ -0,0 +1,164 @@
+"""
+LLM Response Cache Tests
+
+Unit tests for core/llm_cache.py and the cache and request-coalescing
+paths in LLMClient.chat.
+Providers are mocked; the on-disk store uses a temporary SQLite file.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from core.llm import LLMClient
+from core.llm_cache import LLMResponseCache, make_cache_key
+
+
+def make_response(content: str):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    return response
+
+
+@pytest.fixture
+def llm_client(tmp_path):
+    """LLMClient with one mocked provider and the response cache enabled"""
+    with patch("core.llm.get_encoding"):
+        client = LLMClient()
+    client.settings.llm_cache_enabled = True
+    client.settings.llm_cache_path = str(tmp_path / "llm.sqlite3")
+    client.settings.llm_cache_max_temperature = 0.2
+    provider_client = MagicMock()
+    provider_client.chat.completions.create = AsyncMock(return_value=make_response('{"ok": true}'))
+    client.providers = [{"name": "Fake", "client": provider_client, "model": "fake-model", "is_openrouter": False}]
+
+    with patch("core.llm_cache._response_cache", None), \
+         patch.dict("core.llm_limiter._limiters", clear=True), \
+         patch.dict("core.llm_health._health", clear=True):
+        yield client
+
+
+class TestCacheKey:
+    """Tests for request normalization"""
+
+    def test_formatting_differences_share_a_key(self):
+        """Whitespace and line-ending noise does not change the key"""
+        a = make_cache_key("m", [{"role": "user", "content": "Analyze  this\r\njob "}], 0.7, 100)
+        b = make_cache_key("m", [{"role": "user", "content": "Analyze this\njob"}], 0.7, 100)
+        assert a == b
+
+    def test_model_and_temperature_are_part_of_the_key(self):
+        messages = [{"role": "user", "content": "x"}]
+        assert make_cache_key("m1", messages, 0.7, 100) != make_cache_key("m2", messages, 0.7, 100)
+        assert make_cache_key("m1", messages, 0.7, 100) != make_cache_key("m1", messages, 0.0, 100)
+
+
+class TestResponseCache:
+    """Tests for the two-level store"""
+
+    @pytest.mark.asyncio
+    async def test_persists_across_instances(self, tmp_path):
+        """A new process (fresh memory level) reads the SQLite file"""
+        path = str(tmp_path / "cache.sqlite3")
+        await LLMResponseCache(path, ttl=60).set("k", "m", "answer")
+
+        fresh = LLMResponseCache(path, ttl=60)
+        assert await fresh.get("k") == "answer"
+        assert await fresh.get("other") is None
+        assert fresh.stats()["hits"] == 1 and fresh.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_rows_ignored(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        await LLMResponseCache(path, ttl=-1).set("k", "m", "stale")
+        assert await LLMResponseCache(path, ttl=60).get("k") is None
+
+
+class TestChatCaching:
+    """Tests for the cache policy in LLMClient.chat"""
+
+    @pytest.mark.asyncio
+    async def test_opted_in_call_hits_cache(self, llm_client):
+        """A repeated cache=True call is served without a provider request"""
+        messages = [{"role": "user", "content": "Analyze JD"}]
+        first = await llm_client.chat(messages, cache=True)
+        second = await llm_client.chat(messages, cache=True)
+
+        assert first == second == '{"ok": true}'
+        llm_client.providers[0]["client"].chat.completions.create.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_bypass_and_creative_calls_skip_cache(self, llm_client):
+        """cache=False and high-temperature calls always reach the provider"""
+        messages = [{"role": "user", "content": "Write a post"}]
+        await llm_client.chat(messages, temperature=0.7)
+        await llm_client.chat(messages, temperature=0.7)
+        await llm_client.chat(messages, temperature=0.0, cache=False)
+
+        assert llm_client.providers[0]["client"].chat.completions.create.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_low_temperature_cached_by_default(self, llm_client):
+        messages = [{"role": "user", "content": "Classify"}]
+        await llm_client.chat(messages, temperature=0.0)
+        await llm_client.chat(messages, temperature=0.0)
+
+        llm_client.providers[0]["client"].chat.completions.create.assert_awaited_once()
+
+
+class TestRequestCoalescing:
+    """Tests for single-flight sharing of concurrent identical requests"""
+
+    @staticmethod
+    def slow_provider(llm_client, result=None, error=None):
+        release = asyncio.Event()
+
+        async def create(**kwargs):
+            await release.wait()
+            if error:
+                raise error
+            return make_response(result)
+
+        llm_client.settings.llm_cache_enabled = False
+        llm_client.providers[0]["client"].chat.completions.create = AsyncMock(side_effect=create)
+        return release
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_request(self, llm_client):
+        release = self.slow_provider(llm_client, result="shared")
+        messages = [{"role": "user", "content": "Research Acme"}]
+
+        calls = [asyncio.ensure_future(llm_client.chat(messages)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*calls)
+
+        assert results == ["shared"] * 3
+        llm_client.providers[0]["client"].chat.completions.create.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared(self, llm_client):
+        release = self.slow_provider(llm_client, error=RuntimeError("boom"))
+        messages = [{"role": "user", "content": "Research Acme"}]
+
+        calls = [asyncio.ensure_future(llm_client.chat(messages)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        llm_client.providers[0]["client"].chat.completions.create.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_bypass_is_not_coalesced(self, llm_client):
+        release = self.slow_provider(llm_client, result="fresh")
+        messages = [{"role": "user", "content": "Write"}]
+
+        calls = [asyncio.ensure_future(llm_client.chat(messages, cache=False)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*calls)
+
+        assert llm_client.providers[0]["client"].chat.completions.create.await_count == 2
@@ -0,0 +1,242 @@
+"""
+LLM Provider Health Tests
+
+Unit tests for the circuit breaker and health ordering in core/llm_health.py,
+for how LLMClient fails over around an open circuit, and for hedged requests.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from core.llm import LLMClient
+from core.llm_health import (
+    CLOSED, HALF_OPEN, OPEN, HedgeBudget, ProviderHealth, get_health, get_hedge_budget, order_providers,
+)
+
+
+def make_response(content: str):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    return response
+
+
+@pytest.fixture(autouse=True)
+def fresh_registries():
+    with patch.dict("core.llm_health._health", clear=True), \
+         patch.dict("core.llm_limiter._limiters", clear=True), \
+         patch("core.llm_health._hedge_budget", None):
+        yield
+
+
+class TestCircuitBreaker:
+    """Tests for the closed -> open -> half_open cycle"""
+
+    def test_opens_after_consecutive_failures(self):
+        health = ProviderHealth("p", failure_threshold=3, cooldown=30)
+        health.record_failure()
+        health.record_failure()
+        assert health.state == CLOSED
+        health.record_failure()
+        assert health.state == OPEN
+        assert not health.allow_request()
+
+    def test_success_resets_failure_streak(self):
+        health = ProviderHealth("p", failure_threshold=2)
+        health.record_failure()
+        health.record_success(0.5)
+        health.record_failure()
+        assert health.state == CLOSED
+
+    def test_hard_failure_opens_immediately(self):
+        health = ProviderHealth("p", failure_threshold=3)
+        health.record_failure(hard=True)
+        assert health.state == OPEN
+
+    def test_half_open_admits_a_single_probe(self):
+        with patch("core.llm_health.time.monotonic", return_value=0.0):
+            health = ProviderHealth("p", failure_threshold=1, cooldown=30)
+            health.record_failure()
+        with patch("core.llm_health.time.monotonic", return_value=31.0):
+            assert health.allow_request()
+            assert health.state == HALF_OPEN
+            assert not health.allow_request()
+            health.record_success(0.2)
+            assert health.state == CLOSED
+            assert health.allow_request()
+
+    def test_failed_probe_doubles_cooldown(self):
+        with patch("core.llm_health.time.monotonic", return_value=0.0):
+            health = ProviderHealth("p", failure_threshold=1, cooldown=30)
+            health.record_failure()
+        with patch("core.llm_health.time.monotonic", return_value=31.0):
+            assert health.allow_request()
+            health.record_failure()
+            assert health.state == OPEN
+            assert health.cooldown == 60
+        with patch("core.llm_health.time.monotonic", return_value=61.0):
+            assert not health.allow_request()
+
+    def test_stats_report_percentiles(self):
+        health = ProviderHealth("p")
+        for latency in (0.1, 0.2, 0.3, 0.4, 2.0):
+            health.record_success(latency)
+        health.record_failure()
+        stats = health.stats()
+        assert stats["latency_p50_ms"] == 300
+        assert stats["latency_p95_ms"] == 2000
+        assert stats["error_rate"] == pytest.approx(1 / 6, abs=0.001)
+
+
+class TestProviderOrdering:
+    """Tests for health-based ordering"""
+
+    def test_open_provider_moves_last(self):
+        settings = MagicMock(llm_breaker_failure_threshold=1, llm_breaker_cooldown_seconds=30)
+        providers = [{"name": "A"}, {"name": "B"}]
+        get_health("A", settings).record_failure()
+        assert [p["name"] for p in order_providers(providers, settings)] == ["B", "A"]
+
+    def test_equally_healthy_keep_configured_order(self):
+        settings = MagicMock(llm_breaker_failure_threshold=3, llm_breaker_cooldown_seconds=30)
+        providers = [{"name": "A"}, {"name": "B"}]
+        get_health("A", settings).record_success(1.2)
+        get_health("B", settings).record_success(0.4)
+        assert [p["name"] for p in order_providers(providers, settings)] == ["A", "B"]
+
+
+class TestClientFailover:
+    """Tests for LLMClient around open circuits"""
+
+    @pytest.mark.asyncio
+    async def test_skips_provider_with_open_circuit(self):
+        with patch("core.llm.get_encoding"):
+            client = LLMClient()
+        primary, backup = MagicMock(), MagicMock()
+        primary.chat.completions.create = AsyncMock(return_value=make_response("primary"))
+        backup.chat.completions.create = AsyncMock(return_value=make_response("backup"))
+        client.providers = [
+            {"name": "Primary", "client": primary, "model": "m1", "is_openrouter": False},
+            {"name": "Backup", "client": backup, "model": "m2", "is_openrouter": False},
+        ]
+        get_health("Primary", client.settings).record_failure(hard=True)
+
+        result = await client.chat([{"role": "user", "content": "hi"}], cache=False)
+
+        assert result == "backup"
+        primary.chat.completions.create.assert_not_called()
+        assert get_health("Backup").stats()["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_all_circuits_open_fails_fast(self):
+        with patch("core.llm.get_encoding"):
+            client = LLMClient()
+        provider = MagicMock()
+        provider.chat.completions.create = AsyncMock(return_value=make_response("x"))
+        client.providers = [{"name": "Only", "client": provider, "model": "m", "is_openrouter": False}]
+        get_health("Only", client.settings).record_failure(hard=True)
+
+        with pytest.raises(Exception, match="circuit open"):
+            await client.chat([{"role": "user", "content": "hi"}], cache=False)
+        provider.chat.completions.create.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_limiter_errors_do_not_open_circuit(self):
+        """Errors from our own queueing are not counted against the provider"""
+        with patch("core.llm.get_encoding"):
+            client = LLMClient()
+        provider = MagicMock()
+        provider.chat.completions.create = AsyncMock(return_value=make_response("x"))
+        client.providers = [{"name": "Only", "client": provider, "model": "m", "is_openrouter": False}]
+
+        with patch.object(client, "estimate_tokens", side_effect=RuntimeError("tokenizer broke")):
+            for _ in range(5):
+                with pytest.raises(RuntimeError):
+                    await client.chat([{"role": "user", "content": "hi"}], cache=False)
+
+        assert get_health("Only").state == CLOSED
+        provider.chat.completions.create.assert_not_called()
+
+
+class TestHedgeBudget:
+    """Tests for the hedge rate cap"""
+
+    def test_allows_about_ratio_of_calls(self):
+        budget = HedgeBudget(0.05)
+        allowed = 0
+        for _ in range(200):
+            budget.record_call()
+            allowed += budget.try_spend()
+        assert allowed == 10
+        assert budget.stats()["hedge_rate"] == 0.05
+
+    def test_burst_is_capped(self):
+        budget = HedgeBudget(0.5, burst=2)
+        for _ in range(100):
+            budget.record_call()
+        assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+
+class TestHedgedChat:
+    """Tests for hedging a slow primary to the backup"""
+
+    def make_client(self, primary_create, backup_create):
+        with patch("core.llm.get_encoding"):
+            client = LLMClient()
+        client.settings = client.settings.model_copy(update={
+            "llm_hedge_enabled": True,
+            "llm_hedge_min_samples": 1,
+            "llm_hedge_min_delay_seconds": 0.05,
+        })
+        primary, backup = MagicMock(), MagicMock()
+        primary.chat.completions.create = primary_create
+        backup.chat.completions.create = backup_create
+        client.providers = [
+            {"name": "Primary", "client": primary, "model": "m1", "is_openrouter": False},
+            {"name": "Backup", "client": backup, "model": "m2", "is_openrouter": False},
+        ]
+        get_health("Primary", client.settings).record_success(0.01)
+        get_hedge_budget(client.settings).credit = 1.0
+        return client
+
+    @pytest.mark.asyncio
+    async def test_backup_wins_and_primary_is_cancelled(self):
+        cancelled = asyncio.Event()
+
+        async def stalled(**kwargs):
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        client = self.make_client(stalled, AsyncMock(return_value=make_response("backup")))
+        result = await client.chat([{"role": "user", "content": "hi"}], cache=False)
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+        assert result == "backup"
+        stats = get_hedge_budget().stats()
+        assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+        assert get_health("Primary").stats()["error_rate"] == 0
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        backup = AsyncMock(return_value=make_response("backup"))
+        client = self.make_client(AsyncMock(return_value=make_response("primary")), backup)
+        assert await client.chat([{"role": "user", "content": "hi"}], cache=False) == "primary"
+        backup.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_budget(self):
+        async def slow(**kwargs):
+            await asyncio.sleep(0.15)
+            return make_response("primary")
+
+        backup = AsyncMock(return_value=make_response("backup"))
+        client = self.make_client(slow, backup)
+        get_hedge_budget().credit = 0.0
+        assert await client.chat([{"role": "user", "content": "hi"}], cache=False) == "primary"
+        backup.assert_not_called()
+        assert get_hedge_budget().stats()["denied"] == 1
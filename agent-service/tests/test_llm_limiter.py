@@ -0,0 +1,88 @@
+"""
+LLM Limiter Tests
+
+Unit tests for the shared admission control in core/llm_limiter.py.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from core.llm_limiter import ProviderLimiter, TokenBucket, get_limiter
+
+
+class TestTokenBucket:
+    """Tests for refill and debt accounting"""
+
+    def test_refills_over_time(self):
+        with patch("core.llm_limiter.time.monotonic", return_value=0.0):
+            bucket = TokenBucket(per_minute=60)
+            bucket.consume(60)
+            assert bucket.time_until(1) == pytest.approx(1.0)
+        with patch("core.llm_limiter.time.monotonic", return_value=30.0):
+            assert bucket.time_until(30) == 0.0
+
+    def test_oversized_request_waits_for_full_bucket_only(self):
+        """A request larger than the bucket cannot wait forever"""
+        with patch("core.llm_limiter.time.monotonic", return_value=0.0):
+            bucket = TokenBucket(per_minute=100)
+            assert bucket.time_until(500) == 0.0
+
+
+class TestProviderLimiter:
+    """Tests for concurrency caps and FIFO admission"""
+
+    @pytest.mark.asyncio
+    async def test_caps_in_flight_calls(self):
+        limiter = ProviderLimiter("p:m", max_concurrency=2, rpm=1000, tpm=10_000_000)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter.acquire(10):
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        assert peak == 2
+        assert limiter.stats()["admitted"] == 6
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_admits_in_arrival_order(self):
+        limiter = ProviderLimiter("p:m", max_concurrency=1, rpm=1000, tpm=10_000_000)
+        order = []
+
+        async def call(i):
+            async with limiter.acquire(10):
+                order.append(i)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(call(i) for i in range(5)))
+        assert order == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_settle_refunds_unused_estimate(self):
+        limiter = ProviderLimiter("p:m", max_concurrency=1, rpm=1000, tpm=1000)
+        async with limiter.acquire(800) as permit:
+            permit.settle(100)
+        assert limiter.tokens.level == pytest.approx(900, abs=5)
+        assert limiter.tokens_used == 100
+
+
+class TestLimiterRegistry:
+    """Tests for per provider/model configuration"""
+
+    def test_provider_override_applied(self):
+        settings = MagicMock(
+            llm_max_concurrency=4, llm_rpm=60, llm_tpm=1000,
+            llm_provider_limits={"Gemini": {"rpm": 15}, "Gemini:pro": {"max_concurrency": 1}},
+        )
+        with patch.dict("core.llm_limiter._limiters", clear=True):
+            flash = get_limiter("Gemini", "flash", settings)
+            pro = get_limiter("Gemini", "pro", settings)
+            assert get_limiter("Gemini", "flash", settings) is flash
+
+        assert flash.requests.capacity == 15 and flash.max_concurrency == 4
+        assert pro.max_concurrency == 1 and pro.requests.capacity == 60
@@ -0,0 +1,165 @@
+"""
+LLM Streaming Tests
+
+Unit tests for LLMClient.chat_stream failover, token forwarding through
+chat(on_token=...), and the draft fan-out in core/drafts.py.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from core.drafts import DraftStreams
+from core.llm import LLMClient, merge_system_messages
+
+
+def make_chunk(content):
+    chunk = MagicMock()
+    chunk.choices = [MagicMock()]
+    chunk.choices[0].delta.content = content
+    return chunk
+
+
+def make_stream(*deltas, error=None):
+    async def stream():
+        for delta in deltas:
+            yield make_chunk(delta)
+        if error:
+            raise error
+    return stream()
+
+
+def make_api_error(message: str):
+    from openai import APIError
+    return APIError(message, request=MagicMock(), body=None)
+
+
+def make_provider(name: str, create):
+    client = MagicMock()
+    client.chat.completions.create = create
+    return {"name": name, "client": client, "model": f"{name}-model", "is_openrouter": False}
+
+
+@pytest.fixture
+def llm_client():
+    with patch("core.llm.get_encoding", return_value=MagicMock(encode=lambda text: text.split())):
+        client = LLMClient()
+    client.settings.llm_cache_enabled = False
+    with patch.dict("core.llm_limiter._limiters", clear=True), \
+         patch.dict("core.llm_health._health", clear=True):
+        yield client
+
+
+async def collect(agen):
+    return [delta async for delta in agen]
+
+
+class TestChatStream:
+    """Tests for the multi-provider streaming path"""
+
+    @pytest.mark.asyncio
+    async def test_yields_deltas(self, llm_client):
+        create = AsyncMock(return_value=make_stream("Hel", "lo", None, "!"))
+        llm_client.providers = [make_provider("Primary", create)]
+
+        assert await collect(llm_client.chat_stream([{"role": "user", "content": "hi"}])) == ["Hel", "lo", "!"]
+        assert create.call_args.kwargs["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_fails_over_before_first_token(self, llm_client):
+        primary = AsyncMock(side_effect=make_api_error("invalid api key"))
+        backup = AsyncMock(return_value=make_stream("from backup"))
+        llm_client.providers = [make_provider("Primary", primary), make_provider("Backup", backup)]
+
+        assert await collect(llm_client.chat_stream([{"role": "user", "content": "hi"}])) == ["from backup"]
+
+    @pytest.mark.asyncio
+    async def test_error_after_partial_output_is_raised(self, llm_client):
+        primary = AsyncMock(return_value=make_stream("partial", error=make_api_error("connection reset")))
+        backup = AsyncMock(return_value=make_stream("from backup"))
+        llm_client.providers = [make_provider("Primary", primary), make_provider("Backup", backup)]
+
+        received = []
+        with pytest.raises(Exception, match="partial output"):
+            async for delta in llm_client.chat_stream([{"role": "user", "content": "hi"}]):
+                received.append(delta)
+        assert received == ["partial"]
+        backup.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_system_message_fallback(self, llm_client):
+        create = AsyncMock(side_effect=[make_api_error("Developer instruction is not enabled"), make_stream("ok")])
+        llm_client.providers = [make_provider("Primary", create)]
+        messages = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "hi"}]
+
+        assert await collect(llm_client.chat_stream(messages)) == ["ok"]
+        retried = create.call_args_list[1].kwargs["messages"]
+        assert retried == merge_system_messages(messages)
+        assert retried[0]["role"] == "user" and "Be brief." in retried[0]["content"]
+
+    @pytest.mark.asyncio
+    async def test_chat_forwards_tokens_and_returns_text(self, llm_client):
+        create = AsyncMock(return_value=make_stream("Dear ", "hiring ", "manager"))
+        llm_client.providers = [make_provider("Primary", create)]
+        received = []
+
+        async def on_token(delta):
+            received.append(delta)
+
+        text = await llm_client.chat([{"role": "user", "content": "hi"}], on_token=on_token)
+        assert text == "Dear hiring manager"
+        assert received == ["Dear ", "hiring ", "manager"]
+
+
+    @pytest.mark.asyncio
+    async def test_consumer_stopping_early_releases_provider(self, llm_client):
+        from core.llm_health import HALF_OPEN, get_health
+        llm_client.providers = [make_provider("A", AsyncMock(return_value=make_stream("one ", "two")))]
+        health = get_health("A", llm_client.settings)
+        health.state = HALF_OPEN
+        stream = llm_client.chat_stream([{"role": "user", "content": "hi"}])
+
+        assert await stream.__anext__() == "one "
+        assert health.probe_started_at is not None
+        await stream.aclose()
+
+        # No verdict on the provider, and the half-open probe is free again
+        assert health.state == HALF_OPEN and health.probe_started_at is None
+
+
+class TestDraftStreams:
+    """Tests for mission draft fan-out"""
+
+    @pytest.mark.asyncio
+    async def test_late_subscriber_catches_up(self):
+        streams = DraftStreams()
+        streams.publish("m1", "resume", "# Jane")
+        events = streams.subscribe("m1", keepalive=1)
+
+        assert await events.__anext__() == {"draft": "resume", "delta": "# Jane"}
+        streams.publish("m1", "resume", " Doe")
+        streams.finish("m1", "resume")
+        assert await events.__anext__() == {"draft": "resume", "delta": " Doe"}
+        assert await events.__anext__() == {"draft": "resume", "done": True}
+
+        await events.aclose()
+        assert streams.stats() == {"active_drafts": 0, "subscribers": 0}
+
+    @pytest.mark.asyncio
+    async def test_close_ends_subscriptions(self):
+        streams = DraftStreams()
+        streams.publish("m1", "resume", "partial")
+        events = streams.subscribe("m1", keepalive=1)
+        assert await events.__anext__() == {"draft": "resume", "delta": "partial"}
+
+        streams.close("m1")
+        assert await collect(events) == []
+        assert streams.stats() == {"active_drafts": 0, "subscribers": 0}
+
+    @pytest.mark.asyncio
+    async def test_keepalive_when_idle(self):
+        streams = DraftStreams()
+        events = streams.subscribe("m1", keepalive=0.01)
+        assert await asyncio.wait_for(events.__anext__(), timeout=1) is None
+        await events.aclose()
@@ -0,0 +1,196 @@
+"""
+LLM Telemetry Tests
+
+Unit tests for per-call traces, aggregates and the batched writer in
+core/llm_telemetry.py, and for how LLMClient records its calls.
+"""
+
+from collections import deque
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from core.config import get_settings
+from core.llm import LLMClient
+from core.llm_telemetry import CallTrace, LLMTelemetry, llm_call_context, traced_node
+
+
+def make_response(content: str, prompt_tokens: int = 10, completion_tokens: int = 5):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    response.usage.prompt_tokens = prompt_tokens
+    response.usage.completion_tokens = completion_tokens
+    response.usage.total_tokens = prompt_tokens + completion_tokens
+    return response
+
+
+def make_chunk(content):
+    chunk = MagicMock()
+    chunk.choices = [MagicMock()]
+    chunk.choices[0].delta.content = content
+    return chunk
+
+
+def make_provider(name: str, create):
+    client = MagicMock()
+    client.chat.completions.create = create
+    return {"name": name, "client": client, "model": f"{name}-model", "is_openrouter": False}
+
+
+@pytest.fixture
+def telemetry():
+    fresh = LLMTelemetry()
+    with patch("core.llm_telemetry.telemetry", fresh):
+        yield fresh
+
+
+@pytest.fixture
+def llm_client(telemetry):
+    with patch("core.llm.get_encoding", return_value=MagicMock(encode=lambda text: text.split())):
+        client = LLMClient()
+    client.settings.llm_cache_enabled = False
+    with patch.dict("core.llm_limiter._limiters", clear=True), \
+         patch.dict("core.llm_health._health", clear=True):
+        yield client
+
+
+class TestCallTrace:
+    """Tests for trace fields and cost"""
+
+    def test_picks_up_call_context(self):
+        with llm_call_context("mission-1", "analyze"):
+            trace = CallTrace.start("chat")
+        assert (trace.mission_id, trace.node) == ("mission-1", "analyze")
+        assert CallTrace.start("chat").mission_id is None
+
+    def test_retries_count_extra_attempts(self):
+        trace = CallTrace.start("chat")
+        trace.attempt("Gemini", "g")
+        trace.attempt("OpenRouter", "o")
+        assert trace.retries == 1
+        assert trace.provider == "OpenRouter"
+
+    def test_cost_from_prices(self):
+        trace = CallTrace("chat", model="m", prompt_tokens=1_000_000, completion_tokens=500_000)
+        assert trace.cost_usd({"m": {"prompt": 0.1, "completion": 0.4}}) == pytest.approx(0.3)
+        assert trace.cost_usd({}) is None
+
+    @pytest.mark.asyncio
+    async def test_traced_node_sets_context(self):
+        seen = {}
+
+        async def node(state):
+            trace = CallTrace.start("chat")
+            seen.update(mission=trace.mission_id, node=trace.node)
+            return {}
+
+        await traced_node("generate", node)({"mission_id": "m-7"})
+        assert seen == {"mission": "m-7", "node": "generate"}
+
+
+class TestAggregates:
+    """Tests for the in-memory aggregate and the buffered writer"""
+
+    def test_groups_by_model_and_node(self, telemetry):
+        for node in ("a", "a", "b"):
+            with llm_call_context("m", node):
+                trace = CallTrace.start("chat")
+            trace.attempt("Gemini", "g")
+            trace.prompt_tokens, trace.completion_tokens = 10, 2
+            trace.finish()
+        failed = CallTrace.start("chat")
+        failed.attempt("Gemini", "g")
+        failed.finish(Exception("boom"))
+
+        metrics = telemetry.metrics()
+        model = metrics["by_model"]["Gemini:g"]
+        assert model["calls"] == 4
+        assert model["errors"] == 1
+        assert model["prompt_tokens"] == 30
+        assert metrics["by_node"]["a"]["calls"] == 2
+        assert metrics["by_node"]["(none)"]["errors"] == 1
+        assert metrics["pending_rows"] == 4
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_batch(self, telemetry):
+        CallTrace.start("chat").finish()
+        with patch("core.database.db.insert_llm_calls", new=AsyncMock()) as insert:
+            await telemetry.flush()
+        rows = insert.await_args.args[0]
+        assert len(rows) == 1 and rows[0][2] == "chat"
+        assert telemetry.metrics()["pending_rows"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_rows(self, telemetry):
+        CallTrace.start("chat").finish()
+        with patch("core.database.db.insert_llm_calls", new=AsyncMock(side_effect=Exception("db down"))):
+            await telemetry.flush()
+        assert telemetry.metrics()["pending_rows"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_counts_rows_that_no_longer_fit(self, telemetry):
+        telemetry._buffer = deque(maxlen=3)
+        for _ in range(3):
+            CallTrace.start("chat").finish()
+
+        async def insert(rows):
+            # Two calls finish while the write is in flight
+            CallTrace.start("stream").finish()
+            CallTrace.start("stream").finish()
+            raise Exception("db down")
+
+        with patch("core.database.db.insert_llm_calls", new=insert):
+            await telemetry.flush()
+
+        assert [row[2] for row in telemetry._buffer] == ["chat", "stream", "stream"]
+        assert telemetry.metrics()["dropped_rows"] == 2
+
+    def test_settings_are_read_once(self, telemetry):
+        with patch("core.llm_telemetry.get_settings", wraps=get_settings) as settings:
+            CallTrace.start("chat").finish()
+            CallTrace.start("chat").finish()
+        assert settings.call_count == 1
+        assert telemetry.metrics()["pending_rows"] == 2
+
+
+class TestClientInstrumentation:
+    """Tests that LLMClient records chat and stream calls"""
+
+    @pytest.mark.asyncio
+    async def test_chat_records_usage_and_retries(self, llm_client, telemetry):
+        from openai import APIError
+        failing = AsyncMock(side_effect=APIError("402 payment required", request=MagicMock(), body=None))
+        working = AsyncMock(return_value=make_response("ok", 12, 3))
+        llm_client.providers = [make_provider("Gemini", failing), make_provider("OpenRouter", working)]
+
+        with llm_call_context("m-1", "analyze"):
+            assert await llm_client.chat([{"role": "user", "content": "hi"}], cache=False) == "ok"
+
+        stats = telemetry.metrics()["by_model"]["OpenRouter:OpenRouter-model"]
+        assert stats["calls"] == 1 and stats["retries"] == 1
+        assert stats["prompt_tokens"] == 12 and stats["completion_tokens"] == 3
+        row = telemetry._buffer[0]
+        assert row[:4] == ("m-1", "analyze", "chat", "OpenRouter")
+
+    @pytest.mark.asyncio
+    async def test_stream_records_time_to_first_token(self, llm_client, telemetry):
+        async def stream():
+            for delta in ("a", "b"):
+                yield make_chunk(delta)
+
+        llm_client.providers = [make_provider("Gemini", AsyncMock(return_value=stream()))]
+        deltas = [d async for d in llm_client.chat_stream([{"role": "user", "content": "hi"}])]
+
+        assert deltas == ["a", "b"]
+        stats = telemetry.metrics()["by_model"]["Gemini:Gemini-model"]
+        assert stats["calls"] == 1 and stats["errors"] == 0
+        assert stats["ttft_p50_ms"] is not None
+        assert stats["completion_tokens"] == 1  # "ab" with the whitespace test encoder
+
+    @pytest.mark.asyncio
+    async def test_failed_call_is_recorded(self, llm_client, telemetry):
+        llm_client.providers = [make_provider("Gemini", AsyncMock(side_effect=RuntimeError("kaput")))]
+        with pytest.raises(RuntimeError):
+            await llm_client.chat([{"role": "user", "content": "hi"}], cache=False)
+        assert telemetry.metrics()["by_model"]["Gemini:Gemini-model"]["errors"] == 1
@@ -0,0 +1,98 @@
+"""
+Prompt Budget Tests
+
+Unit tests for boundary-aware trimming and priority packing in
+core/prompt_budget.py, and LLMClient.prompt_budget.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from core.llm import LLMClient
+from core.prompt_budget import PromptSection, pack_sections, trim_to_tokens
+
+
+def count_words(text: str) -> int:
+    """Stand-in tokenizer: one token per word"""
+    return len(text.split())
+
+
+class TestTrimToTokens:
+    """Tests for trimming at natural boundaries"""
+
+    def test_short_text_unchanged(self):
+        assert trim_to_tokens("Built APIs. Led a team.", 100, count_words) == "Built APIs. Led a team."
+
+    def test_trims_at_sentence_boundary(self):
+        text = "Built payment APIs in Go. Led a team of five. Cut latency by half."
+        assert trim_to_tokens(text, 12, count_words) == "Built payment APIs in Go. Led a team of five."
+
+    def test_keeps_whole_bullets_and_drops_dangling_header(self):
+        text = "## EXPERIENCE\n- Built payment APIs\n- Led a team\n## SKILL\n- Python, Go, SQL"
+        trimmed = trim_to_tokens(text, 13, count_words)
+        assert trimmed == "## EXPERIENCE\n- Built payment APIs\n- Led a team"
+
+    def test_zero_budget(self):
+        assert trim_to_tokens("anything", 0, count_words) == ""
+
+
+class TestPackSections:
+    """Tests for priority order and budget sharing"""
+
+    def test_higher_priority_filled_first(self):
+        packed = pack_sections(
+            [
+                PromptSection("chunks", "One two three. Four five six. Seven eight nine.", priority=1),
+                PromptSection("analysis", "a b c d e", priority=0),
+            ],
+            budget=9,
+            count_tokens=count_words,
+        )
+        assert packed["analysis"] == "a b c d e"
+        assert packed["chunks"] == "One two three."
+
+    def test_equal_priority_shares_budget_and_passes_on_leftover(self):
+        packed = pack_sections(
+            [
+                PromptSection("short", "Tiny."),
+                PromptSection("long_a", "A1 a. A2 a. A3 a. A4 a. A5 a."),
+                PromptSection("long_b", "B1 b. B2 b. B3 b. B4 b. B5 b."),
+            ],
+            budget=11,
+            count_tokens=count_words,
+        )
+        assert packed["short"] == "Tiny."
+        assert packed["long_a"] == "A1 a. A2 a."
+        assert packed["long_b"] == "B1 b. B2 b. B3 b."  # gets what long_a could not use
+
+    def test_max_tokens_caps_section(self):
+        packed = pack_sections(
+            [PromptSection("highlights", "One two. Three four. Five six.", max_tokens=4)],
+            budget=100,
+            count_tokens=count_words,
+        )
+        assert packed["highlights"] == "One two. Three four."
+
+
+class TestPromptBudget:
+    """Tests for the per-model budget"""
+
+    def test_uses_smallest_window_in_chain(self):
+        with patch("core.llm.get_encoding", return_value=MagicMock(encode=lambda text: text.split())):
+            client = LLMClient()
+        client.settings.llm_context_window = 8000
+        client.settings.llm_context_windows = {"big-model": 1_000_000}
+        client.settings.llm_max_prompt_tokens = 100_000
+        client.providers = [{"model": "big-model"}, {"model": "small-model"}]
+
+        assert client.prompt_budget(2000, "system words here") == 8000 - 2000 - 3 - 64
+
+    def test_capped_by_max_prompt_tokens(self):
+        with patch("core.llm.get_encoding", return_value=MagicMock(encode=lambda text: text.split())):
+            client = LLMClient()
+        client.settings.llm_context_window = 1_000_000
+        client.settings.llm_context_windows = {}
+        client.settings.llm_max_prompt_tokens = 5000
+        client.providers = [{"model": "m"}]
+
+        assert client.prompt_budget(2000) == 5000 - 64
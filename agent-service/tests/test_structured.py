@@ -0,0 +1,228 @@
+"""
+Structured Output Tests
+
+Unit tests for JSON repair and incremental parsing in core/structured.py,
+and for LLMClient.chat_json.
+"""
+
+from typing import List
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from core.llm import LLMClient
+from core.models import JobAnalysis, parse_llm_json
+from core.structured import IncrementalJSONParser, loads_lenient, repair_json
+
+
+class TestRepair:
+    """Tests for the local repair pass"""
+
+    def test_fenced_reply_with_prose(self):
+        text = 'Sure! Here is the analysis:\n```json\n{"required_skills": ["Python"]}\n```\nGood luck.'
+        assert loads_lenient(text) == {"required_skills": ["Python"]}
+
+    def test_python_style_output(self):
+        text = "{'remote': True, 'salary': None, 'tags': ['a', 'b',],}"
+        assert loads_lenient(text) == {"remote": True, "salary": None, "tags": ["a", "b"]}
+
+    def test_raw_newlines_and_quotes_in_strings(self):
+        assert loads_lenient('{"feedback": "Line one\nLine two"}') == {"feedback": "Line one\nLine two"}
+        assert loads_lenient("{'quote': 'She said \"hi\"'}") == {"quote": 'She said "hi"'}
+
+    def test_trailing_text_after_value_is_dropped(self):
+        assert repair_json('[1, 2] and some notes') == "[1, 2]"
+
+    def test_truncated_reply_is_an_error(self):
+        """A cut-off reply must be re-asked, not salvaged into a partial value"""
+        for text in ('{', '{"required_skills": ["Py', '{"values": ["Ownership", "Speed"], "products": ["Cloud", "Dat'):
+            with pytest.raises(ValueError, match="cut off"):
+                loads_lenient(text)
+
+    def test_parse_llm_json_falls_back_on_truncation(self):
+        fallback = JobAnalysis(required_skills=["fallback"])
+        assert parse_llm_json('{"required_skills": ["Py', JobAnalysis, fallback=fallback) is fallback
+
+    def test_nothing_parseable_raises(self):
+        with pytest.raises(ValueError):
+            loads_lenient("I cannot help with that.")
+
+    def test_parse_llm_json_uses_repair(self):
+        result = parse_llm_json("{'required_skills': ['Go',],}", JobAnalysis)
+        assert result.required_skills == ["Go"]
+
+
+class TestIncrementalParser:
+    """Tests for partial values while streaming"""
+
+    def test_partial_values_grow_with_stream(self):
+        parser = IncrementalJSONParser()
+        assert parser.feed("```json\n[") == []
+        assert parser.feed('{"question": "Why us') == [{"question": "Why us"}]
+        assert parser.feed('?", "type"') == [{"question": "Why us?"}]
+        assert parser.feed(': "cultural"}, {"ques') == [{"question": "Why us?", "type": "cultural"}, {}]
+        assert not parser.complete
+        parser.feed('tion": "Tell me"}]\n```')
+        assert parser.complete
+        assert parser.partial()[1] == {"question": "Tell me"}
+
+    def test_incomplete_numbers_and_escapes_are_held_back(self):
+        parser = IncrementalJSONParser()
+        assert parser.feed('{"score": 8') == {}
+        assert parser.feed('5, "note": "caf\\u00') == {"score": 85, "note": "caf"}
+        assert parser.feed('e9"}') == {"score": 85, "note": "café"}
+
+
+def make_response(content: str, finish_reason: str = "stop"):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    response.choices[0].finish_reason = finish_reason
+    return response
+
+
+@pytest.fixture
+def llm_client():
+    with patch("core.llm.get_encoding", return_value=MagicMock(encode=lambda text: text.split())):
+        client = LLMClient()
+    client.settings.llm_cache_enabled = False
+    client.settings.llm_structured_output = "json_object"
+    with patch.dict("core.llm_limiter._limiters", clear=True), \
+         patch.dict("core.llm_health._health", clear=True):
+        yield client
+
+
+def use_provider(client, create):
+    provider = MagicMock()
+    provider.chat.completions.create = create
+    client.providers = [{"name": "Fake", "client": provider, "model": "fake-model", "is_openrouter": False}]
+
+
+class TestChatJson:
+    """Tests for LLMClient.chat_json"""
+
+    @pytest.mark.asyncio
+    async def test_requests_native_json_for_models(self, llm_client):
+        create = AsyncMock(return_value=make_response('{"required_skills": ["SQL"]}'))
+        use_provider(llm_client, create)
+
+        result = await llm_client.chat_json([{"role": "user", "content": "Analyze. JSON only."}], JobAnalysis)
+
+        assert isinstance(result, JobAnalysis) and result.required_skills == ["SQL"]
+        assert create.call_args.kwargs["response_format"] == {"type": "json_object"}
+
+    @pytest.mark.asyncio
+    async def test_list_schema_skips_native_mode_and_unwraps(self, llm_client):
+        create = AsyncMock(return_value=make_response('{"skills": ["Go", "Rust"]}'))
+        use_provider(llm_client, create)
+
+        assert await llm_client.chat_json([{"role": "user", "content": "x"}], List[str]) == ["Go", "Rust"]
+        assert "response_format" not in create.call_args.kwargs
+
+    @pytest.mark.asyncio
+    async def test_reasks_once_with_the_error(self, llm_client):
+        create = AsyncMock(side_effect=[
+            make_response('{"required_skills": "not a list"}'),
+            make_response('{"required_skills": ["Kafka"]}'),
+        ])
+        use_provider(llm_client, create)
+
+        result = await llm_client.chat_json([{"role": "user", "content": "x"}], JobAnalysis)
+
+        assert result.required_skills == ["Kafka"]
+        retry_messages = create.call_args_list[1].kwargs["messages"]
+        assert retry_messages[-2]["role"] == "assistant"
+        assert "could not be used" in retry_messages[-1]["content"]
+
+    @pytest.mark.asyncio
+    async def test_empty_reply_is_reasked_without_assistant_turn(self, llm_client):
+        create = AsyncMock(side_effect=[make_response(None), make_response('{"required_skills": ["Go"]}')])
+        use_provider(llm_client, create)
+
+        result = await llm_client.chat_json([{"role": "user", "content": "x"}], JobAnalysis)
+
+        assert result.required_skills == ["Go"]
+        retry_messages = create.call_args_list[1].kwargs["messages"]
+        assert [m["role"] for m in retry_messages] == ["user", "user"]
+        assert all(m["content"] for m in retry_messages)
+
+    @pytest.mark.asyncio
+    async def test_truncated_reply_is_reasked(self, llm_client):
+        create = AsyncMock(side_effect=[
+            make_response('{"required_skills": ["Py'),
+            make_response('{"required_skills": ["Python"]}'),
+        ])
+        use_provider(llm_client, create)
+
+        result = await llm_client.chat_json([{"role": "user", "content": "x"}], JobAnalysis)
+
+        assert result.required_skills == ["Python"]
+        assert "cut off" in create.call_args_list[1].kwargs["messages"][-1]["content"]
+
+    @pytest.mark.asyncio
+    async def test_length_finish_reason_is_reasked(self, llm_client):
+        """A reply that stopped at max_tokens is not trusted even if it parses"""
+        create = AsyncMock(side_effect=[
+            make_response('["Go"]', finish_reason="length"),
+            make_response('["Go", "Rust"]'),
+        ])
+        use_provider(llm_client, create)
+
+        assert await llm_client.chat_json([{"role": "user", "content": "x"}], List[str]) == ["Go", "Rust"]
+        assert "token limit" in create.call_args_list[1].kwargs["messages"][-1]["content"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_list_items_are_reasked(self, llm_client):
+        from core.models import InterviewQuestion
+        create = AsyncMock(side_effect=[
+            make_response('[{"question": "Why us?"}]'),
+            make_response('[{"question": "Why us?", "type": "cultural"}]'),
+        ])
+        use_provider(llm_client, create)
+
+        result = await llm_client.chat_json([{"role": "user", "content": "x"}], List[InterviewQuestion])
+
+        assert result == [InterviewQuestion(question="Why us?", type="cultural")]
+        assert create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_fallback_after_second_failure(self, llm_client):
+        use_provider(llm_client, AsyncMock(return_value=make_response("no json here")))
+
+        assert await llm_client.chat_json([{"role": "user", "content": "x"}], List[str], fallback=[]) == []
+        with pytest.raises(ValueError):
+            await llm_client.chat_json([{"role": "user", "content": "x"}], List[str])
+
+    @pytest.mark.asyncio
+    async def test_unsupported_response_format_is_dropped(self, llm_client):
+        from openai import BadRequestError
+        rejected = BadRequestError(
+            "Error code: 400 - response_format is not supported by this model",
+            response=MagicMock(status_code=400), body=None,
+        )
+        create = AsyncMock(side_effect=[rejected, make_response('{"required_skills": []}')])
+        use_provider(llm_client, create)
+
+        await llm_client.chat_json([{"role": "user", "content": "x"}], JobAnalysis)
+
+        assert "response_format" not in create.call_args_list[1].kwargs
+
+    @pytest.mark.asyncio
+    async def test_on_partial_receives_growing_values(self, llm_client):
+        async def stream():
+            for delta in ['["Py', 'thon", "G', 'o"]']:
+                chunk = MagicMock()
+                chunk.choices = [MagicMock()]
+                chunk.choices[0].delta.content = delta
+                yield chunk
+
+        use_provider(llm_client, AsyncMock(return_value=stream()))
+        partials = []
+
+        async def on_partial(value):
+            partials.append(value)
+
+        result = await llm_client.chat_json([{"role": "user", "content": "x"}], List[str], on_partial=on_partial)
+
+        assert result == ["Python", "Go"]
+        assert partials == [["Py"], ["Python", "G"], ["Python", "Go"]]
@@ -214,6 +214,7 @@ export default function MissionsPage() {
                       message: e.message,
                       timestamp: e.timestamp,
                     })),
+                    eventCount: mission.last_event_seq,
                   }}
                   onApprove={() => handleApprove(mission.mission_id)}
                   onRegenerate={() => handleRegenerate(mission.mission_id)}
@@ -19,6 +19,7 @@ import {
   Clock,
 } from "lucide-react";
 import { useState } from "react";
+import { agentClient } from "@/lib/api/agent-client";
 import { MissionTimeline } from "./mission-timeline";
 import { LiveStatusBadge } from "./live-status-badge";
 
@@ -38,6 +39,7 @@ interface Mission {
   timestamp: string;
   artifact?: string;
   events?: MissionEvent[];
+  eventCount?: number; // total events; the list view only carries the latest few
 }
 
 interface StatusBadgeProps {
@@ -96,8 +98,29 @@ export function MissionCard({
 }: MissionCardProps) {
   const Icon = mission.icon;
   const [showTimeline, setShowTimeline] = useState(false);
+  const [fullEvents, setFullEvents] = useState<MissionEvent[] | null>(null);
   const isActive = mission.status === "executing" || mission.status === "thinking" || mission.status === "needs_review";
-  const hasEvents = mission.events && mission.events.length > 0;
+  const events = fullEvents ?? mission.events ?? [];
+  const eventCount = Math.max(mission.eventCount ?? 0, events.length);
+  const hasEvents = events.length > 0;
+
+  const toggleTimeline = async () => {
+    const opening = !showTimeline;
+    setShowTimeline(opening);
+    if (!opening) {
+      setFullEvents(null);
+      return;
+    }
+    // Load the full log on demand when the list response was truncated
+    if (eventCount > events.length) {
+      try {
+        const detail = await agentClient.getMission(mission.id);
+        setFullEvents(detail.events);
+      } catch (error) {
+        console.error("Failed to load mission timeline:", error);
+      }
+    }
+  };
 
   return (
     <Card className="group hover:bg-white/10 transition-all duration-300 cursor-pointer border-white/10 bg-white/5 backdrop-blur-md hover:shadow-lg hover:shadow-purple-500/10 hover:-translate-y-0.5">
@@ -190,15 +213,15 @@ export function MissionCard({
               size="sm"
               variant="ghost"
               className="w-full h-8 text-[11px] text-muted-foreground hover:text-white gap-1.5"
-              onClick={() => setShowTimeline(!showTimeline)}
+              onClick={toggleTimeline}
             >
               <Clock className="w-3.5 h-3.5" />
-              {showTimeline ? "Hide" : "Show"} Timeline ({mission.events!.length} events)
+              {showTimeline ? "Hide" : "Show"} Timeline ({eventCount} events)
               {showTimeline ? <ChevronUp className="w-3 h-3" /> : <ChevronDown className="w-3 h-3" />}
             </Button>
             {showTimeline && (
               <div className="mt-3 max-h-64 overflow-y-auto pr-2">
-                <MissionTimeline events={mission.events!} />
+                <MissionTimeline events={events} />
               </div>
             )}
           </div>
@@ -46,6 +46,7 @@ export interface MissionResponse {
   progress: number;
   current_node: string;
   events: MissionEvent[];
+  last_event_seq?: number;
   artifacts: MissionArtifact[];
   output_data?: Record<string, any>;
   requires_approval: boolean;
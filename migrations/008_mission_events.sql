@@ -0,0 +1,36 @@
+-- Migration 008: Append-only mission event log
+-- Replaces the missions.events JSONB array, which was rewritten in full on
+-- every graph node, with one row per event and a per-mission sequence number.
+
+CREATE TABLE IF NOT EXISTS mission_events (
+    mission_id TEXT NOT NULL REFERENCES missions(id) ON DELETE CASCADE,
+    seq INT NOT NULL,
+    type TEXT NOT NULL,
+    message TEXT,
+    data JSONB,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (mission_id, seq)
+);
+
+-- Last sequence number handed out for each mission
+ALTER TABLE missions ADD COLUMN IF NOT EXISTS event_seq INT NOT NULL DEFAULT 0;
+
+-- Backfill existing event arrays
+INSERT INTO mission_events (mission_id, seq, type, message, data, created_at)
+SELECT
+    m.id,
+    e.ord,
+    COALESCE(e.value->>'type', 'log'),
+    e.value->>'message',
+    e.value->'data',
+    COALESCE((e.value->>'timestamp')::timestamp, m.created_at)
+FROM missions m
+CROSS JOIN LATERAL jsonb_array_elements(
+    CASE WHEN jsonb_typeof(m.events) = 'array' THEN m.events ELSE '[]'::jsonb END
+) WITH ORDINALITY AS e(value, ord)
+ON CONFLICT (mission_id, seq) DO NOTHING;
+
+UPDATE missions m
+SET event_seq = COALESCE((SELECT max(seq) FROM mission_events e WHERE e.mission_id = m.id), 0);
+
+ALTER TABLE missions DROP COLUMN IF EXISTS events;
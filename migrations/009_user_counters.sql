@@ -0,0 +1,151 @@
+-- Migration 009: Per-user counter rollup
+-- Keeps per-user totals and per-status breakdowns current through row
+-- triggers, so dashboard KPIs and list totals become a primary-key lookup
+-- instead of count(*) scans.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS user_counters (
+    user_id TEXT PRIMARY KEY,
+    jobs BIGINT NOT NULL DEFAULT 0,
+    applications BIGINT NOT NULL DEFAULT 0,
+    resumes BIGINT NOT NULL DEFAULT 0,
+    linkedin_posts BIGINT NOT NULL DEFAULT 0,
+    missions BIGINT NOT NULL DEFAULT 0,
+    -- {"jobs": {"new": 12, "applied": 3}, "missions": {"running": 1}, ...}
+    status_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Add p_delta to the total for p_counter (a column named after the table)
+-- and, when the row has a status, to its entry in status_counts.
+CREATE OR REPLACE FUNCTION bump_user_counter(p_user_id TEXT, p_counter TEXT, p_status TEXT, p_delta INT)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO user_counters (user_id) VALUES (p_user_id)
+    ON CONFLICT (user_id) DO NOTHING;
+
+    EXECUTE format(
+        'UPDATE user_counters SET
+            %1$I = %1$I + $1,
+            status_counts = CASE WHEN $2 IS NULL THEN status_counts ELSE jsonb_set(
+                status_counts,
+                ARRAY[%1$L],
+                COALESCE(status_counts->%1$L, ''{}''::jsonb)
+                    || jsonb_build_object($2, COALESCE((status_counts->%1$L->>$2)::bigint, 0) + $1)
+            ) END,
+            updated_at = NOW()
+        WHERE user_id = $3',
+        p_counter
+    ) USING p_delta, p_status, p_user_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_user_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_user_counter(OLD.user_id, TG_TABLE_NAME, to_jsonb(OLD)->>'status', -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_user_counter(NEW.user_id, TG_TABLE_NAME, to_jsonb(NEW)->>'status', 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- jobs.status is set by the API (update_job_status); databases built from
+-- older schema.sql lack it, and the update trigger below needs it to exist
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS status TEXT DEFAULT 'new';
+
+-- Inserts and deletes always count; updates only when the owner or status moves
+DROP TRIGGER IF EXISTS jobs_user_counters ON jobs;
+CREATE TRIGGER jobs_user_counters
+AFTER INSERT OR DELETE ON jobs
+FOR EACH ROW EXECUTE FUNCTION sync_user_counters();
+
+DROP TRIGGER IF EXISTS jobs_user_counters_update ON jobs;
+CREATE TRIGGER jobs_user_counters_update
+AFTER UPDATE OF status, user_id ON jobs
+FOR EACH ROW
+WHEN (OLD.status IS DISTINCT FROM NEW.status OR OLD.user_id IS DISTINCT FROM NEW.user_id)
+EXECUTE FUNCTION sync_user_counters();
+
+DROP TRIGGER IF EXISTS applications_user_counters ON applications;
+CREATE TRIGGER applications_user_counters
+AFTER INSERT OR DELETE ON applications
+FOR EACH ROW EXECUTE FUNCTION sync_user_counters();
+
+DROP TRIGGER IF EXISTS applications_user_counters_update ON applications;
+CREATE TRIGGER applications_user_counters_update
+AFTER UPDATE OF status, user_id ON applications
+FOR EACH ROW
+WHEN (OLD.status IS DISTINCT FROM NEW.status OR OLD.user_id IS DISTINCT FROM NEW.user_id)
+EXECUTE FUNCTION sync_user_counters();
+
+DROP TRIGGER IF EXISTS resumes_user_counters ON resumes;
+CREATE TRIGGER resumes_user_counters
+AFTER INSERT OR DELETE ON resumes
+FOR EACH ROW EXECUTE FUNCTION sync_user_counters();
+
+DROP TRIGGER IF EXISTS linkedin_posts_user_counters ON linkedin_posts;
+CREATE TRIGGER linkedin_posts_user_counters
+AFTER INSERT OR DELETE ON linkedin_posts
+FOR EACH ROW EXECUTE FUNCTION sync_user_counters();
+
+DROP TRIGGER IF EXISTS linkedin_posts_user_counters_update ON linkedin_posts;
+CREATE TRIGGER linkedin_posts_user_counters_update
+AFTER UPDATE OF status, user_id ON linkedin_posts
+FOR EACH ROW
+WHEN (OLD.status IS DISTINCT FROM NEW.status OR OLD.user_id IS DISTINCT FROM NEW.user_id)
+EXECUTE FUNCTION sync_user_counters();
+
+DROP TRIGGER IF EXISTS missions_user_counters ON missions;
+CREATE TRIGGER missions_user_counters
+AFTER INSERT OR DELETE ON missions
+FOR EACH ROW EXECUTE FUNCTION sync_user_counters();
+
+DROP TRIGGER IF EXISTS missions_user_counters_update ON missions;
+CREATE TRIGGER missions_user_counters_update
+AFTER UPDATE OF status, user_id ON missions
+FOR EACH ROW
+WHEN (OLD.status IS DISTINCT FROM NEW.status OR OLD.user_id IS DISTINCT FROM NEW.user_id)
+EXECUTE FUNCTION sync_user_counters();
+
+-- Backfill from the current tables (the counted tables are locked so no
+-- write lands between the triggers going live and the snapshot below)
+LOCK TABLE jobs, applications, resumes, linkedin_posts, missions IN SHARE MODE;
+
+TRUNCATE user_counters;
+
+INSERT INTO user_counters (user_id, jobs, applications, resumes, linkedin_posts, missions, status_counts)
+SELECT
+    u.user_id,
+    (SELECT count(*) FROM jobs t WHERE t.user_id = u.user_id),
+    (SELECT count(*) FROM applications t WHERE t.user_id = u.user_id),
+    (SELECT count(*) FROM resumes t WHERE t.user_id = u.user_id),
+    (SELECT count(*) FROM linkedin_posts t WHERE t.user_id = u.user_id),
+    (SELECT count(*) FROM missions t WHERE t.user_id = u.user_id),
+    jsonb_build_object(
+        'jobs', COALESCE((SELECT jsonb_object_agg(s.status, s.n) FROM (
+            SELECT to_jsonb(t)->>'status' AS status, count(*) AS n FROM jobs t
+            WHERE t.user_id = u.user_id GROUP BY 1) s WHERE s.status IS NOT NULL), '{}'::jsonb),
+        'applications', COALESCE((SELECT jsonb_object_agg(s.status, s.n) FROM (
+            SELECT status, count(*) AS n FROM applications t
+            WHERE t.user_id = u.user_id GROUP BY 1) s WHERE s.status IS NOT NULL), '{}'::jsonb),
+        'linkedin_posts', COALESCE((SELECT jsonb_object_agg(s.status, s.n) FROM (
+            SELECT status, count(*) AS n FROM linkedin_posts t
+            WHERE t.user_id = u.user_id GROUP BY 1) s WHERE s.status IS NOT NULL), '{}'::jsonb),
+        'missions', COALESCE((SELECT jsonb_object_agg(s.status, s.n) FROM (
+            SELECT status, count(*) AS n FROM missions t
+            WHERE t.user_id = u.user_id GROUP BY 1) s WHERE s.status IS NOT NULL), '{}'::jsonb)
+    )
+FROM (
+    SELECT user_id FROM jobs
+    UNION SELECT user_id FROM applications
+    UNION SELECT user_id FROM resumes
+    UNION SELECT user_id FROM linkedin_posts
+    UNION SELECT user_id FROM missions
+) u;
+
+COMMIT;
@@ -0,0 +1,29 @@
+-- Migration 010: Keyset pagination indexes
+-- List endpoints page with `(sort_column, id) < (cursor)` and
+-- `ORDER BY sort_column DESC, id DESC`; these indexes let each page start
+-- with an index seek instead of scanning and discarding OFFSET rows.
+--
+-- The sort columns only had `DEFAULT NOW()`. A NULL sorts first under DESC,
+-- falls outside the tuple comparison (so it is skipped or repeated) and
+-- cannot be encoded in a cursor, so backfill them and make them NOT NULL.
+
+UPDATE jobs SET scraped_at = COALESCE(created_at, NOW()) WHERE scraped_at IS NULL;
+UPDATE applications SET applied_at = COALESCE(updated_at, NOW()) WHERE applied_at IS NULL;
+UPDATE linkedin_posts SET created_at = COALESCE(published_at, NOW()) WHERE created_at IS NULL;
+UPDATE artifacts SET created_at = NOW() WHERE created_at IS NULL;
+UPDATE missions SET created_at = COALESCE(started_at, updated_at, NOW()) WHERE created_at IS NULL;
+
+ALTER TABLE jobs ALTER COLUMN scraped_at SET NOT NULL;
+ALTER TABLE applications ALTER COLUMN applied_at SET NOT NULL;
+ALTER TABLE linkedin_posts ALTER COLUMN created_at SET NOT NULL;
+ALTER TABLE artifacts ALTER COLUMN created_at SET NOT NULL;
+ALTER TABLE missions ALTER COLUMN created_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_user_scraped_at_id ON jobs(user_id, scraped_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_applications_user_applied_at_id ON applications(user_id, applied_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_linkedin_posts_user_created_at_id ON linkedin_posts(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_artifacts_user_created_at_id ON artifacts(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_missions_user_created_at_id ON missions(user_id, created_at DESC, id DESC);
+
+-- Superseded by idx_missions_user_created_at_id
+DROP INDEX IF EXISTS idx_missions_user_id_created_at;
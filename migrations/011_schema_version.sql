@@ -0,0 +1,31 @@
+-- Migration 011: Schema version for prepared statement invalidation
+-- The agent service caches prepared statements per pooled connection and
+-- listens on the `schema_version` channel. Every migration that changes a
+-- table should end with `SELECT bump_schema_version();` so running services
+-- drop statements prepared against the old shape.
+
+CREATE TABLE IF NOT EXISTS schema_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+INSERT INTO schema_version (id, version) VALUES (TRUE, 0)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_schema_version()
+RETURNS BIGINT AS $$
+DECLARE
+    new_version BIGINT;
+BEGIN
+    UPDATE schema_version
+    SET version = version + 1, updated_at = NOW()
+    WHERE id
+    RETURNING version INTO new_version;
+
+    PERFORM pg_notify('schema_version', new_version::text);
+    RETURN new_version;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT bump_schema_version();
@@ -0,0 +1,32 @@
+-- Migration 012: Cache invalidation notifications for users and user_settings
+-- The agent service caches these rows in-process and listens on the
+-- `user_cache` channel. Any write, from the service or from the web app,
+-- sends the affected user id once the transaction commits.
+
+CREATE OR REPLACE FUNCTION notify_user_cache()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'users' THEN
+        PERFORM pg_notify('user_cache', COALESCE(NEW.id, OLD.id));
+        IF TG_OP = 'UPDATE' AND NEW.id IS DISTINCT FROM OLD.id THEN
+            PERFORM pg_notify('user_cache', OLD.id);
+        END IF;
+    ELSE
+        PERFORM pg_notify('user_cache', COALESCE(NEW.user_id, OLD.user_id));
+        IF TG_OP = 'UPDATE' AND NEW.user_id IS DISTINCT FROM OLD.user_id THEN
+            PERFORM pg_notify('user_cache', OLD.user_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS users_notify_cache ON users;
+CREATE TRIGGER users_notify_cache
+AFTER INSERT OR UPDATE OR DELETE ON users
+FOR EACH ROW EXECUTE FUNCTION notify_user_cache();
+
+DROP TRIGGER IF EXISTS user_settings_notify_cache ON user_settings;
+CREATE TRIGGER user_settings_notify_cache
+AFTER INSERT OR UPDATE OR DELETE ON user_settings
+FOR EACH ROW EXECUTE FUNCTION notify_user_cache();
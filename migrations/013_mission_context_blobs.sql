@@ -0,0 +1,16 @@
+-- Migration 013: Offloaded mission context values
+-- Runners now patch only changed context keys. Large values (scraped job
+-- lists, original resume text, retrieved chunks) live here, written once
+-- when they change, with a small {"$ref": ...} left in missions.context so
+-- mission polls and per-node updates don't carry them.
+
+CREATE TABLE IF NOT EXISTS mission_context_blobs (
+    mission_id TEXT NOT NULL REFERENCES missions(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value JSONB NOT NULL,
+    bytes INT NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (mission_id, key)
+);
+
+SELECT bump_schema_version();
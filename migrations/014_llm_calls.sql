@@ -0,0 +1,28 @@
+-- Migration 014: Per-call LLM telemetry
+-- One row per LLMClient call (after the response cache), written in batches
+-- by core/llm_telemetry. mission_id has no foreign key so rows outlive
+-- deleted missions and calls made outside a mission can be recorded.
+
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id BIGSERIAL PRIMARY KEY,
+    mission_id TEXT,
+    node TEXT,
+    operation TEXT NOT NULL,
+    provider TEXT,
+    model TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    retries INT NOT NULL DEFAULT 0,
+    queue_wait_ms DOUBLE PRECISION,
+    ttft_ms DOUBLE PRECISION,
+    latency_ms DOUBLE PRECISION NOT NULL,
+    prompt_tokens INT,
+    completion_tokens INT,
+    cost_usd NUMERIC(12, 6),
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_calls_mission ON llm_calls(mission_id) WHERE mission_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_llm_calls_created ON llm_calls(created_at DESC);
+
+SELECT bump_schema_version();
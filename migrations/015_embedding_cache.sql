@@ -0,0 +1,14 @@
+-- Migration 015: Content-hash embedding cache
+-- Vectors keyed on sha256(model + normalized text), written by
+-- rag/embedding_cache, so identical job descriptions, retrieval queries and
+-- re-uploaded resume chunks are embedded once across users and workers.
+-- The vector column is untyped so models of any dimension can share it.
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    embedding vector NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+SELECT bump_schema_version();
@@ -0,0 +1,20 @@
+-- Migration 016: Flag rows embedded in degraded mode
+-- When the embedding API fails, EmbeddingService falls back to a local
+-- hashed n-gram vector (rag/embedding_backends). Those vectors are not
+-- comparable with API vectors, so the rows are flagged, skipped by
+-- similarity search and re-embedded by scripts/reembed_degraded.py.
+-- Rows stored with the old [0.0] * 1536 fallback (cosine distance against
+-- them is undefined) are flagged too.
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS embedding_degraded BOOLEAN NOT NULL DEFAULT FALSE;
+ALTER TABLE resume_chunks ADD COLUMN IF NOT EXISTS embedding_degraded BOOLEAN NOT NULL DEFAULT FALSE;
+
+UPDATE jobs SET embedding_degraded = TRUE
+WHERE embedding IS NOT NULL AND vector_norm(embedding) = 0;
+UPDATE resume_chunks SET embedding_degraded = TRUE
+WHERE embedding IS NOT NULL AND vector_norm(embedding) = 0;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_embedding_degraded ON jobs(id) WHERE embedding_degraded;
+CREATE INDEX IF NOT EXISTS idx_resume_chunks_embedding_degraded ON resume_chunks(id) WHERE embedding_degraded;
+
+SELECT bump_schema_version();
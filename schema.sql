@@ -62,7 +62,8 @@ CREATE TABLE jobs (
   embedding VECTOR(1536), -- OpenAI ada-002 embedding
   source TEXT, -- 'linkedin', 'company_career_page'
   ats_platform TEXT, -- 'greenhouse', 'lever', 'workday', 'ashby', 'bamboohr', 'smartrecruiters', 'icims'
-  scraped_at TIMESTAMP DEFAULT NOW(),
+  status TEXT DEFAULT 'new', -- 'new', 'saved', 'applied', 'rejected' (set from the dashboard)
+  scraped_at TIMESTAMP NOT NULL DEFAULT NOW(),
   applied BOOLEAN DEFAULT FALSE,
   created_at TIMESTAMP DEFAULT NOW()
 );
@@ -98,7 +99,7 @@ CREATE TABLE applications (
   resume_id UUID REFERENCES resumes(id),
   status TEXT DEFAULT 'applied', -- 'applied', 'oa', 'interview', 'rejected', 'offer'
   cover_letter_url TEXT,
-  applied_at TIMESTAMP DEFAULT NOW(),
+  applied_at TIMESTAMP NOT NULL DEFAULT NOW(),
   notes TEXT,
   updated_at TIMESTAMP DEFAULT NOW()
 );
@@ -112,7 +113,7 @@ CREATE TABLE linkedin_posts (
   status TEXT DEFAULT 'draft', -- 'draft', 'published'
   scheduled_for TIMESTAMP,
   published_at TIMESTAMP,
-  created_at TIMESTAMP DEFAULT NOW()
+  created_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
 -- User settings and Knowledge Base
@@ -141,7 +142,7 @@ CREATE TABLE artifacts (
   type TEXT, -- 'resume_pdf', 'cover_letter', 'screenshot'
   file_url TEXT NOT NULL,
   related_job_id UUID REFERENCES jobs(id),
-  created_at TIMESTAMP DEFAULT NOW()
+  created_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
 -- Skill gap analysis (Skill Gap Analysis Agent output) - Phase 2